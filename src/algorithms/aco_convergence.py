@@ -0,0 +1,108 @@
+# src/algorithms/aco_convergence.py
+"""
+Phát hiện hội tụ cho ACO (dừng sớm hoặc khởi động lại mùi khi đàn kiến không còn thăm dò).
+
+Ba tiêu chí, bật riêng từng cái qua thuộc tính của ACOSolver (None = tắt):
+    stagnation_window  : lời giải tốt nhất không được cải thiện trong stagnation_window vòng lặp liên tiếp.
+    branching_threshold: hệ số phân nhánh lambda (lambda-branching, Dorigo & Gambardella) trung bình
+                         <= ngưỡng. Với mỗi thành phố i, đếm các cạnh i -> j có
+                             tau_ij >= tau_min_i + lambda * (tau_max_i - tau_min_i)
+                         (lambda = branching_lambda, mặc định 0.05). Mùi đều -> bằng số cạnh ra;
+                         hội tụ hoàn toàn -> khoảng 1 với mùi có hướng (chỉ chiều i -> j của lộ trình),
+                         khoảng 2 với mùi vô hướng của bài toán đối xứng (pack_symmetric).
+    entropy_threshold  : entropy chuẩn hóa trung bình của mùi trên mỗi hàng <= ngưỡng
+                         (1 = mùi đều, 0 = toàn bộ mùi dồn vào một cạnh).
+Hai tiêu chí theo mùi chỉ được xét khi lời giải tốt nhất đã đứng yên ít nhất convergence_patience vòng
+(như ACOTSP ghép lambda-branching với số vòng từ lần cải thiện cuối): ngay sau vài lần rải mùi đầu tiên,
+các cạnh vừa được rải đã vượt hẳn phần còn lại của hàng dù đàn kiến chưa hội tụ.
+Các chỉ số chỉ xét cạnh dùng được (heuristic > 0), nên áp dụng được cho mảng mùi N x N
+của bộ máy "numpy" / "python" lẫn mảng N x k của bộ máy "candidate". Mảng mùi (bung từ tam giác nén)
+và mặt nạ cạnh dùng được chỉ được dựng khi thật sự cần: chỉ dùng stagnation_window thì không tốn gì thêm.
+"""
+import numpy as np
+
+# Hành động khi hội tụ: dừng hẳn, hoặc khởi tạo lại mùi (giữ lời giải tốt nhất) rồi chạy tiếp
+CONVERGENCE_ACTIONS = ("stop", "restart")
+
+
+def branching_factor(pheromone, usable, lam=0.05):
+    """Hệ số phân nhánh lambda trung bình trên các thành phố có cạnh ra (0 nếu không có)."""
+    rows = usable.any(axis=1)
+    if not rows.any():
+        return 0.0
+    tau, mask = pheromone[rows], usable[rows]
+    low = np.where(mask, tau, np.inf).min(axis=1)
+    high = np.where(mask, tau, -np.inf).max(axis=1)
+    cut = low + lam * (high - low)
+    branches = (mask & (tau >= cut[:, None])).sum(axis=1)
+    return float(branches.mean())
+
+
+def pheromone_entropy(pheromone, usable):
+    """Entropy Shannon chuẩn hóa (chia cho log số cạnh ra) trung bình trên các thành phố có >= 2 cạnh ra."""
+    degree = usable.sum(axis=1)
+    rows = degree >= 2
+    if not rows.any():
+        return 0.0
+    tau = np.where(usable[rows], pheromone[rows], 0.0)
+    p = tau / tau.sum(axis=1, keepdims=True)
+    logs = np.log(p, out=np.zeros_like(p), where=p > 0)
+    entropy = -(p * logs).sum(axis=1) / np.log(degree[rows])
+    return float(entropy.mean())
+
+
+class ConvergenceMonitor:
+    """
+    Theo dõi một lần chạy ACO. Gọi update() sau mỗi vòng lặp; trả về tên tiêu chí vừa thỏa
+    ("stagnation", "branching", "entropy") hoặc None. Chỉ số mùi chỉ được tính khi tiêu chí tương ứng bật.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.best_cost = float('inf')
+        self.stale_iterations = 0
+        self.branching = None     # Giá trị gần nhất (để báo cáo)
+        self.entropy = None
+        self.usable = None        # Mặt nạ cạnh dùng được, dựng ở lần đầu xét tiêu chí theo mùi
+
+    def enabled(self):
+        solver = self.solver
+        return (solver.stagnation_window is not None or solver.branching_threshold is not None
+                or solver.entropy_threshold is not None)
+
+    def reset(self):
+        """Sau khi khởi tạo lại mùi: đếm lại cửa sổ trì trệ từ đầu."""
+        self.stale_iterations = 0
+
+    def update(self, pheromone, usable):
+        """
+        Args:
+            pheromone: Hàm không tham số trả về mảng mùi hiện tại (N x N hoặc N x k); chỉ được gọi khi
+                       một tiêu chí theo mùi bật và đã qua convergence_patience vòng không cải thiện.
+            usable: Hàm không tham số trả về mặt nạ boolean cùng kích thước (cạnh dùng được);
+                    gọi một lần rồi giữ lại.
+        """
+        solver = self.solver
+        if solver.min_cost < self.best_cost:
+            self.best_cost = solver.min_cost
+            self.stale_iterations = 0
+        else:
+            self.stale_iterations += 1
+        if solver.stagnation_window is not None and self.stale_iterations >= solver.stagnation_window:
+            return "stagnation"
+        if self.stale_iterations < solver.convergence_patience:
+            return None
+        if solver.branching_threshold is None and solver.entropy_threshold is None:
+            return None
+        if self.usable is None:
+            self.usable = usable()
+        tau = pheromone()
+        if solver.branching_threshold is not None:
+            self.branching = branching_factor(tau, self.usable, solver.branching_lambda)
+            if self.branching <= solver.branching_threshold:
+                return "branching"
+        if solver.entropy_threshold is not None:
+            self.entropy = pheromone_entropy(tau, self.usable)
+            if self.entropy <= solver.entropy_threshold:
+                return "entropy"
+        return None
@@ -0,0 +1,443 @@
+# src/algorithms/aco_engine.py
+import numpy as np
+
+from .aco_strategies import make_strategy
+from .local_search import improve_tour_neighbors, neighbor_lists
+
+# Số ứng viên mặc định của bộ máy "candidate" khi candidate_k = None
+DEFAULT_CANDIDATE_K = 20
+# Danh sách láng giềng mở rộng (FALLBACK_FACTOR * k) dùng để tìm nhanh thành phố chưa thăm gần nhất
+FALLBACK_FACTOR = 4
+
+
+def heuristic_weights(tsp_problem, beta, packed=False, values=None):
+    """
+    eta^beta (float32) của mọi cạnh, tính một lần cho mỗi (bài toán, beta) và dùng lại giữa các lần chạy
+    (lưu trong tsp_problem.get_derived). eta = d_min / d: nhân cùng một hằng số cho mọi cạnh không đổi
+    xác suất chọn, nhưng giữ giá trị trong (0, 1] để eta^beta không tràn dưới ở float32.
+    Cạnh không dùng được (inf, d <= 0, đường chéo) = 0. Mảng trả về chỉ đọc (dùng chung giữa các bộ giải).
+    packed = False: mảng N x N. packed = True (bài toán đối xứng): chỉ tam giác trên (i < j) theo hàng,
+    mảng một chiều dài N(N-1)/2.
+    values: eta^beta đã tính sẵn (ví dụ trong shared memory của ACO song song), được đặt vào bộ đệm
+    của bài toán thay vì tính lại.
+    """
+    def build():
+        if values is not None:
+            return values
+        n = tsp_problem.num_cities
+        eta = np.zeros(n * (n - 1) // 2 if packed else n * n, dtype=np.float32)
+        start = 0
+        for i in range(n):
+            row = tsp_problem.get_row(i)[i + 1:] if packed else tsp_problem.get_row(i)
+            usable = np.isfinite(row) & (row > 0)
+            if not packed:
+                usable[i] = False
+            np.divide(1.0, row, out=eta[start:start + len(row)], where=usable)
+            start += len(row)
+        return _scaled_power(eta, beta).reshape((-1,) if packed else (n, n))
+
+    return tsp_problem.get_derived(("aco_eta_beta", float(beta), packed), build)
+
+
+def _scaled_power(eta, beta):
+    """(eta / max(eta))^beta tại chỗ, chỉ trên các ô > 0; khóa ghi trước khi đưa vào bộ đệm."""
+    if eta.size and eta.max() > 0:
+        eta /= eta.max()
+        np.power(eta, beta, out=eta, where=eta > 0)
+    eta.flags.writeable = False
+    return eta
+
+
+def pheromone_shape(solver):
+    """Kích thước mảng mùi mà bộ máy của solver sẽ tạo (để cấp phát trước, ví dụ trong shared memory)."""
+    n = solver.tsp_problem.num_cities
+    if solver.engine == "candidate":
+        k = solver.candidate_k or DEFAULT_CANDIDATE_K
+        return (n, max(min(k, n - 1), 0))
+    if solver.pack_symmetric and solver.tsp_problem.is_symmetric:
+        return (n * (n - 1) // 2,)
+    return (n, n)
+
+
+class NumpyACOEngine:
+    """
+    Bộ máy ACO vector hóa bằng NumPy dùng cho ACOSolver (engine = "numpy").
+
+    So với bản Python thuần (từng con kiến, từng bước, từng thành phố):
+      - eta^beta chỉ tính một lần cho mỗi bài toán và beta (dùng lại giữa các lần chạy, xem heuristic_weights).
+        Không có ma trận độ hấp dẫn N x N: mỗi bước chỉ dựng các hàng tau^alpha * eta^beta của thành phố
+        hiện tại của từng kiến (attract_rows).
+      - Mùi, eta^beta và độ hấp dẫn lưu ở float32 (một nửa bộ nhớ và băng thông so với float64).
+        Bài toán đối xứng (pack_symmetric = True): mùi vô hướng - cạnh i -> j và j -> i dùng chung một ô
+        của tam giác trên nén (N(N-1)/2 phần tử); độ hấp dẫn cũng được tính một lần mỗi vòng lặp ở dạng nén
+        và mỗi bước gom N ô cho mỗi kiến. Bộ nhớ: mùi + eta^beta + độ hấp dẫn nén, tổng 6N^2 byte.
+        Mùi có hướng (N x N): các hàng được tính thẳng từ mùi và eta^beta (đọc liền), tổng 8N^2 byte.
+      - Cả đàn kiến tiến cùng nhau: mỗi bước là một phép toán trên mảng (số kiến x N),
+        thành phố đã thăm bị che bằng mặt nạ boolean.
+      - Quay xổ số bằng cumsum + searchsorted (một lần gọi cho cả đàn).
+      - Bay hơi và rải mùi là phép toán mảng (np.add.at cộng dồn các cạnh trùng nhau).
+    Với chiến lược "as", xác suất chọn thành phố, luật bay hơi (kẹp ở 1e-10) và luật rải mùi
+    (Q / chi phí, chỉ chiều i -> j nếu mùi có hướng) giống bản Python, nên kết quả tương đương
+    về mặt thống kê (khác dãy số ngẫu nhiên). Các chiến lược khác (MMAS, ACS) xem aco_strategies.py.
+    """
+
+    def __init__(self, solver, rng=None):
+        """
+        Args:
+            solver: ACOSolver sở hữu (đọc tham số, ghi best_path / min_cost, is_running).
+            rng: np.random.Generator (None = tạo theo solver.seed).
+        """
+        self.solver = solver
+        self.tsp_problem = solver.tsp_problem
+        self.num_cities = self.tsp_problem.num_cities
+        self.rng = rng if rng is not None else np.random.default_rng(solver.seed)
+        self._build_matrices()
+        # Độ hấp dẫn của vòng lặp hiện tại (ACS cập nhật cục bộ cả mảng này), tính lại vào cùng bộ đệm
+        self.attract = None
+        self._attract_buffer = None
+        self.strategy = make_strategy(solver.strategy, solver)
+        self.strategy.setup(self)
+        # Láng giềng cho tìm kiếm cục bộ (tạo khi cần)
+        self.ls_neighbors = None
+
+    def _build_matrices(self):
+        """Lấy eta^beta (bộ đệm của bài toán) và tạo mảng pheromone (N x N hoặc tam giác trên nén)."""
+        solver = self.solver
+        n = self.num_cities
+        self.num_choices = n
+        self.packed = bool(solver.pack_symmetric and self.tsp_problem.is_symmetric)
+        # eta^beta chỉ > 0 với cạnh có thật và d > 0 (giống bản Python); dùng chung, không được ghi vào
+        self.heuristic_beta = heuristic_weights(self.tsp_problem, solver.beta, self.packed)
+        self.pheromone = np.ones(self.heuristic_beta.shape, dtype=np.float32)
+        # Mùi có hướng: không có bộ đệm độ hấp dẫn, attract_rows tính từng hàng từ mùi và eta^beta
+        self.row_attract = not self.packed
+        if self.packed:
+            # Cạnh (i, j) với i < j nằm ở ô _row_offsets[i] + j của tam giác trên nén
+            # (attract_rows dựng chỉ số B x N mỗi bước: int32 khi đủ, N <= 65536, để giảm băng thông)
+            self._slot_dtype = np.int32 if n * (n - 1) // 2 < 2 ** 31 else np.int64
+            rows = np.arange(n, dtype=np.int64)
+            self._row_offsets = (rows * (2 * n - rows - 1) // 2 - rows - 1).astype(self._slot_dtype)
+            self._cols = np.arange(n, dtype=self._slot_dtype)
+
+        # Danh sách ứng viên (candidate_k): ưu tiên chọn trong k láng giềng, hết ứng viên thì xét toàn bộ
+        self.candidates = None
+        if solver.candidate_k:
+            self.candidates = self.tsp_problem.get_candidates(solver.candidate_k)
+
+    def attractiveness(self):
+        """
+        tau^alpha * eta^beta (0 ở cạnh không dùng được) cùng dạng với mảng mùi (tam giác trên nén hoặc N x k),
+        ghi vào bộ đệm dùng lại mỗi vòng lặp. Mùi có hướng N x N: None (attract_rows tính từng hàng).
+        """
+        if self.row_attract:
+            return None
+        if self._attract_buffer is None:
+            self._attract_buffer = np.empty(self.pheromone.shape, dtype=np.float32)
+        buffer = self._attract_buffer
+        if self.solver.alpha == 1.0:
+            return np.multiply(self.pheromone, self.heuristic_beta, out=buffer)
+        np.power(self.pheromone, self.solver.alpha, out=buffer)
+        buffer *= self.heuristic_beta
+        return buffer
+
+    def attract_rows(self, attract, cities):
+        """
+        Các hàng độ hấp dẫn của cities (B x N, mỗi kiến một hàng; mảng mới, được phép ghi).
+        Tam giác trên nén: gom các ô (min, max) của hàng từ attract; mùi có hướng: tính từ các hàng
+        mùi và eta^beta (mùi vừa cập nhật cục bộ bởi ACS được đọc thẳng).
+        """
+        if attract is None:
+            rows = self.pheromone[cities]
+            if self.solver.alpha != 1.0:
+                rows **= self.solver.alpha
+            rows *= self.heuristic_beta[cities]
+            return rows
+        # Hàng c: ô j < c là _row_offsets[j] + c, ô j > c là _row_offsets[c] + j (giống edge_slots)
+        current = cities[:, None].astype(self._slot_dtype)
+        slots = np.where(self._cols < current, self._row_offsets + current,
+                         self._row_offsets[cities][:, None] + self._cols)
+        rows = attract.take(slots)
+        # Ô j = c (cạnh c -> c) không có trong mảng nén
+        rows[np.arange(len(cities)), cities] = 0.0
+        return rows
+
+    def unpack(self, values, out=None):
+        """
+        Bung mảng theo cạnh (cùng dạng với pheromone) thành mảng theo hàng: tam giác trên nén -> N x N
+        đối xứng (đường chéo = 0); mảng N x N hoặc N x k được trả về nguyên trạng.
+        """
+        if not self.packed:
+            return values
+        n = self.num_cities
+        if out is None:
+            out = np.zeros((n, n), dtype=values.dtype)
+        start = 0
+        for i in range(n - 1):
+            row = values[start:start + n - i - 1]
+            out[i, i + 1:] = row
+            out[i + 1:, i] = row
+            start += n - i - 1
+        return out
+
+    def run_iteration(self):
+        """
+        Một vòng lặp: xây dựng lời giải cho cả đàn, cập nhật lời giải tốt nhất, cập nhật mùi.
+        Trả về (mảng lộ trình hợp lệ, mảng chi phí tương ứng).
+        """
+        self.attract = self.attractiveness()
+        paths, costs = self.construct(self.attract)
+        valid = np.isfinite(costs)
+        paths, costs = paths[valid], costs[valid]
+        if len(costs) and self.solver.local_search:
+            self.improve(paths, costs)
+        if len(costs):
+            best = int(np.argmin(costs))
+            improved = costs[best] < self.solver.min_cost
+            if improved:
+                self.solver.min_cost = float(costs[best])
+                self.solver.best_path = paths[best].tolist()
+            self.strategy.global_update(self, paths, costs, improved)
+        return paths, costs
+
+    def improve(self, paths, costs):
+        """
+        Tìm kiếm cục bộ (2-opt + Or-opt theo láng giềng, don't-look bits) trên kiến tốt nhất vòng lặp
+        (local_search = "best") hoặc mọi con kiến ("all"), trước khi cập nhật mùi. Thay paths / costs tại chỗ.
+        """
+        solver = self.solver
+        if self.ls_neighbors is None:
+            self.ls_neighbors = neighbor_lists(self.tsp_problem, solver.ls_neighbors)
+        ants = range(len(costs)) if solver.local_search == "all" else [int(np.argmin(costs))]
+        for ant in ants:
+            path, cost = improve_tour_neighbors(self.tsp_problem, paths[ant].tolist(), self.ls_neighbors)
+            if cost < costs[ant]:
+                paths[ant] = path
+                costs[ant] = cost
+
+    def construct(self, attract):
+        """
+        Xây dựng lộ trình cho cả đàn (mỗi hàng là một con kiến), bắt đầu và kết thúc tại thành phố 0.
+        Kiến bị kẹt (không còn cạnh đi tiếp hoặc không có đường về) có chi phí inf.
+        """
+        solver = self.solver
+        n = self.num_cities
+        num_ants = solver.num_ants
+        ants = np.arange(num_ants)
+        paths = np.zeros((num_ants, n + 1), dtype=np.int64)
+        unvisited = np.ones((num_ants, n), dtype=bool)
+        unvisited[:, 0] = False
+        alive = np.ones(num_ants, dtype=bool)
+        current = paths[:, 0]
+
+        for step in range(1, n):
+            if not solver.is_running:
+                return paths, np.full(num_ants, np.inf)
+            # Giới hạn thời gian được kiểm tra cả giữa các bước (một vòng lặp có thể dài khi N lớn)
+            if solver.time_limit is not None and (step & 63) == 0 and solver.check_budget(solver.iterations_completed):
+                return paths, np.full(num_ants, np.inf)
+            weights = self.attract_rows(attract, current)
+            weights *= unvisited
+            if self.candidates is None:
+                next_city = self._choose(weights)
+            else:
+                # Kiến còn ứng viên chưa thăm thì chọn trong ứng viên (giống _select_from_candidates),
+                # các kiến còn lại xét toàn bộ thành phố
+                cand = self.candidates[current]
+                cand_weights = np.where(cand >= 0, weights[ants[:, None], np.maximum(cand, 0)], 0.0)
+                in_cand = cand_weights.sum(axis=1) > 0
+                next_city = np.empty(num_ants, dtype=np.int64)
+                next_city[in_cand] = cand[in_cand, self._choose(cand_weights[in_cand])]
+                next_city[~in_cand] = self._choose(weights[~in_cand])
+            alive &= weights.sum(axis=1) > 0
+            if self.strategy.local:
+                self.strategy.local_update(self, current[alive], next_city[alive])
+            paths[:, step] = next_city
+            unvisited[ants, next_city] = False
+            current = next_city
+
+        costs = self.tsp_problem.get_path_costs(paths)
+        costs[~alive] = np.inf
+        return paths, costs
+
+    def _roulette(self, weights):
+        """
+        Quay xổ số trên từng hàng của weights (B x M) bằng cumsum + searchsorted:
+        các hàng được chuẩn hóa về [0, 1] rồi dịch thêm chỉ số hàng, nối thành một dãy tăng
+        để một lần searchsorted chọn cho mọi hàng. Hàng toàn 0 trả về chỉ số bất kỳ (được loại sau).
+        """
+        rows, cols = weights.shape
+        # Cộng dồn ở float64 dù trọng số là float32 (tránh sai số tích lũy trên hàng dài)
+        cumulative = np.cumsum(weights, axis=1, dtype=np.float64)
+        totals = cumulative[:, -1:].copy()
+        totals[totals <= 0] = 1.0
+        cumulative /= totals
+        offsets = np.arange(rows, dtype=np.float64)
+        cumulative += offsets[:, None]
+        # Giá trị quay nằm trong [hàng, hàng + 1) - không vượt quá phần tử cuối của hàng do làm tròn
+        targets = np.minimum(offsets + self.rng.random(rows), np.nextafter(offsets + 1.0, 0.0))
+        picked = np.searchsorted(cumulative.ravel(), targets, side="right") - offsets.astype(np.int64) * cols
+        return np.clip(picked, 0, cols - 1)
+
+    def _choose(self, weights):
+        """
+        Chọn thành phố trên từng hàng của weights: quay xổ số, hoặc với xác suất q0 của chiến lược
+        (ACS) chọn ô hấp dẫn nhất.
+        """
+        picked = self._roulette(weights)
+        q0 = self.strategy.q0
+        if q0 > 0 and len(picked):
+            greedy = self.rng.random(len(picked)) < q0
+            picked[greedy] = np.argmax(weights[greedy], axis=1)
+        return picked
+
+    def edge_slots(self, sources, targets):
+        """
+        Vị trí phẳng của các cạnh sources[e] -> targets[e] trong mảng mùi (N x N: i * N + j;
+        tam giác trên nén: ô của cặp (min, max), -1 với cạnh i -> i).
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        if not self.packed:
+            return sources * self.num_cities + targets
+        low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+        return np.where(low < high, self._row_offsets[low] + high, -1)
+
+    def evaporate(self, factor):
+        """Nhân toàn bộ mùi với factor (= 1 - rho)."""
+        self.pheromone *= factor
+
+    def deposit(self, paths, amounts):
+        """Rải amounts[a] lên mọi cạnh i -> j của lộ trình paths[a] (bỏ qua cạnh không có trong mảng mùi)."""
+        deltas = np.repeat(amounts, paths.shape[1] - 1)
+        slots = self.edge_slots(paths[:, :-1].ravel(), paths[:, 1:].ravel())
+        found = slots >= 0
+        np.add.at(self.pheromone.reshape(-1), slots[found], deltas[found])
+
+    def refresh_attract(self, slots, sources, targets):
+        """
+        Tính lại độ hấp dẫn của các cạnh sources[e] -> targets[e] (ô slots[e] của mảng mùi)
+        sau khi mùi ở đó thay đổi giữa vòng lặp (bộ đệm cùng dạng với mảng mùi; mùi có hướng
+        không có bộ đệm nên không cần làm gì).
+        """
+        if self.attract is None:
+            return
+        values = self.pheromone.reshape(-1)[slots] ** self.solver.alpha * self.heuristic_beta.reshape(-1)[slots]
+        self.attract.reshape(-1)[slots] = values
+
+
+class CandidateACOEngine(NumpyACOEngine):
+    """
+    Bộ máy ACO theo danh sách ứng viên (engine = "candidate") cho bài toán hàng nghìn thành phố.
+
+    Mỗi bước chỉ xét k láng giềng gần nhất của thành phố hiện tại (O(k) thay vì O(N)); khi mọi
+    ứng viên đã được thăm, kiến đi tới thành phố chưa thăm GẦN NHẤT (chọn tất định). Pheromone và
+    heuristic chỉ được lưu trên các cạnh ứng viên: mảng N x k, cột c của hàng i ứng với cạnh
+    i -> candidates[i][c], nên bộ nhớ là O(N * k) thay vì N^2 và không cần ma trận khoảng cách đầy đủ
+    (dùng được với CoordTSPProblem). Cạnh không thuộc danh sách ứng viên không được rải mùi.
+    """
+
+    def _build_matrices(self):
+        """Tạo chỉ mục ứng viên, lấy eta^beta N x k (bộ đệm của bài toán) và tạo mảng pheromone N x k."""
+        solver = self.solver
+        n = self.num_cities
+        k = solver.candidate_k or DEFAULT_CANDIDATE_K
+        # Danh sách mở rộng đã sắp xếp theo chi phí -> k cột đầu chính là k láng giềng gần nhất
+        self.extended = self.tsp_problem.get_candidates(FALLBACK_FACTOR * k).astype(np.int64)
+        self.candidates = self.extended[:, :k]
+        k = self.candidates.shape[1]
+        self.num_choices = k
+        self.packed = False
+        self.row_attract = False
+
+        exists = self.candidates >= 0
+        rows = np.repeat(np.arange(n), k).reshape(n, k)
+
+        def build():
+            # Chi phí các cạnh ứng viên (tính theo lô, không đọc cả hàng ma trận)
+            pairs = np.stack([rows[exists], self.candidates[exists]], axis=1)
+            costs = np.full((n, k), np.inf)
+            costs[exists] = self.tsp_problem.get_path_costs(pairs)
+            eta = np.zeros((n, k), dtype=np.float32)
+            np.divide(1.0, costs, out=eta, where=np.isfinite(costs) & (costs > 0))
+            return _scaled_power(eta, solver.beta)
+
+        self.heuristic_beta = self.tsp_problem.get_derived(("aco_eta_beta_candidates", float(solver.beta), k), build)
+        self.pheromone = np.ones((n, k), dtype=np.float32)
+
+        # Khóa i * N + j của các cạnh ứng viên (đã sắp xếp) và vị trí phẳng tương ứng trong mảng N x k,
+        # để tra một cạnh bất kỳ bằng searchsorted khi rải mùi
+        keys = rows * n + self.candidates
+        slots = np.flatnonzero(exists)
+        order = np.argsort(keys.ravel()[slots], kind="stable")
+        self._edge_keys = keys.ravel()[slots][order]
+        self._edge_slots = slots[order]
+
+    def construct(self, attract):
+        """
+        Xây dựng lộ trình cho cả đàn: quay xổ số trên các ứng viên chưa thăm của thành phố hiện tại,
+        kiến đã hết ứng viên thì đi tới thành phố chưa thăm gần nhất.
+        """
+        solver = self.solver
+        n = self.num_cities
+        num_ants = solver.num_ants
+        ants = np.arange(num_ants)
+        paths = np.zeros((num_ants, n + 1), dtype=np.int64)
+        unvisited = np.ones((num_ants, n), dtype=bool)
+        unvisited[:, 0] = False
+        alive = np.ones(num_ants, dtype=bool)
+        current = paths[:, 0]
+
+        for step in range(1, n):
+            if not solver.is_running:
+                return paths, np.full(num_ants, np.inf)
+            if solver.time_limit is not None and (step & 63) == 0 and solver.check_budget(solver.iterations_completed):
+                return paths, np.full(num_ants, np.inf)
+            cand = self.candidates[current]
+            open_cand = (cand >= 0) & unvisited[ants[:, None], np.maximum(cand, 0)]
+            weights = attract[current] * open_cand
+            in_cand = weights.sum(axis=1) > 0
+            next_city = np.empty(num_ants, dtype=np.int64)
+            next_city[in_cand] = cand[in_cand, self._choose(weights[in_cand])]
+            if not in_cand.all():
+                # Hết ứng viên: thành phố chưa thăm đầu tiên trong danh sách mở rộng là thành phố gần nhất;
+                # chỉ khi cả danh sách mở rộng đã thăm hết mới tính chi phí tới mọi thành phố chưa thăm
+                fallback = np.flatnonzero(~in_cand)
+                ext = self.extended[current[fallback]]
+                open_ext = (ext >= 0) & unvisited[fallback[:, None], np.maximum(ext, 0)]
+                first = np.argmax(open_ext, axis=1)
+                found = open_ext[np.arange(len(fallback)), first]
+                next_city[fallback[found]] = ext[found, first[found]]
+                scan = fallback[~found]
+                if len(scan):
+                    next_city[scan], reachable = self._nearest_unvisited(current[scan], unvisited[scan])
+                    alive[scan[~reachable]] = False
+            if self.strategy.local:
+                self.strategy.local_update(self, current[alive], next_city[alive])
+            paths[:, step] = next_city
+            unvisited[ants, next_city] = False
+            current = next_city
+
+        costs = self.tsp_problem.get_path_costs(paths)
+        costs[~alive] = np.inf
+        return paths, costs
+
+    def _nearest_unvisited(self, current, unvisited):
+        """
+        Thành phố chưa thăm gần nhất của từng kiến (current[a], mặt nạ unvisited[a]).
+        Chỉ tính chi phí các cặp (thành phố hiện tại, thành phố chưa thăm) theo lô.
+        Trả về (thành phố, có đường đi hay không).
+        """
+        ant_pos, cities = np.nonzero(unvisited)
+        nearest = np.full(unvisited.shape, np.inf)
+        if len(cities):
+            nearest[ant_pos, cities] = self.tsp_problem.get_path_costs(
+                np.stack([current[ant_pos], cities], axis=1))
+        picked = np.argmin(nearest, axis=1)
+        return picked, np.isfinite(nearest[np.arange(len(current)), picked])
+
+    def edge_slots(self, sources, targets):
+        """Vị trí phẳng (trong mảng N x k) của các cạnh sources[e] -> targets[e]; -1 nếu không phải cạnh ứng viên."""
+        if len(self._edge_keys) == 0:
+            return np.full(len(sources), -1, dtype=np.int64)
+        query = sources * self.num_cities + targets
+        pos = np.minimum(np.searchsorted(self._edge_keys, query), len(self._edge_keys) - 1)
+        return np.where(self._edge_keys[pos] == query, self._edge_slots[pos], -1)
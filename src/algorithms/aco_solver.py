@@ -2,9 +2,54 @@
 import time
 import random
 import math
+from array import array
+import numpy as np
 from .base_solver import BaseSolver 
+from .aco_engine import NumpyACOEngine, CandidateACOEngine, heuristic_weights
+from .aco_convergence import ConvergenceMonitor, CONVERGENCE_ACTIONS
+from .local_search import improve_tour_neighbors, neighbor_lists
+
+# Các bộ máy xây dựng lời giải được hỗ trợ
+ACO_ENGINES = ("numpy", "candidate", "python")
+# Tìm kiếm cục bộ trước khi cập nhật mùi: không dùng, kiến tốt nhất vòng lặp, hoặc mọi con kiến
+LOCAL_SEARCH_MODES = (None, "best", "all")
 
 class ACOSolver(BaseSolver):
+    """
+    Ant Colony Optimization (đàn kiến) cho TSP.
+
+    Bộ máy (engine):
+      - "numpy" : cả đàn kiến tiến cùng nhau trên mảng NumPy (mặc định, nhanh hơn nhiều khi N lớn,
+                  xem NumpyACOEngine); pheromone_matrix / heuristic_matrix là mảng NumPy float32 N x N,
+                  hoặc tam giác trên nén N(N-1)/2 với bài toán đối xứng (pack_symmetric = True, mùi vô hướng).
+      - "candidate": mỗi bước chỉ xét candidate_k láng giềng gần nhất (mặc định 20), hết ứng viên thì
+                  đi tới thành phố chưa thăm gần nhất; pheromone / heuristic chỉ lưu trên các cạnh ứng viên
+                  (mảng N x k, xem CandidateACOEngine) - dùng cho bài toán hàng nghìn thành phố.
+      - "python": bản gốc từng con kiến, từng bước bằng vòng lặp Python (giữ lại để đối chiếu);
+                  mỗi hàng mùi là array('f'), mỗi hàng heuristic là memoryview float32 thay vì list các số float.
+    Bộ máy "numpy" và "python" dùng cùng xác suất chọn và luật cập nhật mùi nên cho kết quả
+    tương đương về thống kê (với mùi có hướng, pack_symmetric = False). seed cố định dãy ngẫu nhiên
+    của bộ máy NumPy (None = ngẫu nhiên). heuristic_matrix chứa sẵn eta^beta, tính một lần cho mỗi bài toán
+    và beta rồi dùng lại giữa các lần chạy (xem aco_engine.heuristic_weights).
+
+    Chiến lược cập nhật mùi (strategy, chỉ với bộ máy "numpy" / "candidate", xem aco_strategies.py):
+      - "as"  : Ant System như bản gốc (mọi con kiến rải mùi).
+      - "mmas": MAX-MIN Ant System - chỉ kiến tốt nhất rải mùi (mmas_deposit = "iteration" / "global"),
+                mùi kẹp trong [tau_min, tau_max] (p_best), khởi tạo lại sau restart_after vòng không cải thiện.
+      - "acs" : Ant Colony System - chọn tham lam với xác suất q0, cập nhật cục bộ (xi) sau mỗi bước,
+                chỉ lộ trình tốt nhất toàn cục được cập nhật toàn cục.
+    rho mặc định (0.5) hợp với "as"; "mmas" và "acs" nên dùng rho khoảng 0.02 - 0.1 và beta 2 - 5.
+
+    Tìm kiếm cục bộ (local_search = "best" / "all"): lộ trình của kiến tốt nhất vòng lặp (hoặc mọi con kiến)
+    được cải thiện bằng 2-opt + Or-opt trên ls_neighbors láng giềng gần nhất với don't-look bits
+    (xem local_search.improve_tour_neighbors) trước khi cập nhật mùi; đúng cho cả bài toán không đối xứng.
+
+    Dừng sớm khi hội tụ (mọi bộ máy, xem aco_convergence.py): stagnation_window (số vòng không cải thiện),
+    branching_threshold (hệ số phân nhánh lambda, ví dụ 2.1; 1.1 với mùi có hướng) và entropy_threshold
+    (entropy chuẩn hóa của mùi, ví dụ 0.2) - hai tiêu chí sau chỉ xét khi đã qua convergence_patience vòng không cải thiện.
+    Tiêu chí nào thỏa trước thì dừng (stop_reason = "converged", tiêu chí ghi ở convergence_reason),
+    hoặc với on_convergence = "restart" thì khởi tạo lại mùi, tối đa max_restarts lần rồi mới dừng.
+    """
 
     def __init__(self, tsp_problem):
         super().__init__(tsp_problem)
@@ -20,12 +65,45 @@ class ACOSolver(BaseSolver):
         self.pheromone_matrix = []
         self.heuristic_matrix = [] 
 
+        # Số ứng viên gần nhất được xét ở mỗi bước (None = xét mọi thành phố)
+        self.candidate_k = None
+        self.candidate_lists = []
+        self.engine = "numpy"
+        self.pack_symmetric = True      # Bài toán đối xứng: mùi vô hướng, lưu tam giác trên nén (bộ máy "numpy")
+        self.strategy = "as"
+        self.q0 = 0.9                   # ACS: xác suất chọn tham lam
+        self.xi = 0.1                   # ACS: hệ số cập nhật cục bộ
+        self.mmas_deposit = "iteration" # MMAS: kiến rải mùi ("iteration" hoặc "global")
+        self.p_best = 0.05              # MMAS: xác suất dựng lại lộ trình tốt nhất khi hội tụ (tính tau_min)
+        self.restart_after = 50         # MMAS: số vòng không cải thiện trước khi khởi tạo lại mùi (None = tắt)
+        self.local_search = None        # None, "best" hoặc "all"
+        self.ls_neighbors = 10          # Số láng giềng xét trong tìm kiếm cục bộ
+        self.seed = None
+        # Phát hiện hội tụ (None = tắt tiêu chí đó)
+        self.stagnation_window = None   # Số vòng lặp liên tiếp không cải thiện lời giải tốt nhất
+        self.branching_threshold = None # Ngưỡng hệ số phân nhánh lambda trung bình
+        self.branching_lambda = 0.05
+        self.entropy_threshold = None   # Ngưỡng entropy chuẩn hóa của mùi (0..1)
+        self.convergence_patience = 10  # Số vòng không cải thiện tối thiểu trước khi xét hai tiêu chí theo mùi
+        self.on_convergence = "stop"    # "stop" hoặc "restart" (khởi tạo lại mùi, giữ lời giải tốt nhất)
+        self.max_restarts = 5           # Số lần khởi động lại tối đa trước khi dừng hẳn
+        self.convergence_reason = None  # Tiêu chí đã kích hoạt lần gần nhất
+        self.convergence_restarts = 0   # Số lần đã khởi động lại do hội tụ
+        self.convergence_iteration = None # Vòng lặp (tính từ 1) khi dừng vì hội tụ
+        self._engine = None
+        self._ls_neighbors = None
+        # Các thành phố kế tiếp có đường đi thật của mỗi thành phố
+        self.successors = []
+        # Số vòng lặp đã chạy xong (node_limit của chế độ anytime tính theo vòng lặp)
+        self.iterations_completed = 0
+
     def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
         self.is_running = True
         self.start_timer()
 
-        matrix = self.tsp_problem.dist_matrix
         num_cities = self.tsp_problem.num_cities
+        # Dạng list of lists chỉ cần cho bộ máy "python" (bộ máy NumPy không dựng nó)
+        matrix = None
 
         if num_cities == 0:
             self.stop_timer()
@@ -33,54 +111,134 @@ class ACOSolver(BaseSolver):
                 finish_callback(self.best_path, self.min_cost, self.runtime)
             return
 
-        self._initialize_matrices(num_cities, matrix)
-        
         print("Bắt đầu chạy ACO...")
+        self.iterations_completed = 0
+        self.convergence_reason = None
+        self.convergence_restarts = 0
+        self.convergence_iteration = None
 
         try:
+            self._engine = None
+            self._ls_neighbors = None
+            if self.engine not in ACO_ENGINES:
+                raise ValueError(f"Bộ máy '{self.engine}' không hợp lệ. Hỗ trợ: {ACO_ENGINES}.")
+            if self.local_search not in LOCAL_SEARCH_MODES:
+                raise ValueError(f"Chế độ tìm kiếm cục bộ '{self.local_search}' không hợp lệ. Hỗ trợ: {LOCAL_SEARCH_MODES}.")
+            if self.on_convergence not in CONVERGENCE_ACTIONS:
+                raise ValueError(f"Hành động khi hội tụ '{self.on_convergence}' không hợp lệ. Hỗ trợ: {CONVERGENCE_ACTIONS}.")
+            if self.engine == "python" and self.strategy != "as":
+                raise ValueError(f"Chiến lược '{self.strategy}' chỉ hỗ trợ bộ máy 'numpy' hoặc 'candidate'.")
+            if self.engine in ("numpy", "candidate"):
+                engine_class = CandidateACOEngine if self.engine == "candidate" else NumpyACOEngine
+                self._engine = engine_class(self)
+                self.pheromone_matrix = self._engine.pheromone
+                self.heuristic_matrix = self._engine.heuristic_beta
+            else:
+                matrix = self.tsp_problem.dist_matrix
+                self._initialize_matrices(num_cities, matrix)
+            monitor = ConvergenceMonitor(self)
+            check_convergence = monitor.enabled()
+
             for iteration in range(self.max_iterations):
 
                 if not self.is_running:
                     print("ACO bị dừng.")
                     break
+                # Chế độ anytime: hết thời gian / số vòng lặp / đạt khoảng cách mục tiêu
+                if self.has_budget() and self.check_budget(iteration):
+                    print(f"ACO dừng theo ngân sách ({self.stop_reason}).")
+                    break
                 
-                # Xây dựng giải pháp cho đàn kiến
-                all_ant_paths = self._construct_ant_solutions(num_cities, matrix)
-
-                # Cập nhật mùi dựa trên các giải pháp HỢP LỆ
-                if all_ant_paths:
-                    self._update_pheromones(all_ant_paths, num_cities)
+                if self._engine is not None:
+                    # Bộ máy NumPy: xây dựng, cập nhật lời giải tốt nhất và cập nhật mùi trong một bước
+                    self._engine.run_iteration()
+                else:
+                    # Xây dựng giải pháp cho đàn kiến
+                    all_ant_paths = self._construct_ant_solutions(num_cities, matrix)
+                    if all_ant_paths and self.local_search:
+                        all_ant_paths = self._improve_ant_paths(all_ant_paths)
+
+                    # Cập nhật mùi dựa trên các giải pháp HỢP LỆ
+                    if all_ant_paths:
+                        self._update_pheromones(all_ant_paths, num_cities)
 
                 # Cập nhật giao diện (Callback) với lộ trình tốt nhất tìm thấy đến giờ
                 # (Tùy chọn: chỉ gọi callback mỗi 5-10 vòng để đỡ lag GUI)
                 if update_callback and self.best_path:
                    update_callback(self.best_path)
+                self.iterations_completed = iteration + 1
+
+                if check_convergence and self._check_convergence(monitor):
+                    print(f"ACO hội tụ ({self.convergence_reason}) sau {self.iterations_completed} vòng lặp.")
+                    break
 
                 if sleep_time > 0:
                     time.sleep(sleep_time)
 
         except Exception as e:
             print(f"Lỗi xảy ra trong ACO: {e}")
-        
+            self.stop_reason = "error"
+
+        # ACO không chứng minh được tối ưu → cận dưới rẻ, khoảng cách cho biết chất lượng lời giải
+        self.finish_anytime()
         self.stop_timer()
         if finish_callback:
             finish_callback(self.best_path, self.min_cost, self.runtime)
-        print(f"ACO hoàn thành. Chi phí: {self.min_cost}, Thời gian: {self.runtime:.4f}s")
+        print(f"ACO hoàn thành. Chi phí: {self.min_cost}, Khoảng cách: {self.gap:.2%}, Thời gian: {self.runtime:.4f}s")
+
+    def _check_convergence(self, monitor):
+        """
+        Kiểm tra hội tụ sau một vòng lặp. Khởi tạo lại mùi nếu on_convergence = "restart" và còn lượt;
+        trả về True (và ghi stop_reason = "converged") nếu phải dừng.
+        Mùi và mặt nạ cạnh được truyền dạng hàm: chỉ bung ra N x N khi monitor thật sự cần.
+        """
+        reason = monitor.update(self.pheromone_rows, self._usable_edges)
+        if reason is None:
+            return False
+        self.convergence_reason = reason
+        if self.on_convergence == "restart" and self.convergence_restarts < self.max_restarts:
+            if self._engine is not None:
+                self._engine.strategy.reset(self._engine)
+            else:
+                for row in self.pheromone_matrix:
+                    row[:] = array('f', [1.0]) * len(row)
+            self.convergence_restarts += 1
+            monitor.reset()
+            return False
+        self.convergence_iteration = self.iterations_completed
+        self.stop_reason = "converged"
+        return True
+
+    def pheromone_rows(self):
+        """Mùi hiện tại theo hàng: N x N (bung tam giác trên nén nếu có), hoặc N x k với bộ máy "candidate"."""
+        return self._rows(self.pheromone_matrix)
+
+    def _usable_edges(self):
+        """Mặt nạ cạnh dùng được (heuristic > 0) cùng kích thước với pheromone_rows()."""
+        return self._rows(self.heuristic_matrix) > 0
+
+    def _rows(self, values):
+        if self._engine is not None:
+            return self._engine.unpack(values)
+        return np.asarray(values)
 
     def _initialize_matrices(self, num_cities, matrix):
-        # Khởi tạo pheromone ban đầu
-        self.pheromone_matrix = [[1.0] * num_cities for _ in range(num_cities)]
-        # Khởi tạo heuristic (Visibility = 1 / distance)
-        self.heuristic_matrix = [[0.0] * num_cities for _ in range(num_cities)]
-        for i in range(num_cities):
-            for j in range(num_cities):
-                if i != j:
-                    dist = matrix[i][j]
-                    # [SỬA] Chỉ tính heuristic nếu có đường đi và > 0
-                    if dist != float('inf') and dist > 0:
-                        self.heuristic_matrix[i][j] = 1.0 / dist
-                    else:
-                        self.heuristic_matrix[i][j] = 0.0
+        # Khởi tạo pheromone ban đầu (mỗi hàng là array float32: 4 byte / ô thay vì một đối tượng float)
+        self.pheromone_matrix = [array('f', [1.0]) * num_cities for _ in range(num_cities)]
+        # Heuristic (Visibility = 1 / distance) đã lũy thừa beta, đọc thẳng từ bộ đệm của bài toán
+        # (memoryview theo hàng, không sao chép); chỉ > 0 nếu có đường đi và khoảng cách > 0
+        weights = heuristic_weights(self.tsp_problem, self.beta)
+        self.heuristic_matrix = [memoryview(row) for row in weights]
+
+        # Chỉ duyệt các cạnh có thật khi tính xác suất
+        self.successors = self.tsp_problem.successor_lists(by="index")
+
+        # Danh sách ứng viên lấy từ chỉ mục k láng giềng của bài toán
+        if self.candidate_k:
+            candidates = self.tsp_problem.get_candidates(self.candidate_k)
+            self.candidate_lists = [[c for c in row if c >= 0] for row in candidates.tolist()]
+        else:
+            self.candidate_lists = []
 
     def _construct_ant_solutions(self, num_cities, matrix):
         all_ant_paths = []
@@ -88,6 +246,9 @@ class ACOSolver(BaseSolver):
         for _ in range(self.num_ants):
             if not self.is_running:
                 break
+            # Giới hạn thời gian được kiểm tra cả giữa các con kiến (vòng lặp có thể dài khi N lớn)
+            if self.time_limit is not None and self.check_budget(self.iterations_completed):
+                break
 
             path, cost = self._build_single_ant_path(num_cities, matrix)
             
@@ -102,15 +263,33 @@ class ACOSolver(BaseSolver):
 
         return all_ant_paths
 
+    def _improve_ant_paths(self, all_ant_paths):
+        """Tìm kiếm cục bộ cho bộ máy "python" (kiến tốt nhất hoặc mọi con kiến), cập nhật Global Best."""
+        if self._ls_neighbors is None:
+            self._ls_neighbors = neighbor_lists(self.tsp_problem, self.ls_neighbors)
+        if self.local_search == "all":
+            targets = range(len(all_ant_paths))
+        else:
+            targets = [min(range(len(all_ant_paths)), key=lambda k: all_ant_paths[k][1])]
+        improved = list(all_ant_paths)
+        for k in targets:
+            path, cost = improve_tour_neighbors(self.tsp_problem, improved[k][0], self._ls_neighbors)
+            if cost < improved[k][1]:
+                improved[k] = (path, cost)
+                if cost < self.min_cost:
+                    self.min_cost = cost
+                    self.best_path = path
+        return improved
+
     def _calculate_probabilities(self, current_city, visited, num_cities):
         probabilities = [0.0] * num_cities
         total_prob = 0.0
         
-        for next_city in range(num_cities):
+        for next_city in self.successors[current_city]:
             # Chỉ xét các thành phố chưa thăm VÀ có đường đi (heuristic > 0)
             if not visited[next_city] and self.heuristic_matrix[current_city][next_city] > 0:
                 pher = self.pheromone_matrix[current_city][next_city] ** self.alpha
-                heu = self.heuristic_matrix[current_city][next_city] ** self.beta
+                heu = self.heuristic_matrix[current_city][next_city]
                 
                 prob = pher * heu
                 probabilities[next_city] = prob
@@ -139,13 +318,17 @@ class ACOSolver(BaseSolver):
                 return None, float('inf')
 
             current = path[-1]
-            probs = self._calculate_probabilities(current, visited, num_cities)
 
-            # [SỬA] Nếu probs là None nghĩa là kiến bị kẹt -> Hủy lộ trình này
-            if probs is None:
-                return None, float('inf')
+            # Ưu tiên chọn trong danh sách ứng viên (O(k)); hết ứng viên thì xét toàn bộ
+            next_city = self._select_from_candidates(current, visited) if self.candidate_lists else None
+            if next_city is None:
+                probs = self._calculate_probabilities(current, visited, num_cities)
+
+                # [SỬA] Nếu probs là None nghĩa là kiến bị kẹt -> Hủy lộ trình này
+                if probs is None:
+                    return None, float('inf')
 
-            next_city = self._roulette_select(probs)
+                next_city = self._roulette_select(probs)
             
             # Cộng chi phí
             cost_move = matrix[current][next_city]
@@ -166,6 +349,32 @@ class ACOSolver(BaseSolver):
 
         return (path, current_cost)
 
+    def _select_from_candidates(self, current_city, visited):
+        """
+        Chọn thành phố tiếp theo chỉ trong danh sách ứng viên của current_city (quay xổ số theo trọng số).
+        Trả về None nếu mọi ứng viên đã được thăm.
+        """
+        cities = []
+        weights = []
+        total = 0.0
+        for next_city in self.candidate_lists[current_city]:
+            if not visited[next_city] and self.heuristic_matrix[current_city][next_city] > 0:
+                w = (self.pheromone_matrix[current_city][next_city] ** self.alpha
+                     * self.heuristic_matrix[current_city][next_city])
+                cities.append(next_city)
+                weights.append(w)
+                total += w
+        if total == 0:
+            return None
+
+        r = random.random() * total
+        cumulative = 0.0
+        for city, w in zip(cities, weights):
+            cumulative += w
+            if r <= cumulative:
+                return city
+        return cities[-1]
+
     def _roulette_select(self, probabilities):
         r = random.random()
         cumulative = 0.0
@@ -0,0 +1,170 @@
+# src/algorithms/aco_strategies.py
+"""
+Các chiến lược cập nhật mùi (pheromone) của ACO, dùng với bộ máy "numpy" và "candidate".
+
+Mọi chiến lược có cùng giao diện:
+    strategy.setup(engine)
+        -> gọi một lần sau khi bộ máy tạo xong các mảng (đặt mùi ban đầu).
+    strategy.reset(engine)
+        -> khởi tạo lại mùi về mức ban đầu (khởi động lại khi đàn kiến hội tụ, xem aco_convergence.py).
+    strategy.q0
+        -> xác suất chọn tham lam (thành phố hấp dẫn nhất) ở mỗi bước; 0 = luôn quay xổ số.
+    strategy.local_update(engine, sources, targets)
+        -> sau mỗi bước xây dựng, với các cạnh vừa đi (chỉ khi strategy.local = True).
+    strategy.global_update(engine, paths, costs, improved)
+        -> cuối mỗi vòng lặp với các lộ trình hợp lệ; improved = True nếu lời giải tốt nhất vừa được cải thiện.
+Chiến lược chỉ thao tác qua các hàm của bộ máy (evaporate, deposit, edge_slots, refresh_attract)
+nên dùng được cho mảng mùi N x N, tam giác trên nén (bài toán đối xứng) và mảng N x k theo danh sách ứng viên.
+"""
+import numpy as np
+
+ACO_STRATEGIES = ("as", "mmas", "acs")
+
+
+def make_strategy(name, solver):
+    """Tạo chiến lược cập nhật mùi theo tên."""
+    if name == "as":
+        return AntSystem(solver)
+    if name == "mmas":
+        return MaxMinAntSystem(solver)
+    if name == "acs":
+        return AntColonySystem(solver)
+    raise ValueError(f"Chiến lược ACO '{name}' không hợp lệ. Hỗ trợ: {ACO_STRATEGIES}.")
+
+
+def estimate_tour_length(solver):
+    """Ước lượng độ dài lộ trình (cho mùi ban đầu) bằng cận dưới rẻ; 1.0 nếu không dùng được."""
+    estimate = solver.simple_lower_bound()
+    return estimate if np.isfinite(estimate) and estimate > 0 else 1.0
+
+
+class AntSystem:
+    """
+    Ant System (như bản gốc): mọi cạnh bay hơi theo rho (kẹp ở 1e-10),
+    mọi con kiến hợp lệ rải Q / chi phí lên các cạnh của nó.
+    """
+
+    name = "as"
+    q0 = 0.0
+    local = False
+
+    def __init__(self, solver):
+        self.solver = solver
+
+    def setup(self, engine):
+        pass
+
+    def reset(self, engine):
+        engine.pheromone.fill(1.0)
+
+    def local_update(self, engine, sources, targets):
+        pass
+
+    def global_update(self, engine, paths, costs, improved):
+        engine.evaporate(1.0 - self.solver.rho)
+        np.maximum(engine.pheromone, 1e-10, out=engine.pheromone)
+        positive = costs > 0
+        if positive.any():
+            engine.deposit(paths[positive], self.solver.Q / costs[positive])
+
+
+class MaxMinAntSystem(AntSystem):
+    """
+    MAX-MIN Ant System (Stützle & Hoos):
+      - chỉ một con kiến rải mùi: tốt nhất vòng lặp (mmas_deposit = "iteration") hoặc tốt nhất toàn cục ("global");
+      - mùi bị kẹp trong [tau_min, tau_max], tính lại mỗi khi lời giải tốt nhất thay đổi:
+            tau_max = Q / (rho * L_best),
+            tau_min = tau_max * (1 - p^(1/n)) / ((avg - 1) * p^(1/n)),  p = p_best, avg = số lựa chọn / 2;
+      - mùi ban đầu = tau_max (đặt sau vòng lặp đầu tiên - mùi đều nên không ảnh hưởng vòng đầu);
+      - trì trệ: sau restart_after vòng lặp không cải thiện, mùi được khởi tạo lại về tau_max.
+    """
+
+    name = "mmas"
+
+    def __init__(self, solver):
+        super().__init__(solver)
+        self.tau_max = None
+        self.tau_min = 0.0
+        self.stale_iterations = 0
+        self.restarts = 0
+
+    def _update_limits(self, engine):
+        solver = self.solver
+        self.tau_max = solver.Q / (solver.rho * solver.min_cost) if solver.min_cost > 0 else 1.0
+        n = max(engine.num_cities, 2)
+        avg = engine.num_choices / 2.0
+        p = solver.p_best ** (1.0 / n)
+        self.tau_min = self.tau_max * (1.0 - p) / ((avg - 1.0) * p) if avg > 1.0 else 0.0
+        self.tau_min = min(self.tau_min, self.tau_max)
+
+    def reset(self, engine):
+        engine.pheromone.fill(self.tau_max if self.tau_max is not None else 1.0)
+        self.stale_iterations = 0
+
+    def global_update(self, engine, paths, costs, improved):
+        solver = self.solver
+        first = self.tau_max is None
+        if first or improved:
+            self._update_limits(engine)
+        if first:
+            engine.pheromone.fill(self.tau_max)
+
+        engine.evaporate(1.0 - solver.rho)
+        if solver.mmas_deposit == "global":
+            best_path, best_cost = np.asarray([solver.best_path]), solver.min_cost
+        else:
+            best = int(np.argmin(costs))
+            best_path, best_cost = paths[best:best + 1], costs[best]
+        if best_cost > 0:
+            engine.deposit(best_path, np.array([solver.Q / best_cost]))
+        np.clip(engine.pheromone, self.tau_min, self.tau_max, out=engine.pheromone)
+
+        # Trì trệ: khởi tạo lại mùi để đàn kiến thăm dò lại
+        self.stale_iterations = 0 if improved else self.stale_iterations + 1
+        if solver.restart_after and self.stale_iterations >= solver.restart_after:
+            engine.pheromone.fill(self.tau_max)
+            self.stale_iterations = 0
+            self.restarts += 1
+
+
+class AntColonySystem(AntSystem):
+    """
+    Ant Colony System (Dorigo & Gambardella):
+      - quy tắc tỉ lệ giả ngẫu nhiên: với xác suất q0 chọn thành phố hấp dẫn nhất, ngược lại quay xổ số;
+      - cập nhật cục bộ sau mỗi bước trên cạnh vừa đi: tau = (1 - xi) * tau + xi * tau0;
+      - cập nhật toàn cục chỉ trên lộ trình tốt nhất toàn cục: tau = (1 - rho) * tau + rho * Q / L_best.
+    tau0 = Q / (n * L), với L ước lượng bằng cận dưới rẻ (tổng cạnh ra nhỏ nhất).
+    """
+
+    name = "acs"
+    local = True
+
+    def __init__(self, solver):
+        super().__init__(solver)
+        self.q0 = solver.q0
+        self.tau0 = 1.0
+
+    def setup(self, engine):
+        self.tau0 = self.solver.Q / (max(engine.num_cities, 1) * estimate_tour_length(self.solver))
+        engine.pheromone.fill(self.tau0)
+
+    def reset(self, engine):
+        engine.pheromone.fill(self.tau0)
+
+    def local_update(self, engine, sources, targets):
+        slots = engine.edge_slots(sources, targets)
+        found = slots >= 0
+        slots = slots[found]
+        flat = engine.pheromone.reshape(-1)
+        flat[slots] = (1.0 - self.solver.xi) * flat[slots] + self.solver.xi * self.tau0
+        engine.refresh_attract(slots, sources[found], targets[found])
+
+    def global_update(self, engine, paths, costs, improved):
+        solver = self.solver
+        if not solver.best_path or solver.min_cost <= 0:
+            return
+        best = np.asarray(solver.best_path)
+        slots = engine.edge_slots(best[:-1], best[1:])
+        slots = slots[slots >= 0]
+        flat = engine.pheromone.reshape(-1)
+        flat[slots] = (1.0 - solver.rho) * flat[slots] + solver.rho * solver.Q / solver.min_cost
@@ -2,6 +2,7 @@
 
 import time
 from .base_solver import BaseSolver
+from .tree_estimate import knuth_estimate
 
 
 class BacktrackSolver(BaseSolver):
@@ -14,6 +15,10 @@ class BacktrackSolver(BaseSolver):
     def __init__(self, tsp_problem):
         # Gọi hàm khởi tạo lớp cha (BaseSolver)
         super().__init__(tsp_problem)
+        # Danh sách thành phố kế tiếp có đường đi thật (theo thứ tự chỉ số)
+        self.successors = []
+        # Số lần thăm dò Knuth khi ước lượng kích thước cây (chỉ dùng khi có progress_callback)
+        self.estimate_probes = 200
 
     def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
         """
@@ -38,6 +43,11 @@ class BacktrackSolver(BaseSolver):
 
         print("Bắt đầu chạy Backtrack cơ bản...")
 
+        # Chỉ duyệt các cạnh có thật (bỏ qua cạnh inf ngay từ đầu, không kiểm tra lại ở mỗi nút)
+        self.successors = self.tsp_problem.successor_lists(by="index")
+
+        self.nodes_explored = 0
+
         # Mảng đánh dấu các thành phố đã đi
         visited = [False] * num_cities
 
@@ -45,6 +55,8 @@ class BacktrackSolver(BaseSolver):
         current_path = [0]
         visited[0] = True
 
+        # Chỉ khi lần duyệt kết thúc bình thường mới có thể kết luận tối ưu (lỗi bị bắt không phải là "duyệt hết")
+        completed = False
         try:
             self._backtrack_recursive(
                 current_city=0,
@@ -57,8 +69,14 @@ class BacktrackSolver(BaseSolver):
                 update_callback=update_callback,
                 sleep_time=sleep_time
             )
+            completed = self.is_running
         except Exception as e:
             print(f"Lỗi: {e}")
+            self.stop_reason = "error"
+
+        self.report_progress(self.nodes_explored, fraction=1.0 if completed else None, force=True)
+        # Bản cơ bản không có giới hạn dưới riêng → chỉ dùng cận dưới rẻ khi dừng sớm
+        self.finish_anytime(complete=completed)
 
         # Khi chạy xong → dừng timer
         self.stop_timer()
@@ -69,6 +87,11 @@ class BacktrackSolver(BaseSolver):
 
         print(f"Backtrack cơ bản hoàn thành. Chi phí: {self.min_cost}, Thời gian: {self.runtime:.4f}s")
 
+    def estimate_tree_size(self):
+        """Bản cơ bản không cắt tỉa nên cây chỉ phụ thuộc vào đồ thị: ước lượng Knuth không cắt tỉa."""
+        return knuth_estimate(self.tsp_problem.dist_matrix, self.successors,
+                              probes=self.estimate_probes)
+
     def _backtrack_recursive(self, current_city, count, current_cost,
                              current_path, visited, matrix, num_cities,
                              update_callback, sleep_time):
@@ -86,6 +109,15 @@ class BacktrackSolver(BaseSolver):
         if not self.is_running:
             return
 
+        # Đếm nút và báo tiến độ (nếu có progress_callback)
+        self.nodes_explored += 1
+        if (self.nodes_explored & 1023) == 0:
+            if self.progress_due():
+                self.report_progress(self.nodes_explored)
+            # Chế độ anytime: hết thời gian / số nút / đạt khoảng cách mục tiêu → dừng
+            if self.has_budget() and self.check_budget(self.nodes_explored):
+                return
+
         # (Bản cơ bản KHÔNG cắt tỉa nhánh)
         # Vì để chứng minh tốc độ chậm hơn bản cải tiến.
         # if current_cost >= self.min_cost:
@@ -116,18 +148,14 @@ class BacktrackSolver(BaseSolver):
             return  # Kết thúc nhánh đệ quy
 
         # ======== RECURSION STEP ========
-        # Thử đi qua từng thành phố tiếp theo
-        for next_city in range(num_cities):
+        # Thử đi qua từng thành phố tiếp theo (chỉ những thành phố có đường đi)
+        for next_city in self.successors[current_city]:
 
             # Chỉ xem thành phố chưa đi
             if not visited[next_city]:
 
                 cost_to_next = matrix[current_city][next_city]
 
-                # Nếu giữa 2 thành phố không có đường (inf) → bỏ qua
-                if cost_to_next == float('inf'):
-                    continue
-
                 # Đánh dấu đã đi
                 visited[next_city] = True
                 current_path.append(next_city)
@@ -1,17 +1,57 @@
 # src/algorithms/backtrack_solver_improved.py
 import time
+
+import numpy as np
+
 from .base_solver import BaseSolver
+from .bitmask_dfs import BitmaskDFSEngine
+from .warm_start import apply_warm_start, pheromone_order
+from .tree_estimate import knuth_estimate
+from .checkpoint import (problem_fingerprint, pack_lists, unpack_lists,
+                         save_checkpoint, load_checkpoint, remove_checkpoint)
 
 class BacktrackSolverImproved(BaseSolver):
     """
     Backtracking cải tiến dùng:
       - LCV (Least Cost Value) - Sắp xếp thứ tự duyệt
       - Lower Bound Pruning (Cắt tỉa theo giới hạn dưới)
+    Thứ tự duyệt lấy từ chỉ mục ứng viên của TSPProblem (tính một lần, đã sắp xếp),
+    không phải sắp xếp lại ở mỗi nút.
+
+    Bộ máy tìm kiếm (engine):
+      - "bitmask"  : ngăn xếp tường minh + bitmask (mặc định, nhanh hơn, xem BitmaskDFSEngine)
+      - "recursive": bản đệ quy gốc (giữ lại để đối chiếu)
+    Hai bộ máy cho cùng chi phí tối ưu. Bộ máy "bitmask" còn có thêm:
+      - symmetry_breaking: "auto" (bật khi ma trận đối xứng), True hoặc False - mỗi chu trình chỉ duyệt một chiều
+      - dominance_cache_size: số trạng thái (tập đã thăm, thành phố hiện tại) được nhớ để cắt nhánh bị trội (0 = tắt)
+
+    Có thể khởi động nóng (warm_start = "nearest" / "aco") để có cận trên ngay từ đầu;
+    với "aco" và pheromone_guidance = True, thứ tự rẽ nhánh theo pheromone thay vì theo chi phí.
+
+    Chế độ anytime (time_limit, node_limit, target_gap) chỉ áp dụng cho bộ máy "bitmask":
+    khi dừng sớm, lower_bound = giới hạn nhỏ nhất của các nhánh chưa duyệt.
+
+    Checkpoint (bộ máy "bitmask", checkpoint_path khác None): ngăn xếp tường minh, lời giải tốt nhất,
+    thứ tự rẽ nhánh và các bộ đếm được lưu mỗi checkpoint_interval giây và khi bị dừng; lần chạy sau
+    với cùng bài toán tiếp tục từ checkpoint (bỏ qua khởi động nóng). Chạy xong thì file bị xóa.
     """
 
     def __init__(self, tsp_problem):
         super().__init__(tsp_problem)
         self.min_edge = []
+        self.sorted_successors = []
+        self.engine = "bitmask"
+        self._engine = None
+        # Số lần thăm dò Knuth khi ước lượng kích thước cây (chỉ dùng khi có progress_callback)
+        self.estimate_probes = 200
+        self.pheromone_guidance = False
+        self.symmetry_breaking = "auto"
+        self.dominance_cache_size = 100000
+        # File checkpoint (.npz, None = không lưu) và chu kỳ lưu (giây)
+        self.checkpoint_path = None
+        self.checkpoint_interval = 60.0
+        self.resumed = False
+        self._fingerprint = None
 
     def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
         self.is_running = True
@@ -35,33 +75,111 @@ class BacktrackSolverImproved(BaseSolver):
         current_path = [0]
         visited[0] = True
 
+        # Danh sách thành phố kế tiếp (chỉ cạnh có thật) của mỗi thành phố, đã sắp xếp tăng dần theo chi phí
+        self.sorted_successors = self.tsp_problem.successor_lists(by="cost")
+
         # TÍNH TOÁN TRƯỚC CHO BOUND
-        # Tìm cạnh nhỏ nhất đi ra từ mỗi thành phố (bỏ qua 0 và inf)
-        self.min_edge = []
-        for row in matrix:
-            valid_costs = [c for c in row if c > 0 and c != float('inf')]
-            self.min_edge.append(min(valid_costs) if valid_costs else 0)
+        # Cạnh nhỏ nhất đi ra từ mỗi thành phố = thành phố kế tiếp đầu tiên (đã sắp xếp, bỏ inf và chính nó).
+        # Cạnh chi phí 0 vẫn được tính: bỏ qua chúng làm giới hạn vượt chi phí thật và cắt mất lời giải tối ưu
+        self.min_edge = [matrix[city][successors[0]] if successors else 0
+                         for city, successors in enumerate(self.sorted_successors)]
+
+        # CHECKPOINT: tiếp tục lần chạy trước (nếu có) thay cho khởi động nóng
+        state = None
+        self.resumed = False
+        if self.checkpoint_path and self.engine == "bitmask":
+            self._fingerprint = problem_fingerprint(self.tsp_problem)
+            state = load_checkpoint(self.checkpoint_path, type(self).__name__, self._fingerprint)
+
+        if state is not None:
+            self.resumed = True
+            self.sorted_successors = unpack_lists(state["successors"], state["successor_offsets"])
+            self.min_cost = float(state["min_cost"])
+            self.best_path = state["best_path"].tolist()
+            if update_callback and self.best_path:
+                update_callback(self.best_path)
+            print(f"Tiếp tục từ checkpoint {self.checkpoint_path}: chi phí {self.min_cost}, "
+                  f"đã duyệt {int(state['nodes_explored'])} nút")
+        else:
+            # KHỞI ĐỘNG NÓNG: cận trên ban đầu từ heuristic (+ dẫn hướng rẽ nhánh bằng pheromone)
+            apply_warm_start(self, update_callback)
+            if self.pheromone_guidance and self.warm_start_pheromone is not None:
+                self.sorted_successors = pheromone_order(self.sorted_successors, self.warm_start_pheromone, matrix)
 
         try:
-            self._backtrack_recursive_improved(
-                current_city=0,
-                count=1,
-                current_cost=0,
-                current_path=current_path,
-                visited=visited,
-                matrix=matrix,
-                num_cities=num_cities,
-                update_callback=update_callback,
-                sleep_time=sleep_time
-            )
+            if self.engine == "bitmask":
+                engine = BitmaskDFSEngine(self, matrix, self.sorted_successors, self.min_edge, start_city=0)
+                if self.symmetry_breaking == "auto":
+                    engine.symmetric = self.tsp_problem.is_symmetric
+                else:
+                    engine.symmetric = bool(self.symmetry_breaking)
+                engine.cache_size = self.dominance_cache_size
+                resume = None
+                if state is not None:
+                    resume = (state["stack_city"].tolist(), state["stack_cost"].tolist(), state["stack_pos"].tolist())
+                    engine.nodes_explored = int(state["nodes_explored"])
+                    engine.nodes_pruned = int(state["nodes_pruned"])
+                if self.checkpoint_path:
+                    engine.checkpoint_callback = self._save_checkpoint
+                    engine.checkpoint_interval = self.checkpoint_interval
+                self._engine = engine
+                engine.run(update_callback=update_callback, sleep_time=sleep_time, resume=resume)
+                self.nodes_explored = engine.nodes_explored
+                self.nodes_pruned = engine.nodes_pruned
+                self.report_progress(self.nodes_explored, self.nodes_pruned,
+                                     fraction=1.0 if self.is_running else None, force=True)
+                # Cận dưới: nhánh còn mở rẻ nhất (inf = đã duyệt hết → lời giải tối ưu)
+                self.finish_anytime(engine.open_bound, complete=engine.open_bound == float('inf'))
+                if self.checkpoint_path and engine.open_bound == float('inf'):
+                    remove_checkpoint(self.checkpoint_path)
+            else:
+                self._backtrack_recursive_improved(
+                    current_city=0,
+                    count=1,
+                    current_cost=0,
+                    current_path=current_path,
+                    visited=visited,
+                    matrix=matrix,
+                    num_cities=num_cities,
+                    update_callback=update_callback,
+                    sleep_time=sleep_time
+                )
+                # Chỉ đến được đây khi lần duyệt kết thúc bình thường (không bị lỗi giữa chừng)
+                self.finish_anytime(complete=self.is_running)
         except Exception as e:
             print(f"Lỗi trong quá trình chạy Improved: {e}")
+            # Lời giải tốt nhất vẫn giữ, nhưng không được coi là đã chứng minh tối ưu
+            self.stop_reason = "error"
+            self.finish_anytime()
 
         self.stop_timer()
         if finish_callback:
             finish_callback(self.best_path, self.min_cost, self.runtime)
 
-        print(f"Backtrack cải tiến hoàn thành. Chi phí: {self.min_cost}, Thời gian: {self.runtime:.4f}s")
+        print(f"Backtrack cải tiến hoàn thành. Chi phí: {self.min_cost}, Cận dưới: {self.lower_bound}, "
+              f"Thời gian: {self.runtime:.4f}s")
+
+    def _save_checkpoint(self, stack_city, stack_cost, stack_pos, nodes, pruned):
+        """Ghi trạng thái của bộ máy bitmask (gọi định kỳ và khi dừng giữa chừng)."""
+        successors, offsets = pack_lists(self.sorted_successors)
+        save_checkpoint(self.checkpoint_path, type(self).__name__, self._fingerprint,
+                        stack_city=np.asarray(stack_city, dtype=np.int32),
+                        stack_cost=np.asarray(stack_cost, dtype=np.float64),
+                        stack_pos=np.asarray(stack_pos, dtype=np.int32),
+                        successors=successors, successor_offsets=offsets,
+                        min_cost=self.min_cost,
+                        best_path=np.asarray(self.best_path, dtype=np.int32),
+                        nodes_explored=nodes, nodes_pruned=pruned)
+
+    def estimate_tree_size(self):
+        """Ước lượng Knuth với cùng luật cắt tỉa của bộ máy bitmask (không tính bộ đệm trội)."""
+        if self._engine is None:
+            return 0
+        guard = None
+        if self._engine.symmetric and len(self.sorted_successors[0]) >= 2:
+            guard = (self.sorted_successors[0][0], self.sorted_successors[0][1])
+        return knuth_estimate(self._engine.matrix, self.sorted_successors, self.min_edge,
+                              upper_bound=self.min_cost, guard=guard, probes=self.estimate_probes)
 
     def _backtrack_recursive_improved(self, current_city, count, current_cost, current_path,
                                    visited, matrix, num_cities, update_callback, sleep_time):
@@ -144,16 +262,6 @@ class BacktrackSolverImproved(BaseSolver):
         """
         Trả về danh sách các thành phố tiếp theo chưa thăm, 
         được sắp xếp tăng dần theo chi phí đi từ current_city.
+        Danh sách đã sắp xếp sẵn (không gồm cạnh inf) nên chỉ cần lọc các thành phố đã thăm.
         """
-        candidates = []
-        for i in range(num_cities):
-            if not visited[i]:
-                cost = matrix[current_city][i]
-                if cost != float('inf'): # Chỉ thêm nếu có đường đi
-                    candidates.append((i, cost))
-        
-        # Sắp xếp theo chi phí (thành phần thứ 2 của tuple)
-        candidates.sort(key=lambda x: x[1])
-        
-        # Trả về danh sách chỉ số thành phố
-        return [c[0] for c in candidates]
+        return [c for c in self.sorted_successors[current_city] if not visited[c]]
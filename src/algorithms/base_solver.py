@@ -26,6 +26,33 @@ class BaseSolver(ABC):
         self.is_running = False        # Cờ kiểm soát luồng (Control Flag) để xử lý dừng/chạy
         self._start_time = 0           # Biến nội bộ để tính toán thời gian
 
+        # Khởi động nóng cho các bộ giải chính xác (xem warm_start.py)
+        self.warm_start = None                 # None, "nearest" hoặc "aco"
+        self.warm_start_iterations = 20        # Số vòng lặp ACO khi warm_start = "aco"
+        self.warm_start_cost = float('inf')    # Chi phí lộ trình khởi động (báo cáo riêng)
+        self.warm_start_time = 0               # Thời gian của bước khởi động
+        self.warm_start_pheromone = None       # Ma trận pheromone của ACO khởi động (nếu có)
+
+        # Thống kê và tiến độ (xem report_progress)
+        self.nodes_explored = 0                # Số nút đã sinh ra
+        self.nodes_pruned = 0                  # Số nút bị cắt tỉa
+        self.estimated_nodes = 0               # Ước lượng tổng số nút của cây tìm kiếm
+        self.progress_callback = None          # Hàm nhận dict tiến độ (None = không báo)
+        self.progress_interval = 0.5           # Khoảng cách tối thiểu (giây) giữa hai lần báo
+        self._next_progress_time = 0
+        self._estimate_cost = None             # Cận trên đã dùng cho lần ước lượng gần nhất
+
+        # Chế độ "anytime": ngân sách chạy và chất lượng lời giải (xem check_budget / finish_anytime)
+        self.time_limit = None                 # Giới hạn thời gian (giây, None = không giới hạn)
+        self.node_limit = None                 # Giới hạn số nút (tìm kiếm cây) hoặc số vòng lặp (ACO)
+        self.target_gap = None                 # Dừng khi khoảng cách tương đối <= target_gap (ví dụ 0.01)
+        self.lower_bound = 0                   # Cận dưới đã chứng minh của chi phí tối ưu
+        self.gap = float('inf')                # Khoảng cách tương đối (min_cost - lower_bound) / min_cost
+        self.stop_reason = None                # "optimal", "infeasible", "completed", "time_limit",
+                                               # "node_limit", "target_gap", "converged" (ACO), "error"
+                                               # (lỗi giữa chừng, không chứng minh tối ưu) hoặc "stopped"
+        self._simple_bound = None              # Cận dưới rẻ (tính một lần, xem simple_lower_bound)
+
     @abstractmethod
     def solve(self, update_callback=None, finish_callback=None, sleep_time=0.05):
         """
@@ -45,6 +72,12 @@ class BaseSolver(ABC):
     def start_timer(self):
         """Bắt đầu bộ đếm thời gian thực thi (Profiling)."""
         self._start_time = time.time()
+        self._next_progress_time = 0
+        self._estimate_cost = None
+        self.lower_bound = 0
+        self.gap = float('inf')
+        self.stop_reason = None
+        self._simple_bound = None
         
     def stop_timer(self):
         """
@@ -52,3 +85,125 @@ class BaseSolver(ABC):
         Kết quả được lưu vào thuộc tính self.runtime.
         """
         self.runtime = time.time() - self._start_time
+
+    # Báo cáo tiến độ ---
+    def estimate_tree_size(self):
+        """
+        Ước lượng tổng số nút của cây tìm kiếm với cận trên hiện tại (0 = không ước lượng được).
+        Các bộ giải tìm kiếm cây ghi đè phương thức này.
+        """
+        return 0
+
+    def progress_due(self):
+        """Đã tới lúc báo tiến độ chưa (có progress_callback và đã qua progress_interval giây)."""
+        return self.progress_callback is not None and time.time() >= self._next_progress_time
+
+    def report_progress(self, nodes, pruned=0, fraction=None, force=False):
+        """
+        Gửi tiến độ tới progress_callback dưới dạng dict:
+            nodes, pruned, nodes_per_sec, estimated_nodes, fraction (0..1), eta (giây), elapsed, best_cost.
+        fraction là giá trị lớn hơn giữa tỉ lệ bộ giải tự tính (theo vị trí trên cây, nếu có) và
+        nodes / estimated_nodes: cả hai thường ước lượng thấp khi cận trên giảm dần trong lúc chạy.
+        Ước lượng kích thước cây được tính lại khi cận trên thay đổi.
+        """
+        if self.progress_callback is None or (not force and not self.progress_due()):
+            return
+        if self._estimate_cost != self.min_cost:
+            self._estimate_cost = self.min_cost
+            self.estimated_nodes = self.estimate_tree_size()
+
+        now = time.time()
+        self._next_progress_time = now + self.progress_interval
+        elapsed = now - self._start_time
+        if self.estimated_nodes:
+            fraction = max(fraction or 0.0, min(nodes / self.estimated_nodes, 1.0))
+        eta = None
+        if fraction:
+            eta = elapsed * (1 - fraction) / fraction
+
+        self.progress_callback({
+            "nodes": nodes,
+            "pruned": pruned,
+            "nodes_per_sec": nodes / elapsed if elapsed > 0 else 0.0,
+            "estimated_nodes": self.estimated_nodes,
+            "fraction": fraction,
+            "eta": eta,
+            "elapsed": elapsed,
+            "best_cost": self.min_cost,
+        })
+
+    # Chế độ anytime ---
+    def has_budget(self):
+        """Có đặt giới hạn nào (thời gian, số nút, khoảng cách mục tiêu) hay không."""
+        return self.time_limit is not None or self.node_limit is not None or self.target_gap is not None
+
+    def check_budget(self, work=0, lower_bound=None):
+        """
+        Kiểm tra ngân sách chạy; nếu hết thì dừng bộ giải như khi bấm STOP (is_running = False)
+        và ghi lý do vào stop_reason.
+        Args:
+            work: Số nút đã sinh ra (hoặc số vòng lặp đã xong với ACO), so với node_limit.
+            lower_bound: Cận dưới bộ giải chứng minh được lúc này (None = chỉ dùng simple_lower_bound).
+        Returns:
+            True nếu phải dừng.
+        """
+        if self.time_limit is not None and time.time() - self._start_time >= self.time_limit:
+            reason = "time_limit"
+        elif self.node_limit is not None and work >= self.node_limit:
+            reason = "node_limit"
+        elif self.target_gap is not None and self.min_cost != float('inf') and \
+                self.relative_gap(max(lower_bound or 0, self.simple_lower_bound())) <= self.target_gap:
+            reason = "target_gap"
+        else:
+            return False
+        self.stop_reason = reason
+        self.is_running = False
+        return True
+
+    def relative_gap(self, lower_bound):
+        """Khoảng cách tương đối giữa lời giải tốt nhất và cận dưới (inf nếu chưa có lời giải)."""
+        if self.min_cost == float('inf'):
+            return float('inf')
+        if lower_bound >= self.min_cost:
+            return 0.0
+        if self.min_cost == 0:
+            return float('inf')
+        return (self.min_cost - lower_bound) / abs(self.min_cost)
+
+    def simple_lower_bound(self):
+        """
+        Cận dưới rẻ dùng được cho mọi bộ giải: mỗi thành phố có đúng một cạnh đi ra trong chu trình,
+        nên chi phí tối ưu >= tổng cạnh đi ra nhỏ nhất của từng thành phố (inf nếu có thành phố
+        không có cạnh đi ra). Tính một lần từ chỉ mục ứng viên của bài toán.
+        """
+        if self._simple_bound is None:
+            num_cities = self.tsp_problem.num_cities
+            if num_cities <= 1:
+                self._simple_bound = 0
+            else:
+                nearest = self.tsp_problem.get_candidates(1)[:, 0].tolist()
+                if min(nearest) < 0:
+                    self._simple_bound = float('inf')
+                else:
+                    self._simple_bound = sum(self.tsp_problem.get_cost(i, j) for i, j in enumerate(nearest))
+        return self._simple_bound
+
+    def finish_anytime(self, lower_bound=0, complete=False):
+        """
+        Ghi kết quả của chế độ anytime khi bộ giải kết thúc.
+        Args:
+            lower_bound: Cận dưới bộ giải chứng minh được (ví dụ giới hạn nhỏ nhất của các nhánh còn mở).
+            complete: True nếu bộ giải chính xác đã duyệt hết không gian tìm kiếm
+                      (lời giải tốt nhất là tối ưu, hoặc chứng minh không có chu trình).
+        Sau khi gọi: lower_bound <= min_cost, gap = khoảng cách tương đối, stop_reason có giá trị.
+        """
+        if complete:
+            self.lower_bound = self.min_cost
+            self.gap = 0.0
+            self.stop_reason = "optimal" if self.min_cost != float('inf') else "infeasible"
+            return
+        bound = max(lower_bound, self.simple_lower_bound())
+        self.lower_bound = min(bound, self.min_cost)
+        self.gap = self.relative_gap(self.lower_bound)
+        if self.stop_reason is None:
+            self.stop_reason = "completed" if self.is_running else "stopped"
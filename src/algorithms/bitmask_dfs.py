@@ -0,0 +1,370 @@
+# src/algorithms/bitmask_dfs.py
+import time
+from collections import OrderedDict
+
+
+class BitmaskDFSEngine:
+    """
+    Bộ máy tìm kiếm Backtracking KHÔNG đệ quy dùng cho BacktrackSolverImproved.
+
+    So với bản đệ quy:
+      - Ngăn xếp tường minh (mảng theo độ sâu) thay cho lời gọi đệ quy -> không giới hạn độ sâu,
+        không tốn chi phí tạo frame của Python.
+      - Tập đã thăm là một số nguyên bitmask (bit i = 1 nếu thành phố i đã đi).
+      - Tổng "cạnh nhỏ nhất" của các thành phố chưa thăm được cập nhật tăng/giảm dần (O(1)),
+        không tính lại bằng sum(...) O(N) ở mỗi nút.
+      - Danh sách thành phố kế tiếp đã sắp xếp sẵn theo chi phí (tính một lần).
+    Thứ tự duyệt và luật cắt tỉa giống hệt bản đệ quy nên kết quả (chi phí, lộ trình) trùng khớp.
+
+    Cắt tỉa bổ sung (tùy chọn):
+      - symmetric = True: phá đối xứng. Với ma trận đối xứng, mỗi chu trình bị duyệt hai lần
+        (hai chiều); chỉ giữ chiều "chuẩn" trong đó u được thăm trước v, với u, v là hai thành phố
+        gần điểm xuất phát nhất (chiều mà thứ tự rẻ trước hay đi theo, và nhánh 0 -> v bị cắt ngay).
+      - cache_size > 0: bộ nhớ đệm trội (dominance) khóa theo (tập đã thăm, thành phố hiện tại),
+        lưu chi phí nhỏ nhất đã gặp; trạng thái giống hệt mà đắt hơn hoặc bằng bị cắt.
+        Bộ đệm có giới hạn, loại bỏ theo LRU.
+    """
+
+    def __init__(self, solver, matrix, successors, min_edge, start_city=0,
+                 successor_costs=None, return_costs=None):
+        """
+        Args:
+            solver: Bộ giải sở hữu (đọc/ghi best_path, min_cost, is_running).
+            matrix: Ma trận khoảng cách (index matrix[i][j]); có thể là None nếu đã đưa đủ
+                    successor_costs và return_costs.
+            successors: successors[i] = các thành phố kế tiếp của i, tăng dần theo chi phí.
+            min_edge: min_edge[i] = cạnh đi ra nhỏ nhất của i (dùng cho giới hạn dưới).
+            start_city: Thành phố xuất phát.
+            successor_costs: Chi phí tương ứng với successors (None = tra từ matrix).
+            return_costs: return_costs[i] = chi phí i -> start_city (None = tra từ matrix).
+        """
+        self.solver = solver
+        self.matrix = matrix
+        self.num_cities = len(successors)
+        self.successors = successors
+        # Chi phí tương ứng với từng thành phố kế tiếp (tránh tra ma trận trong vòng lặp)
+        if successor_costs is None:
+            successor_costs = [[matrix[i][j] for j in succ] for i, succ in enumerate(successors)]
+        self.successor_costs = successor_costs
+        # Chi phí quay về điểm xuất phát của từng thành phố (cạnh cuối của chu trình)
+        if return_costs is None:
+            return_costs = [matrix[i][start_city] for i in range(self.num_cities)]
+        self.return_costs = return_costs
+        self.min_edge = min_edge
+        self.start_city = start_city
+
+        # Bộ đếm thống kê
+        self.nodes_explored = 0   # Số nút con đã sinh ra
+        self.nodes_pruned = 0     # Số nút bị cắt tỉa
+
+        # Đọc lại solver.min_cost sau mỗi sync_interval nút (0 = không đọc lại),
+        # dùng khi cận trên được chia sẻ với tiến trình khác
+        self.sync_interval = 0
+        # Giới hạn số nút của một lần chạy (None = không giới hạn). Khi chạm giới hạn,
+        # các nhánh chưa duyệt được trả về trong frontier dạng (lộ trình tiền tố, chi phí)
+        self.node_limit = None
+        self.frontier = []
+        # Giới hạn dưới nhỏ nhất của các nhánh còn mở khi lần chạy kết thúc
+        # (inf = đã duyệt hết cây, không còn nhánh nào)
+        self.open_bound = float('inf')
+
+        # Checkpoint: checkpoint_callback(stack_city, stack_cost, stack_pos, nodes, pruned) được gọi
+        # mỗi checkpoint_interval giây và khi lần chạy dừng giữa chừng (None = không lưu)
+        self.checkpoint_callback = None
+        self.checkpoint_interval = 60.0
+
+        # Phá đối xứng (chỉ đúng khi ma trận đối xứng) và bộ đệm trội (0 = tắt)
+        self.symmetric = False
+        self.cache_size = 0
+        self.cache_hits = 0
+        # Cặp (u, v) của luật phá đối xứng trong lần chạy gần nhất (None = không áp dụng)
+        self.guard = None
+
+    def run(self, update_callback=None, sleep_time=0, prefix=None, prefix_cost=0, resume=None):
+        """
+        Chạy tìm kiếm theo chiều sâu cho tới khi duyệt hết cây, bị dừng (is_running = False)
+        hoặc chạm node_limit.
+
+        Args:
+            prefix: Lộ trình tiền tố cố định [start, c1, ..., ck] (None = chỉ gồm start):
+                    chỉ duyệt cây con bên dưới tiền tố này.
+            prefix_cost: Chi phí của lộ trình tiền tố.
+            resume: (stack_city, stack_cost, stack_pos) của một checkpoint (cùng tiền tố và cùng
+                    danh sách thành phố kế tiếp): tiếp tục đúng tại vị trí đã dừng.
+        """
+        solver = self.solver
+        n = self.num_cities
+        start = self.start_city
+        successors = self.successors
+        successor_costs = self.successor_costs
+        min_edge = self.min_edge
+        return_costs = self.return_costs
+        inf = float('inf')
+
+        best_cost = solver.min_cost
+        nodes = 0
+        pruned = 0
+        sync_interval = self.sync_interval
+        node_limit = self.node_limit
+        # Báo tiến độ (chỉ khi bộ giải có progress_callback)
+        progress = getattr(solver, "progress_callback", None) is not None
+        # Ngân sách anytime của bộ giải (thời gian / số nút / khoảng cách mục tiêu), kiểm tra mỗi 1024 nút
+        budget = hasattr(solver, "has_budget") and solver.has_budget()
+        gap_check = budget and solver.target_gap is not None
+        next_check = 1024
+        checkpoint = self.checkpoint_callback
+        next_save = time.time() + self.checkpoint_interval
+        self.frontier = []
+        self.open_bound = inf
+        prefix = list(prefix) if prefix else [start]
+
+        # Trường hợp suy biến: chỉ có một thành phố
+        if n == 1:
+            if return_costs[start] < best_cost:
+                solver.min_cost = return_costs[start]
+                solver.best_path = [start, start]
+                if update_callback:
+                    update_callback(solver.best_path)
+            return
+
+        # Trạng thái gốc (đã đi hết tiền tố)
+        visited = 0
+        for city in prefix:
+            visited |= 1 << city
+        remaining = sum(min_edge[i] for i in range(n) if not (visited >> i) & 1)
+
+        # Tiền tố đã gồm mọi thành phố → chỉ còn cạnh quay về
+        if len(prefix) == n:
+            cost_back = return_costs[prefix[-1]]
+            if cost_back != inf and prefix_cost + cost_back < best_cost:
+                solver.min_cost = prefix_cost + cost_back
+                solver.best_path = prefix + [start]
+                if update_callback:
+                    update_callback(solver.best_path)
+            return
+
+        # Tiền tố đã bị cắt tỉa bởi cận trên hiện tại
+        if prefix_cost >= best_cost or prefix_cost + remaining >= best_cost:
+            self.nodes_pruned += 1
+            return
+
+        # Ngăn xếp theo độ sâu: thành phố, chi phí tới đó, vị trí ứng viên kế tiếp cần thử
+        stack_city = [0] * n
+        stack_cost = [0] * n
+        stack_pos = [0] * n
+        base_depth = len(prefix) - 1
+        stack_city[:base_depth + 1] = prefix
+        stack_cost[base_depth] = prefix_cost
+        depth = base_depth
+        last_depth = n - 1
+
+        # Khôi phục ngăn xếp từ checkpoint (các thành phố sâu hơn tiền tố được đánh dấu lại)
+        if resume is not None:
+            saved_city, saved_cost, saved_pos = resume
+            depth = len(saved_city) - 1
+            stack_city[:depth + 1] = saved_city
+            stack_cost[:depth + 1] = saved_cost
+            stack_pos[:depth + 1] = saved_pos
+            for city in saved_city[base_depth + 1:]:
+                visited |= 1 << city
+                remaining -= min_edge[city]
+
+        # Phá đối xứng: cấm đi tới v khi chưa thăm u (-1 = không áp dụng)
+        guard_u = guard_v = -1
+        self.guard = None
+        if self.symmetric and len(successors[start]) >= 2:
+            guard_u, guard_v = successors[start][0], successors[start][1]
+            self.guard = (guard_u, guard_v)
+            if guard_v in prefix and (guard_u not in prefix or prefix.index(guard_u) > prefix.index(guard_v)):
+                self.nodes_pruned += 1
+                return
+
+        # Bộ đệm trội: khóa = (tập đã thăm, thành phố hiện tại) mã hóa thành một số nguyên.
+        # Ràng buộc phá đối xứng chỉ phụ thuộc vào tập đã thăm nên vẫn dùng chung khóa được.
+        cache_size = self.cache_size
+        cache = OrderedDict() if cache_size > 0 else None
+        hits = 0
+
+        while depth >= base_depth:
+            # Nếu người dùng bấm STOP → dừng
+            if not solver.is_running:
+                break
+
+            # Chạm giới hạn số nút → xuất các nhánh chưa duyệt rồi dừng
+            if node_limit is not None and nodes >= node_limit:
+                self._export_frontier(stack_city, stack_cost, stack_pos, base_depth, depth, visited)
+                break
+
+            # Cập nhật cận trên dùng chung (có thể đã được tiến trình khác cải thiện)
+            if sync_interval and nodes % sync_interval == 0:
+                best_cost = min(best_cost, solver.min_cost)
+
+            # Báo tiến độ: số nút, tỉ lệ hoàn thành theo vị trí hiện tại trên cây
+            if progress and nodes and (nodes & 1023) == 0 and solver.progress_due():
+                fraction = self._fraction_complete(stack_city, stack_pos, base_depth, depth)
+                solver.report_progress(self.nodes_explored + nodes, self.nodes_pruned + pruned, fraction)
+
+            if nodes >= next_check:
+                next_check = nodes + 1024
+                # Hết ngân sách → dừng (các nhánh còn mở được tính vào open_bound bên dưới)
+                if budget:
+                    lower_bound = None
+                    if gap_check:
+                        lower_bound = self._open_bound(stack_city, stack_cost, stack_pos, base_depth, depth,
+                                                       visited, remaining)
+                    if solver.check_budget(self.nodes_explored + nodes, lower_bound):
+                        break
+                # Lưu checkpoint định kỳ (trạng thái ở đầu vòng lặp luôn nhất quán)
+                if checkpoint is not None and time.time() >= next_save:
+                    checkpoint(stack_city[:depth + 1], stack_cost[:depth + 1], stack_pos[:depth + 1],
+                               self.nodes_explored + nodes, self.nodes_pruned + pruned)
+                    next_save = time.time() + self.checkpoint_interval
+
+            city = stack_city[depth]
+            succ = successors[city]
+            k = stack_pos[depth]
+            m = len(succ)
+            # Bỏ qua các thành phố đã thăm
+            while k < m and (visited >> succ[k]) & 1:
+                k += 1
+
+            if k >= m:
+                # Hết nhánh con → quay lui (bỏ đánh dấu thành phố hiện tại)
+                if depth > base_depth:
+                    visited ^= 1 << city
+                    remaining += min_edge[city]
+                depth -= 1
+                continue
+
+            stack_pos[depth] = k + 1
+            next_city = succ[k]
+            new_cost = stack_cost[depth] + successor_costs[city][k]
+            nodes += 1
+
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+            # CẮT TỈA 1 + 2: chi phí hiện tại và giới hạn dưới (chi phí + cạnh nhỏ nhất của các đỉnh chưa đi)
+            new_remaining = remaining - min_edge[next_city]
+            if new_cost >= best_cost or new_cost + new_remaining >= best_cost:
+                pruned += 1
+                continue
+
+            # PHÁ ĐỐI XỨNG: chiều ngược lại (v trước u) đã/sẽ được duyệt ở chiều chuẩn
+            if next_city == guard_v and not (visited >> guard_u) & 1:
+                pruned += 1
+                continue
+
+            if depth + 1 == last_depth:
+                # Đã đi hết các thành phố → thử quay về điểm xuất phát
+                cost_back = return_costs[next_city]
+                if cost_back != inf and new_cost + cost_back < best_cost:
+                    best_cost = new_cost + cost_back
+                    solver.min_cost = best_cost
+                    if sync_interval:
+                        best_cost = min(best_cost, solver.min_cost)
+                    solver.best_path = stack_city[:depth + 1] + [next_city, start]
+                    if update_callback:
+                        update_callback(solver.best_path)
+                continue
+
+            # CẮT TỈA TRỘI: đã từng tới cùng trạng thái với chi phí không lớn hơn
+            if cache is not None:
+                key = (visited | (1 << next_city)) * n + next_city
+                seen = cache.get(key)
+                if seen is not None and seen <= new_cost:
+                    cache.move_to_end(key)
+                    hits += 1
+                    pruned += 1
+                    continue
+                cache[key] = new_cost
+                cache.move_to_end(key)
+                if len(cache) > cache_size:
+                    cache.popitem(last=False)
+
+            # Đi xuống nút con
+            depth += 1
+            stack_city[depth] = next_city
+            stack_cost[depth] = new_cost
+            stack_pos[depth] = 0
+            visited |= 1 << next_city
+            remaining = new_remaining
+
+        if depth >= base_depth:
+            self.open_bound = self._open_bound(stack_city, stack_cost, stack_pos, base_depth, depth,
+                                               visited, remaining)
+            # Dừng giữa chừng → lưu vị trí hiện tại để lần sau chạy tiếp
+            if checkpoint is not None:
+                checkpoint(stack_city[:depth + 1], stack_cost[:depth + 1], stack_pos[:depth + 1],
+                           self.nodes_explored + nodes, self.nodes_pruned + pruned)
+        self.nodes_explored += nodes
+        self.nodes_pruned += pruned
+        self.cache_hits += hits
+
+    def _fraction_complete(self, stack_city, stack_pos, base_depth, depth):
+        """
+        Tỉ lệ cây (bên dưới tiền tố) đã duyệt xong, suy ra từ vị trí trên ngăn xếp:
+        ở độ sâu d có total_d nhánh con, done_d nhánh đã xong, mỗi nhánh chiếm 1 / (total_0 * ... * total_d)
+        của cây (coi các nhánh anh em có kích thước như nhau).
+        """
+        mask = 0
+        for city in stack_city[:base_depth]:
+            mask |= 1 << city
+        fraction, weight = 0.0, 1.0
+        for d in range(base_depth, depth + 1):
+            mask |= 1 << stack_city[d]
+            succ = self.successors[stack_city[d]]
+            total = sum(1 for c in succ if not (mask >> c) & 1)
+            if total == 0:
+                break
+            done = sum(1 for c in succ[:stack_pos[d]] if not (mask >> c) & 1)
+            if d < depth:
+                done -= 1  # nhánh con đang duyệt dở (stack_city[d + 1])
+            fraction += weight * done / total
+            weight /= total
+        return fraction
+
+    def _open_bound(self, stack_city, stack_cost, stack_pos, base_depth, depth, visited, remaining):
+        """
+        Giới hạn dưới nhỏ nhất (chi phí + cạnh nhỏ nhất của các đỉnh chưa đi, cùng công thức cắt tỉa)
+        của các nhánh chưa duyệt trên ngăn xếp. Mọi chu trình chưa được xét đều nằm trong một nhánh
+        như vậy, nên chi phí tối ưu >= min(cận trên, giá trị này).
+        """
+        min_edge = self.min_edge
+        bound = float('inf')
+        mask = visited
+        for d in range(depth, base_depth - 1, -1):
+            city = stack_city[d]
+            successors = self.successors[city]
+            costs = self.successor_costs[city]
+            for k in range(stack_pos[d], len(successors)):
+                next_city = successors[k]
+                if not (mask >> next_city) & 1:
+                    value = stack_cost[d] + costs[k] + remaining - min_edge[next_city]
+                    if value < bound:
+                        bound = value
+            # Lên độ sâu d - 1: thành phố ở độ sâu d trở lại "chưa thăm"
+            mask &= ~(1 << city)
+            remaining += min_edge[city]
+        return bound
+
+    def _export_frontier(self, stack_city, stack_cost, stack_pos, base_depth, depth, visited):
+        """
+        Ghi các nhánh chưa duyệt của ngăn xếp vào frontier: ở mỗi độ sâu d, các thành phố kế tiếp
+        chưa thử (từ stack_pos[d]) tạo thành tiền tố stack_city[:d+1] + [c]. Các nhánh đã duyệt
+        không xuất hiện lại, nên duyệt hết frontier tương đương với chạy tiếp lần tìm kiếm này.
+        """
+        frontier = self.frontier
+        for d in range(base_depth, depth + 1):
+            city = stack_city[d]
+            path = stack_city[:d + 1]
+            # Các thành phố nằm sâu hơn d trên ngăn xếp chưa "thuộc" tiền tố ở độ sâu d
+            mask = visited
+            for deeper in stack_city[d + 1:depth + 1]:
+                mask &= ~(1 << deeper)
+            successors = self.successors[city]
+            costs = self.successor_costs[city]
+            for k in range(stack_pos[d], len(successors)):
+                next_city = successors[k]
+                if not (mask >> next_city) & 1:
+                    frontier.append((path + [next_city], stack_cost[d] + costs[k]))
@@ -0,0 +1,305 @@
+# src/algorithms/bounds.py
+"""
+Các chiến lược giới hạn dưới (lower bound) cho Branch and Bound.
+
+Mọi chiến lược có cùng giao diện:
+    value, state = bound.initial(upper_bound)
+        -> giới hạn dưới của cả bài toán tại nút gốc (lộ trình [0]).
+    value, state = bound.extend(state, current_city, next_city, visited_mask, cost, upper_bound)
+        -> giới hạn dưới của MỌI chu trình bắt đầu bằng lộ trình hiện tại + next_city.
+           visited_mask đã gồm next_city, cost là chi phí lộ trình tới next_city.
+Giá trị trả về là chi phí cả chu trình (đã gồm cost), inf nếu nhánh không khả thi.
+state là dữ liệu riêng của chiến lược (được truyền lại cho các nút con để tính tăng dần).
+    bound.state_nbytes(state)
+        -> số byte ước lượng của một state (B&B best-first dùng để giới hạn bộ nhớ hàng đợi).
+"""
+import math
+import sys
+
+import numpy as np
+
+# Sai số cho phép khi so sánh số thực (giới hạn tính ra có thể lệch do làm tròn)
+_EPS = 1e-9
+
+BOUND_NAMES = ("auto", "min-edge", "1-tree", "assignment")
+
+
+def make_bound(name, tsp_problem):
+    """Tạo chiến lược giới hạn theo tên; "auto" chọn 1-tree nếu đối xứng, assignment nếu không."""
+    if name == "auto":
+        name = "1-tree" if tsp_problem.is_symmetric else "assignment"
+    if name == "min-edge":
+        return MinEdgeBound(tsp_problem)
+    if name == "1-tree":
+        return OneTreeBound(tsp_problem)
+    if name == "assignment":
+        return AssignmentBound(tsp_problem)
+    raise ValueError(f"Chiến lược giới hạn '{name}' không hợp lệ. Hỗ trợ: {BOUND_NAMES}.")
+
+
+class LowerBound:
+    """Lớp cơ sở: giữ ma trận chi phí dạng float64 và các tiện ích dùng chung."""
+
+    name = ""
+
+    def __init__(self, tsp_problem):
+        self.num_cities = tsp_problem.num_cities
+        self.dist = np.array(tsp_problem.as_float_array(), dtype=np.float64)
+        finite = self.dist[np.isfinite(self.dist)]
+        # Chi phí đều là số nguyên -> có thể làm tròn lên giới hạn dưới
+        self.integral = bool(np.all(finite == np.round(finite)))
+
+    def _finish(self, value):
+        """Trừ sai số làm tròn, rồi làm tròn lên nếu chi phí là số nguyên."""
+        if not math.isfinite(value):
+            return value
+        value -= _EPS * max(1.0, abs(value))
+        return float(math.ceil(value)) if self.integral else value
+
+    def _unvisited(self, visited_mask):
+        return [i for i in range(self.num_cities) if not (visited_mask >> i) & 1]
+
+    def initial(self, upper_bound):
+        raise NotImplementedError
+
+    @staticmethod
+    def state_nbytes(state):
+        """Số, mảng NumPy hoặc tuple các mảng (getsizeof của mảng sở hữu dữ liệu đã gồm bộ đệm)."""
+        if isinstance(state, tuple):
+            return sys.getsizeof(state) + sum(sys.getsizeof(part) for part in state)
+        return sys.getsizeof(state)
+
+    def extend(self, state, current_city, next_city, visited_mask, cost, upper_bound):
+        raise NotImplementedError
+
+
+class MinEdgeBound(LowerBound):
+    """
+    Giới hạn cũ của Backtrack cải tiến: chi phí đã đi + cạnh ra nhỏ nhất của mỗi thành phố chưa đi.
+    state = tổng cạnh nhỏ nhất của các thành phố chưa đi (cập nhật tăng dần).
+    """
+
+    name = "min-edge"
+
+    def __init__(self, tsp_problem):
+        super().__init__(tsp_problem)
+        # Cạnh có thật nhỏ nhất (kể cả cạnh chi phí 0 - bỏ qua chúng sẽ làm giới hạn vượt chi phí thật)
+        off_diagonal = self.dist.copy()
+        np.fill_diagonal(off_diagonal, np.inf)
+        min_edge = off_diagonal.min(axis=1) if self.num_cities else np.zeros(0)
+        self.min_edge = np.where(np.isfinite(min_edge), min_edge, 0.0).tolist()
+
+    def initial(self, upper_bound):
+        remaining = sum(self.min_edge[1:])
+        return remaining, remaining
+
+    def extend(self, state, current_city, next_city, visited_mask, cost, upper_bound):
+        remaining = state - self.min_edge[next_city]
+        return cost + remaining, remaining
+
+
+class OneTreeBound(LowerBound):
+    """
+    Giới hạn Held-Karp 1-tree với hiệu chỉnh Lagrange (subgradient) - chỉ dùng cho bài toán đối xứng.
+
+    - Nút gốc: 1-tree cổ điển (cây khung nhỏ nhất trên các đỉnh 1..N-1 + hai cạnh nhỏ nhất của 0),
+      mọi đỉnh có bậc mục tiêu 2.
+    - Nút con với lộ trình 0 -> ... -> c: phần còn lại là một đường Hamilton từ c qua các đỉnh chưa đi
+      về 0, tức một cây khung trên {c, 0} ∪ U với bậc mục tiêu 1 cho c và 0, bậc 2 cho các đỉnh của U.
+    Với hệ số Lagrange pi, w'(i, j) = w(i, j) + pi_i + pi_j và
+        L(pi) = MST_w' - sum(pi_i * bậc mục tiêu_i) <= chi phí đường đi tối ưu.
+    Subgradient đẩy pi theo (bậc thực tế - bậc mục tiêu). Nút con khởi động từ pi của nút cha
+    nên chỉ cần vài vòng lặp.
+    """
+
+    name = "1-tree"
+
+    def __init__(self, tsp_problem, root_iterations=100, node_iterations=8):
+        super().__init__(tsp_problem)
+        self.dist = np.minimum(self.dist, self.dist.T)
+        np.fill_diagonal(self.dist, np.inf)
+        self.root_iterations = root_iterations
+        self.node_iterations = node_iterations
+
+    @staticmethod
+    def _prim(weights):
+        """Cây khung nhỏ nhất (Prim, O(V^2) vector hóa). Trả về (tổng trọng số, bậc từng đỉnh)."""
+        size = len(weights)
+        degree = np.zeros(size, dtype=np.int64)
+        if size <= 1:
+            return 0.0, degree
+        in_tree = np.zeros(size, dtype=bool)
+        in_tree[0] = True
+        best = weights[0].copy()
+        parent = np.zeros(size, dtype=np.int64)
+        total = 0.0
+        for _ in range(size - 1):
+            candidates = np.where(in_tree, np.inf, best)
+            k = int(np.argmin(candidates))
+            if candidates[k] == np.inf:
+                return np.inf, degree
+            total += candidates[k]
+            degree[k] += 1
+            degree[parent[k]] += 1
+            in_tree[k] = True
+            closer = weights[k] < best
+            best[closer] = weights[k][closer]
+            parent[closer] = k
+        return total, degree
+
+    def _one_tree(self, weights):
+        """1-tree: cây khung trên các đỉnh 1.. cộng hai cạnh nhỏ nhất của đỉnh 0."""
+        total, degree = self._prim(weights[1:, 1:])
+        first, second = np.argpartition(weights[0, 1:], 1)[:2] + 1
+        total += weights[0, first] + weights[0, second]
+        degree = np.concatenate(([2], degree))
+        degree[first] += 1
+        degree[second] += 1
+        return total, degree
+
+    def _subgradient(self, nodes, targets, pi, budget, iterations, tree):
+        """
+        Tối ưu hệ số Lagrange trên tập đỉnh nodes. budget = phần chi phí còn được phép
+        (cận trên - chi phí đã đi); đạt tới budget thì dừng sớm vì nhánh chắc chắn bị cắt.
+        Trả về (giới hạn tốt nhất, pi tương ứng).
+        """
+        base = self.dist[np.ix_(nodes, nodes)]
+        local_pi = pi[nodes].copy()
+        best_value, best_pi = -np.inf, local_pi.copy()
+        step_scale, stall = 2.0, 0
+        for _ in range(iterations):
+            weights = base + local_pi[:, None] + local_pi[None, :]
+            tree_cost, degree = tree(weights)
+            if tree_cost == np.inf:
+                return np.inf, pi
+            value = tree_cost - float(local_pi @ targets)
+            if value > best_value + _EPS:
+                best_value, best_pi, stall = value, local_pi.copy(), 0
+            else:
+                stall += 1
+                if stall >= 3:
+                    step_scale, stall = step_scale / 2, 0
+            gradient = degree - targets
+            norm = float(gradient @ gradient)
+            # Cây đúng bậc mục tiêu = một lời giải hợp lệ -> giới hạn chính xác
+            if norm == 0 or best_value >= budget:
+                break
+            reference = budget if math.isfinite(budget) else value + 0.05 * abs(value) + 1.0
+            local_pi = local_pi + step_scale * (reference - value) / norm * gradient
+        result = pi.copy()
+        result[nodes] = best_pi
+        return best_value, result
+
+    def initial(self, upper_bound):
+        n = self.num_cities
+        pi = np.zeros(n)
+        if n < 3:
+            return 0.0, pi
+        nodes = np.arange(n)
+        targets = np.full(n, 2.0)
+        value, pi = self._subgradient(nodes, targets, pi, upper_bound, self.root_iterations, self._one_tree)
+        return self._finish(value), pi
+
+    def extend(self, state, current_city, next_city, visited_mask, cost, upper_bound):
+        unvisited = self._unvisited(visited_mask)
+        if not unvisited:
+            return cost + self.dist[next_city, 0], state
+        nodes = np.array([next_city, 0] + unvisited)
+        targets = np.full(len(nodes), 2.0)
+        targets[:2] = 1.0
+        value, pi = self._subgradient(nodes, targets, state, upper_bound - cost,
+                                      self.node_iterations, self._prim)
+        return self._finish(cost + value), pi
+
+
+class AssignmentBound(LowerBound):
+    """
+    Giới hạn bài toán phân công (Assignment Problem) - dùng tốt cho bài toán KHÔNG đối xứng.
+
+    Với lộ trình 0 -> ... -> c, mỗi đỉnh trong {c} ∪ U phải chọn đúng một đỉnh kế tiếp trong U ∪ {0}:
+    bài toán phân công tối thiểu (bỏ ràng buộc chu trình con) cho giới hạn dưới.
+    Giải bằng thuật toán Hungarian dạng đường tăng ngắn nhất với thế vị (u, v):
+      - Nút gốc: giải đầy đủ O(N^3).
+      - Nút con (cố định cạnh c -> t): bỏ hàng c và cột t khỏi bài toán cha. Thế vị vẫn khả thi,
+        nên chỉ cần MỘT lần tìm đường tăng O(N^2) (hoặc không cần gì nếu c đã được gán vào t).
+    state = (u, v, col_of_row, row_of_col, active_rows, active_cols).
+    """
+
+    name = "assignment"
+
+    def __init__(self, tsp_problem):
+        super().__init__(tsp_problem)
+        self.cost = self.dist.copy()
+        np.fill_diagonal(self.cost, np.inf)
+
+    def _augment(self, state, free_row):
+        """Tìm đường tăng ngắn nhất từ hàng tự do free_row (Dijkstra trên chi phí rút gọn)."""
+        u, v, col_of_row, row_of_col, _, active_cols = state
+        cols = np.flatnonzero(active_cols)
+        size = len(cols)
+        col_row = row_of_col[cols]
+        min_reduced = np.full(size, np.inf)
+        way = np.full(size, -1, dtype=np.int64)
+        used = np.zeros(size, dtype=bool)
+        current = -1  # -1 = cột ảo chứa free_row
+        while True:
+            row = free_row if current == -1 else col_row[current]
+            reduced = self.cost[row, cols] - u[row] - v[cols]
+            closer = ~used & (reduced < min_reduced)
+            min_reduced[closer] = reduced[closer]
+            way[closer] = current
+            candidates = np.where(used, np.inf, min_reduced)
+            nxt = int(np.argmin(candidates))
+            delta = candidates[nxt]
+            if delta == np.inf:
+                return False
+            u[free_row] += delta
+            u[col_row[used]] += delta
+            v[cols[used]] -= delta
+            min_reduced[~used] -= delta
+            used[nxt] = True
+            current = nxt
+            if col_row[current] == -1:
+                break
+        # Đảo các cạnh dọc đường tăng
+        while current != -1:
+            previous = way[current]
+            col_row[current] = free_row if previous == -1 else col_row[previous]
+            current = previous
+        row_of_col[cols] = col_row
+        assigned = col_row >= 0
+        col_of_row[col_row[assigned]] = cols[assigned]
+        return True
+
+    def _value(self, state):
+        _, _, col_of_row, _, active_rows, _ = state
+        rows = np.flatnonzero(active_rows)
+        return float(self.cost[rows, col_of_row[rows]].sum())
+
+    def initial(self, upper_bound):
+        n = self.num_cities
+        state = (np.zeros(n), np.zeros(n), np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64),
+                 np.ones(n, dtype=bool), np.ones(n, dtype=bool))
+        if n < 2:
+            return 0.0, state
+        for row in range(n):
+            if not self._augment(state, row):
+                return np.inf, state
+        return self._finish(self._value(state)), state
+
+    def extend(self, state, current_city, next_city, visited_mask, cost, upper_bound):
+        u, v, col_of_row, row_of_col, active_rows, active_cols = (array.copy() for array in state)
+        child = (u, v, col_of_row, row_of_col, active_rows, active_cols)
+        # Cố định cạnh current_city -> next_city: bỏ hàng current_city và cột next_city
+        freed_col = col_of_row[current_city]
+        displaced_row = row_of_col[next_city]
+        active_rows[current_city] = False
+        active_cols[next_city] = False
+        col_of_row[current_city] = -1
+        row_of_col[next_city] = -1
+        if freed_col != next_city:
+            row_of_col[freed_col] = -1
+            col_of_row[displaced_row] = -1
+            if not self._augment(child, displaced_row):
+                return np.inf, child
+        return self._finish(cost + self._value(child)), child
@@ -0,0 +1,223 @@
+# src/algorithms/branch_and_bound_solver.py
+import heapq
+import sys
+import time
+from array import array
+
+from .base_solver import BaseSolver
+from .bounds import make_bound
+from .warm_start import apply_warm_start
+
+
+class BranchAndBoundSolver(BaseSolver):
+    """
+    Branch and Bound (nhánh cận) với chiến lược giới hạn dưới có thể thay đổi:
+      - "1-tree"    : Held-Karp 1-tree + subgradient Lagrange (bài toán đối xứng)
+      - "assignment": bài toán phân công, giải lại tăng dần (bài toán không đối xứng)
+      - "min-edge"  : giới hạn cũ của Backtrack cải tiến
+      - "auto"      : 1-tree nếu ma trận đối xứng, ngược lại assignment
+    Ở mỗi nút, giới hạn của mọi nút con được tính trước; nút con bị cắt nếu giới hạn >= cận trên,
+    các nút còn lại được duyệt theo thứ tự giới hạn tăng dần (tìm lời giải tốt sớm hơn).
+    Khi dừng sớm (STOP hoặc hết ngân sách anytime), các nút con chưa duyệt cho cận dưới đã chứng minh.
+
+    Cách duyệt (search):
+      - "depth-first": theo chiều sâu (đệ quy), ít bộ nhớ, tìm cận trên nhanh.
+      - "best-first" : luôn mở rộng nút có giới hạn nhỏ nhất (heap theo giới hạn dưới), nên cận dưới
+                       đã chứng minh tăng nhanh nhất. Nút được lưu gọn trong một arena (bitmask, thành phố
+                       cuối, chi phí, chỉ số nút cha). queue_limit là ngân sách bộ nhớ tính bằng byte cho
+                       arena, heap VÀ state giới hạn của các nút đang chờ (state 1-tree / assignment có kích
+                       thước O(N) mỗi nút nên chiếm phần lớn). Khi vượt ngân sách, nút lấy ra khỏi heap được
+                       duyệt tiếp bằng một lần "lặn" theo chiều sâu thay vì sinh thêm nút vào hàng đợi.
+    """
+
+    # Byte mỗi nút ngoài bitmask và state: 3 ô arena array (4 + 8 + 4), con trỏ trong list bitmask,
+    # bộ (giới hạn, -độ sâu, chỉ số) trong heap cùng các số bên trong, và một ô trong dict states
+    _NODE_BYTES = 16 + 8 + (sys.getsizeof((0.0, 0, 0)) + 8 + 24 + 2 * 28) + 100
+
+    def __init__(self, tsp_problem):
+        super().__init__(tsp_problem)
+        self.bound = "auto"
+        self.bound_strategy = None
+        self.root_bound = 0
+        self.successors = []
+        # Giới hạn nhỏ nhất của các nút con bị bỏ lại khi dừng sớm (inf = không còn nút mở)
+        self.open_bound = float('inf')
+        # Cách duyệt: "depth-first" hoặc "best-first"; ngân sách bộ nhớ (byte) của hàng đợi best-first
+        # gồm arena + heap + state giới hạn của các nút chờ (None = không giới hạn)
+        self.search = "depth-first"
+        self.queue_limit = 256 * 1024 * 1024
+        self.max_queue_size = 0
+        self.max_queue_bytes = 0
+
+    def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
+        self.is_running = True
+        self.start_timer()
+
+        matrix = self.tsp_problem.dist_matrix
+        num_cities = self.tsp_problem.num_cities
+
+        if num_cities == 0:
+            self.stop_timer()
+            if finish_callback:
+                finish_callback(self.best_path, self.min_cost, self.runtime)
+            return
+
+        try:
+            self.bound_strategy = make_bound(self.bound, self.tsp_problem)
+            print(f"Bắt đầu chạy Branch and Bound (giới hạn {self.bound_strategy.name})...")
+
+            if num_cities == 1:
+                self.min_cost = matrix[0][0]
+                self.best_path = [0, 0]
+            else:
+                self.successors = self.tsp_problem.successor_lists(by="cost")
+                self.nodes_explored = 0
+                self.open_bound = float('inf')
+                apply_warm_start(self, update_callback)
+                self.root_bound, root_state = self.bound_strategy.initial(self.min_cost)
+                if self.root_bound < self.min_cost and not self.is_running:
+                    self.open_bound = self.root_bound
+                elif self.root_bound < self.min_cost and self.search == "best-first":
+                    self._best_first(root_state, matrix, num_cities, update_callback, sleep_time)
+                elif self.root_bound < self.min_cost:
+                    self._branch([0], 1, 0, root_state, matrix, num_cities, update_callback, sleep_time)
+            # Chi phí tối ưu >= giới hạn gốc và >= min(cận trên, nhánh còn mở rẻ nhất)
+            self.finish_anytime(max(self.root_bound, self.open_bound), complete=self.open_bound == float('inf'))
+        except Exception as e:
+            print(f"Lỗi trong quá trình chạy Branch and Bound: {e}")
+            # Lời giải tốt nhất vẫn giữ, nhưng không được coi là đã chứng minh tối ưu
+            self.stop_reason = "error"
+            self.finish_anytime()
+
+        self.stop_timer()
+        if finish_callback:
+            finish_callback(self.best_path, self.min_cost, self.runtime)
+
+        print(f"Branch and Bound hoàn thành. Chi phí: {self.min_cost}, Cận dưới: {self.lower_bound}, "
+              f"Số nút: {self.nodes_explored}, Thời gian: {self.runtime:.4f}s")
+
+    def _branch(self, path, visited, cost, state, matrix, num_cities, update_callback, sleep_time):
+        # Nếu người dùng bấm STOP → dừng
+        if not self.is_running:
+            return
+
+        children = self._expand(path, visited, cost, state, matrix, num_cities, update_callback)
+        for value, _, next_city, new_cost, child_visited, child_state in children:
+            # Cận trên có thể đã tốt hơn sau khi duyệt các nút anh em
+            if value >= self.min_cost:
+                continue
+
+            # Bị dừng hoặc hết ngân sách anytime → nút con còn mở, chỉ giữ lại giới hạn của nó
+            if not self.is_running or (self.has_budget() and
+                                       self.check_budget(self.nodes_explored, self.root_bound)):
+                self.open_bound = min(self.open_bound, value)
+                continue
+
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+            path.append(next_city)
+            self._branch(path, child_visited, new_cost, child_state, matrix, num_cities,
+                         update_callback, sleep_time)
+            path.pop()
+
+    def _expand(self, path, visited, cost, state, matrix, num_cities, update_callback):
+        """
+        Sinh các nút con của lộ trình path: cập nhật cận trên khi đóng được chu trình (nút lá),
+        trả về các nút con chưa bị cắt dạng (giới hạn, thứ tự, thành phố, chi phí, tập đã thăm, state),
+        sắp xếp theo giới hạn tăng dần.
+        """
+        current_city = path[-1]
+        is_last = len(path) + 1 == num_cities
+        children = []
+
+        for order, next_city in enumerate(self.successors[current_city]):
+            if (visited >> next_city) & 1:
+                continue
+            new_cost = cost + matrix[current_city][next_city]
+            self.nodes_explored += 1
+            if new_cost >= self.min_cost:
+                continue
+
+            if is_last:
+                # Đi hết các thành phố → quay về điểm xuất phát
+                cost_back = matrix[next_city][0]
+                if cost_back != float('inf') and new_cost + cost_back < self.min_cost:
+                    self.min_cost = new_cost + cost_back
+                    self.best_path = path + [next_city, 0]
+                    if update_callback:
+                        update_callback(self.best_path)
+                continue
+
+            child_visited = visited | (1 << next_city)
+            value, child_state = self.bound_strategy.extend(
+                state, current_city, next_city, child_visited, new_cost, self.min_cost)
+            if value < self.min_cost:
+                children.append((value, order, next_city, new_cost, child_visited, child_state))
+
+        # Duyệt nút con có giới hạn nhỏ nhất trước
+        children.sort(key=lambda child: (child[0], child[1]))
+        return children
+
+    def _best_first(self, root_state, matrix, num_cities, update_callback, sleep_time):
+        """
+        Duyệt best-first: heap chứa (giới hạn, -độ sâu, chỉ số nút) - cùng giới hạn thì ưu tiên nút sâu hơn
+        (sớm đóng được chu trình). Arena lưu mỗi nút bằng các mảng song song; state của chiến lược giới hạn
+        chỉ được giữ cho các nút còn trong heap. Lộ trình của một nút được dựng lại theo chỉ số nút cha.
+        queue_bytes = byte của arena (không bao giờ co lại) + state các nút đang chờ (giảm khi nút được lấy ra).
+        """
+        arena_mask = [1]
+        arena_city = array('i', [0])
+        arena_cost = array('d', [0.0])
+        arena_parent = array('i', [-1])
+        states = {0: root_state}
+        heap = [(self.root_bound, -1, 0)]
+        state_nbytes = self.bound_strategy.state_nbytes
+        queue_bytes = self._NODE_BYTES + sys.getsizeof(1) + state_nbytes(root_state)
+        self.max_queue_size = 1
+        self.max_queue_bytes = queue_bytes
+
+        def rebuild_path(node):
+            path = []
+            while node >= 0:
+                path.append(arena_city[node])
+                node = arena_parent[node]
+            return path[::-1]
+
+        while heap:
+            value, neg_depth, node = heap[0]
+            # Mọi nút còn lại đều không tốt hơn cận trên → đã chứng minh tối ưu
+            if value >= self.min_cost:
+                heap.clear()
+                break
+            # Bị dừng hoặc hết ngân sách: cận dưới = giới hạn nhỏ nhất còn trong heap (chính là nút này)
+            if not self.is_running or (self.has_budget() and
+                                       self.check_budget(self.nodes_explored, max(self.root_bound, value))):
+                self.open_bound = min(self.open_bound, value)
+                break
+            heapq.heappop(heap)
+            state = states.pop(node)
+            queue_bytes -= state_nbytes(state)
+            path = rebuild_path(node)
+            visited, cost = arena_mask[node], arena_cost[node]
+
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+            # Hết ngân sách bộ nhớ → lặn theo chiều sâu từ nút này (các nút còn lại lần lượt theo thứ tự giới hạn)
+            if self.queue_limit is not None and queue_bytes >= self.queue_limit:
+                self._branch(path, visited, cost, state, matrix, num_cities, update_callback, sleep_time)
+                continue
+
+            for child_value, _, next_city, new_cost, child_visited, child_state in self._expand(
+                    path, visited, cost, state, matrix, num_cities, update_callback):
+                child = len(arena_city)
+                arena_mask.append(child_visited)
+                arena_city.append(next_city)
+                arena_cost.append(new_cost)
+                arena_parent.append(node)
+                states[child] = child_state
+                queue_bytes += self._NODE_BYTES + sys.getsizeof(child_visited) + state_nbytes(child_state)
+                heapq.heappush(heap, (child_value, neg_depth - 1, child))
+            self.max_queue_size = max(self.max_queue_size, len(heap))
+            self.max_queue_bytes = max(self.max_queue_bytes, queue_bytes)
@@ -0,0 +1,86 @@
+# src/algorithms/checkpoint.py
+"""
+Checkpoint cho các lần tìm kiếm chính xác chạy lâu (Backtrack cải tiến, Backtrack song song).
+
+Một checkpoint là một file .npz nén (np.savez_compressed) gồm các mảng nhỏ: trạng thái tìm kiếm
+(ngăn xếp tường minh hoặc danh sách cây con còn lại), lời giải tốt nhất và các bộ đếm.
+File được ghi ra file tạm rồi đổi tên (os.replace), nên một lần ghi bị ngắt giữa chừng
+không làm hỏng checkpoint cũ.
+
+Mỗi checkpoint ghi kèm tên bộ giải và mã băm của ma trận khoảng cách; checkpoint của
+bộ giải khác hoặc bài toán khác sẽ bị bỏ qua khi khôi phục.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+def problem_fingerprint(tsp_problem):
+    """Mã băm SHA-1 của ma trận khoảng cách (float64)."""
+    array = np.ascontiguousarray(tsp_problem.as_float_array(), dtype=np.float64)
+    return hashlib.sha1(array.tobytes()).hexdigest()
+
+
+def pack_lists(lists):
+    """Gộp danh sách các danh sách số nguyên thành (mảng phẳng, mảng vị trí bắt đầu) để lưu gọn."""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(items) for items in lists])
+    flat = np.fromiter((x for items in lists for x in items), dtype=np.int64, count=int(offsets[-1]))
+    return flat, offsets
+
+
+def unpack_lists(flat, offsets):
+    """Ngược lại của pack_lists."""
+    flat = flat.tolist()
+    offsets = offsets.tolist()
+    return [flat[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def save_checkpoint(path, solver_name, fingerprint, **arrays):
+    """
+    Ghi checkpoint (ghi file tạm rồi đổi tên). Các giá trị trong arrays được chuyển thành mảng NumPy.
+    Trả về True nếu ghi thành công.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, version=CHECKPOINT_VERSION, solver=solver_name,
+                                fingerprint=fingerprint, **arrays)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"[Cảnh báo] Không ghi được checkpoint {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def load_checkpoint(path, solver_name, fingerprint):
+    """
+    Đọc checkpoint nếu có và khớp với bộ giải / bài toán hiện tại.
+    Trả về dict tên -> mảng NumPy, hoặc None (không có file, file hỏng hoặc không khớp).
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            state = {name: data[name] for name in data.files}
+    except (OSError, ValueError) as e:
+        print(f"[Cảnh báo] Không đọc được checkpoint {path}: {e}")
+        return None
+    if int(state.get("version", -1)) != CHECKPOINT_VERSION or str(state.get("solver")) != solver_name:
+        print(f"[Cảnh báo] Checkpoint {path} không thuộc bộ giải {solver_name}, bỏ qua.")
+        return None
+    if str(state.get("fingerprint")) != fingerprint:
+        print(f"[Cảnh báo] Checkpoint {path} thuộc một bài toán khác, bỏ qua.")
+        return None
+    return state
+
+
+def remove_checkpoint(path):
+    """Xóa checkpoint khi lần tìm kiếm đã chạy xong (không còn gì để tiếp tục)."""
+    if path and os.path.exists(path):
+        os.remove(path)
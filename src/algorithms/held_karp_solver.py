@@ -0,0 +1,337 @@
+# src/algorithms/held_karp_solver.py
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from .base_solver import BaseSolver
+
+
+class HeldKarpSolver(BaseSolver):
+    """
+    Quy hoạch động Held-Karp (bitmask DP) cho lời giải TỐI ƯU có chứng minh.
+
+    Xuất phát từ thành phố 0, gọi m = N - 1 thành phố còn lại (đánh số lại 0..m-1).
+    dp[S][j] = chi phí nhỏ nhất đi từ 0, qua đúng tập S, kết thúc tại j (j thuộc S).
+        dp[S][j] = min_{i thuộc S\\{j}} dp[S\\{j}][i] + d(i, j)
+
+    Bảng được tính theo từng "lớp" (các tập cùng kích thước k) bằng NumPy:
+      - Các bitmask của một lớp được sinh theo thứ tự tăng dần, trùng với thứ tự colex,
+        nên chỉ số của một tập trong lớp = hạng colex của nó (tính được bằng tổ hợp).
+      - Lớp k chỉ cần lớp k-1; giá trị các lớp cũ được bỏ đi ngay.
+      - Chỉ giữ lại bảng cha (parent) của mọi lớp, kiểu int8/int16, để dựng lại lộ trình.
+    Xử lý được cạnh inf (không có đường) và ma trận không đối xứng.
+    Độ phức tạp O(N^2 * 2^N) thời gian, O(N * 2^N) byte cho bảng cha.
+
+    Chế độ lưu trữ (storage):
+      - "memory": mọi bảng nằm trong RAM; vượt memory_limit thì từ chối chạy.
+      - "disk"  : các lớp được ghi ra file ánh xạ bộ nhớ (np.memmap) trong work_dir,
+                  chỉ hai lớp giá trị đang dùng được giữ lại (lớp cũ bị xóa ngay),
+                  bảng cha được đọc lại từ đĩa khi dựng lộ trình. Dùng cho N ~ 24-27.
+      - "auto"  : dùng RAM nếu ước tính vừa memory_limit, ngược lại dùng đĩa.
+    Thống kê bộ nhớ và tốc độ của từng lớp được lưu trong layer_stats.
+    """
+
+    def __init__(self, tsp_problem):
+        super().__init__(tsp_problem)
+        # Giới hạn bộ nhớ cho bảng DP (byte)
+        self.memory_limit = 4 * 1024 ** 3
+        # Số hàng xử lý mỗi lần (giới hạn mảng tạm kích thước block_rows x m)
+        self.block_rows = 1 << 16
+        # Chế độ lưu trữ: "auto", "memory" hoặc "disk"
+        self.storage = "auto"
+        # Thư mục chứa file tạm của chế độ đĩa (None = thư mục tạm của hệ thống)
+        self.work_dir = None
+        # Thống kê từng lớp: kích thước, bộ nhớ, thời gian, tốc độ
+        self.layer_stats = []
+        # Bảng cha của từng lớp (chỉ số = kích thước tập)
+        self._parents = []
+        self._layer_dir = None
+
+    def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
+        self.is_running = True
+        self.start_timer()
+
+        num_cities = self.tsp_problem.num_cities
+
+        if num_cities == 0:
+            self.stop_timer()
+            if finish_callback:
+                finish_callback(self.best_path, self.min_cost, self.runtime)
+            return
+
+        print("Bắt đầu chạy Held-Karp...")
+
+        try:
+            required = self.estimate_memory(num_cities)
+            use_disk = self.storage == "disk" or (self.storage == "auto" and required > self.memory_limit)
+            if not use_disk and required > self.memory_limit:
+                print(f"Lỗi Held-Karp: cần khoảng {required / 1024 ** 2:.0f} MB, "
+                      f"vượt giới hạn {self.memory_limit / 1024 ** 2:.0f} MB.")
+                self.stop_reason = "error"
+                self.finish_anytime()
+            elif not use_disk or self._open_layer_dir(num_cities):
+                bound = self._run(num_cities)
+                self.finish_anytime(bound or 0, complete=bound is None)
+                if update_callback and self.best_path:
+                    update_callback(self.best_path)
+            else:
+                # Không đủ đĩa trống cho chế độ đĩa (đã báo lỗi trong _open_layer_dir)
+                self.stop_reason = "error"
+                self.finish_anytime()
+        except Exception as e:
+            print(f"Lỗi trong quá trình chạy Held-Karp: {e}")
+            self.stop_reason = "error"
+            self.finish_anytime()
+        finally:
+            self._close_layer_dir()
+
+        self.stop_timer()
+        if finish_callback:
+            finish_callback(self.best_path, self.min_cost, self.runtime)
+
+        print(f"Held-Karp hoàn thành. Chi phí: {self.min_cost}, Thời gian: {self.runtime:.4f}s")
+
+    # --- ƯỚC LƯỢNG BỘ NHỚ ---
+    @staticmethod
+    def _parent_dtype(m):
+        """Kiểu nhỏ nhất chứa được chỉ số thành phố 0..m-1."""
+        return np.int8 if m <= np.iinfo(np.int8).max else np.int16
+
+    def estimate_memory(self, num_cities):
+        """Số byte ước tính: bảng cha của mọi lớp + giá trị của hai lớp lớn nhất + bitmask."""
+        m = num_cities - 1
+        if m <= 0:
+            return 0
+        widest = math.comb(m, m // 2)
+        parents = (2 ** m) * m * np.dtype(self._parent_dtype(m)).itemsize
+        values = 2 * widest * m * 8
+        masks = 2 * widest * 8
+        return parents + values + masks
+
+    def estimate_disk(self, num_cities):
+        """Số byte đĩa cần cho chế độ đĩa: bảng cha của mọi lớp + hai lớp giá trị lớn nhất."""
+        m = num_cities - 1
+        if m <= 0:
+            return 0
+        widest = math.comb(m, m // 2)
+        return (2 ** m) * m * np.dtype(self._parent_dtype(m)).itemsize + 2 * widest * m * 8
+
+    # --- LƯU TRỮ LỚP ---
+    def _open_layer_dir(self, num_cities):
+        """Tạo thư mục chứa các lớp trên đĩa; trả về False nếu không đủ dung lượng."""
+        base_dir = self.work_dir or tempfile.gettempdir()
+        needed = self.estimate_disk(num_cities)
+        free = shutil.disk_usage(base_dir).free
+        if needed > free:
+            print(f"Lỗi Held-Karp: cần khoảng {needed / 1024 ** 3:.1f} GB đĩa trống tại {base_dir}, "
+                  f"chỉ còn {free / 1024 ** 3:.1f} GB.")
+            return False
+        self._layer_dir = tempfile.mkdtemp(prefix="heldkarp_", dir=base_dir)
+        print(f"Held-Karp chạy ở chế độ đĩa: {self._layer_dir} (cần khoảng {needed / 1024 ** 3:.2f} GB)")
+        return True
+
+    def _close_layer_dir(self):
+        """Bỏ các bảng cha (đã dựng xong lộ trình) và xóa thư mục tạm nếu có."""
+        self._parents = []
+        if self._layer_dir is None:
+            return
+        shutil.rmtree(self._layer_dir, ignore_errors=True)
+        self._layer_dir = None
+
+    # --- TIỆN ÍCH LỚP ---
+    @staticmethod
+    def _next_layer_masks(prev_masks, m):
+        """
+        Sinh các bitmask kích thước k từ lớp k-1 (đã sắp tăng dần): mỗi tập mới = tập cũ + một bit
+        cao hơn bit cao nhất của tập cũ. Mỗi tập được sinh đúng một lần và kết quả đã sắp tăng dần.
+        """
+        parts = []
+        for b in range(m):
+            count = np.searchsorted(prev_masks, 1 << b)
+            if count:
+                parts.append(prev_masks[:count] | (1 << b))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def _colex_rank(mask):
+        """Hạng colex của một tập (= chỉ số của nó trong lớp cùng kích thước)."""
+        rank, count = 0, 0
+        b = 0
+        while mask:
+            if mask & 1:
+                count += 1
+                rank += math.comb(b, count)
+            mask >>= 1
+            b += 1
+        return rank
+
+    def _allocate_layer(self, name, shape, dtype, fill=None):
+        """
+        Cấp phát mảng cho một lớp (giá trị hoặc cha): trong RAM, hoặc file np.memmap
+        "<name>.dat" trong thư mục lớp nếu đang chạy ở chế độ đĩa.
+        """
+        if self._layer_dir is None:
+            if fill is None:
+                return np.empty(shape, dtype=dtype)
+            return np.full(shape, fill, dtype=dtype)
+        path = os.path.join(self._layer_dir, name + ".dat")
+        array = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+        if fill is not None and fill != 0:
+            # Ghi theo khối để không phải giữ cả lớp trong RAM (file mới đã toàn số 0)
+            for start in range(0, shape[0], self.block_rows):
+                array[start:start + self.block_rows] = fill
+        return array
+
+    def _release_layer(self, array):
+        """
+        Giải phóng một lớp giá trị không còn dùng: ở chế độ đĩa thì xóa file
+        (vùng ánh xạ được hệ điều hành thu hồi khi mảng không còn được tham chiếu).
+        """
+        if isinstance(array, np.memmap):
+            os.remove(array.filename)
+
+    def _block_size(self, m):
+        """Số hàng mỗi khối: giữ mảng tạm (khoảng 4 mảng block x m x 8 byte) trong giới hạn bộ nhớ."""
+        if self._layer_dir is None:
+            return self.block_rows
+        return max(1024, min(self.block_rows, self.memory_limit // (4 * 8 * max(m, 1))))
+
+    # --- THUẬT TOÁN ---
+    def _run(self, num_cities):
+        """
+        Tính bảng DP và dựng lộ trình tối ưu. Trả về None nếu chạy xong (lời giải tối ưu hoặc
+        chứng minh không có chu trình), ngược lại (bị dừng / hết ngân sách) trả về cận dưới
+        suy ra từ lớp cuối cùng đã tính xong.
+        """
+        dist = np.asarray(self.tsp_problem.as_float_array(), dtype=np.float64)
+        m = num_cities - 1
+
+        if m == 0:
+            self.min_cost = float(dist[0, 0])
+            self.best_path = [0, 0]
+            return
+
+        # Chi phí giữa các thành phố 1..N-1 (đánh số lại 0..m-1)
+        inner = np.ascontiguousarray(dist[1:, 1:])
+        parent_dtype = self._parent_dtype(m)
+
+        # Lớp 1: dp[{j}][j] = d(0, j)
+        masks = np.left_shift(np.int64(1), np.arange(m, dtype=np.int64))
+        values = self._allocate_layer("values_1", (m, m), np.float64, fill=np.inf)
+        values[np.arange(m), np.arange(m)] = dist[0, 1:]
+        self._parents = [None, None]
+        self.layer_stats = []
+
+        states = m
+        for k in range(2, m + 1):
+            if not self.is_running or (self.has_budget() and self.check_budget(states)):
+                print("Held-Karp bị dừng.")
+                return self._layer_bound(masks, values, dist, m)
+            layer_start = time.perf_counter()
+            new_masks = self._next_layer_masks(masks, m)
+            new_values = self._allocate_layer(f"values_{k}", (len(new_masks), m), np.float64, fill=np.inf)
+            parents = self._allocate_layer(f"parents_{k}", (len(new_masks), m), parent_dtype)
+            if not self._compute_layer(masks, values, new_masks, new_values, parents, inner, m):
+                # Dừng giữa lớp: lớp k chưa dùng được, cận dưới lấy từ lớp k - 1
+                print("Held-Karp bị dừng.")
+                self._release_layer(new_values)
+                return self._layer_bound(masks, values, dist, m)
+            if isinstance(parents, np.memmap):
+                parents.flush()
+            self._parents.append(parents)
+            self._record_layer(k, new_masks, masks, new_values, values, parents, time.perf_counter() - layer_start)
+            self._release_layer(values)
+            masks, values = new_masks, new_values
+            states += len(masks) * k
+
+        # Đóng chu trình: quay về thành phố 0
+        closing = values[0] + dist[1:, 0]
+        last = int(np.argmin(closing))
+        if not np.isfinite(closing[last]):
+            print("Held-Karp: không tồn tại chu trình hợp lệ.")
+            return None
+        self.min_cost = closing[last].item()
+        self.best_path = self._rebuild_path(last, m)
+        return None
+
+    def _layer_bound(self, masks, values, dist, m):
+        """
+        Cận dưới của chi phí tối ưu từ một lớp đã tính xong: mọi chu trình đi qua đúng một trạng thái
+        (S, j) của lớp, phần còn lại cần một cạnh đi ra từ j và từ mỗi thành phố chưa thăm, nên
+            tối ưu >= min_{S, j} dp[S][j] + min_out[j] + tổng min_out của các thành phố ngoài S.
+        """
+        out = np.array(dist[1:], dtype=np.float64)
+        out[np.arange(m), np.arange(1, m + 1)] = np.inf
+        min_out = out.min(axis=1)
+        if not np.all(np.isfinite(min_out)):
+            return float('inf')
+        total = min_out.sum()
+        shifts = np.arange(m, dtype=np.int64)
+        bound = np.inf
+        block = self._block_size(m)
+        for start in range(0, len(masks), block):
+            bits = (masks[start:start + block, None] >> shifts) & 1
+            rest = total - bits @ min_out
+            candidates = np.asarray(values[start:start + block]) + min_out + rest[:, None]
+            bound = min(bound, candidates.min())
+        return float(bound)
+
+    def _record_layer(self, k, masks, prev_masks, values, prev_values, parents, seconds):
+        """Ghi thống kê của lớp k: số trạng thái, bộ nhớ đang giữ, thời gian và tốc độ."""
+        states = len(masks) * k
+        resident = masks.nbytes + prev_masks.nbytes
+        if self._layer_dir is None:
+            resident += values.nbytes + prev_values.nbytes + sum(p.nbytes for p in self._parents if p is not None)
+        stats = {
+            "layer": k,
+            "subsets": len(masks),
+            "states": states,
+            "value_bytes": values.nbytes,
+            "parent_bytes": parents.nbytes,
+            "resident_bytes": resident,
+            "seconds": seconds,
+            "states_per_sec": states / seconds if seconds > 0 else float('inf'),
+        }
+        self.layer_stats.append(stats)
+        if self._layer_dir is not None:
+            print(f"  Lớp {k}: {stats['subsets']} tập, {states} trạng thái, "
+                  f"giá trị {stats['value_bytes'] / 1024 ** 2:.1f} MB, cha {stats['parent_bytes'] / 1024 ** 2:.1f} MB, "
+                  f"{seconds:.2f}s ({stats['states_per_sec']:.0f} trạng thái/s)")
+
+    def _compute_layer(self, prev_masks, prev_values, masks, values, parents, inner, m):
+        """
+        Tính giá trị và cha của lớp hiện tại từ lớp trước, theo từng thành phố kết thúc j.
+        Trả về False nếu bị dừng giữa chừng (STOP hoặc hết thời gian của chế độ anytime).
+        """
+        block = self._block_size(m)
+        for j in range(m):
+            if not self.is_running or (self.time_limit is not None and self.check_budget()):
+                return False
+            bit = np.int64(1) << j
+            rows = np.flatnonzero(masks & bit)
+            column = inner[:, j]
+            for start in range(0, len(rows), block):
+                chunk = rows[start:start + block]
+                prev_rows = np.searchsorted(prev_masks, masks[chunk] ^ bit)
+                candidates = prev_values[prev_rows] + column
+                best = np.argmin(candidates, axis=1)
+                values[chunk, j] = candidates[np.arange(len(chunk)), best]
+                parents[chunk, j] = best
+        return True
+
+    def _rebuild_path(self, last, m):
+        """Dựng lại lộ trình từ bảng cha, đi ngược từ tập đầy đủ."""
+        mask = (1 << m) - 1
+        j = last
+        reverse_path = []
+        for k in range(m, 1, -1):
+            reverse_path.append(j + 1)
+            parent = int(self._parents[k][self._colex_rank(mask), j])
+            mask ^= 1 << j
+            j = parent
+        reverse_path.append(j + 1)
+        return [0] + reverse_path[::-1] + [0]
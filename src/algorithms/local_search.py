@@ -0,0 +1,182 @@
+# src/algorithms/local_search.py
+"""
+Heuristic xây dựng lộ trình và tìm kiếm cục bộ (2-opt, Or-opt) dựa trên lớp Tour.
+Dùng để tạo nhanh một lời giải tốt (cận trên ban đầu) cho các bộ giải chính xác.
+"""
+from collections import deque
+
+from src.models.tour import Tour
+
+# Chỉ nhận bước cải thiện thực sự (tránh lặp vô hạn do sai số số thực)
+_IMPROVEMENT_EPS = 1e-9
+
+
+def nearest_neighbor_tour(tsp_problem, start_city=0):
+    """
+    Láng giềng gần nhất: từ thành phố hiện tại luôn đi tới thành phố chưa thăm rẻ nhất.
+    Trả về lộ trình khép kín bắt đầu tại start_city, hoặc [] nếu bị kẹt (cạnh inf).
+    """
+    num_cities = tsp_problem.num_cities
+    if num_cities == 0:
+        return []
+    successors = tsp_problem.successor_lists(by="cost")
+    visited = [False] * num_cities
+    visited[start_city] = True
+    path = [start_city]
+    current = start_city
+    for _ in range(num_cities - 1):
+        next_city = next((c for c in successors[current] if not visited[c]), None)
+        if next_city is None:
+            return []
+        visited[next_city] = True
+        path.append(next_city)
+        current = next_city
+    if tsp_problem.get_cost(current, start_city) == float('inf'):
+        return []
+    return path + [start_city]
+
+
+def best_nearest_neighbor_tour(tsp_problem, max_starts=10):
+    """Chạy láng giềng gần nhất từ nhiều điểm xuất phát, trả về lộ trình rẻ nhất (bắt đầu tại 0)."""
+    best_path, best_cost = [], float('inf')
+    for start_city in range(min(max_starts, tsp_problem.num_cities)):
+        path = nearest_neighbor_tour(tsp_problem, start_city)
+        if not path:
+            continue
+        cost = tsp_problem.get_path_cost(path)
+        if cost < best_cost:
+            best_path, best_cost = Tour(tsp_problem, path).as_path(0), cost
+    return best_path, best_cost
+
+
+def improve_tour(tsp_problem, path, max_passes=50, or_opt_max_len=3):
+    """
+    Cải thiện lộ trình bằng 2-opt và Or-opt (first improvement) cho tới khi không còn bước tốt hơn.
+    Delta của mỗi bước tính O(1) nhờ Tour, đúng cho cả bài toán không đối xứng.
+    Trả về (lộ trình khép kín bắt đầu tại 0, chi phí).
+    """
+    tour = Tour(tsp_problem, path)
+    n = tour.num_cities
+    if n < 4:
+        return tour.as_path(0), tour.cost
+
+    for _ in range(max_passes):
+        improved = False
+
+        # 2-opt: đảo ngược đoạn order[i+1..j]
+        for i in range(n - 2):
+            for j in range(i + 2, n if i > 0 else n - 1):
+                if tour.two_opt_delta(i, j) < -_IMPROVEMENT_EPS:
+                    tour.apply_two_opt(i, j)
+                    improved = True
+
+        # Or-opt: dời đoạn ngắn order[i..i+len-1] sang sau order[j] (xuôi hoặc ngược)
+        for seg_len in range(1, or_opt_max_len + 1):
+            for i in range(1, n - seg_len + 1):
+                for j in range(n):
+                    if i - 1 <= j < i + seg_len:
+                        continue
+                    if tour.or_opt_delta(i, seg_len, j) < -_IMPROVEMENT_EPS:
+                        tour.apply_or_opt(i, seg_len, j)
+                        improved = True
+                        break
+                    if seg_len > 1 and tour.or_opt_delta(i, seg_len, j, reverse=True) < -_IMPROVEMENT_EPS:
+                        tour.apply_or_opt(i, seg_len, j, reverse=True)
+                        improved = True
+                        break
+
+        if not improved:
+            break
+
+    return tour.as_path(0), tour.cost
+
+
+def neighbor_lists(tsp_problem, k):
+    """Danh sách k láng giềng gần nhất (theo chi phí đi ra) của mỗi thành phố, dạng list Python."""
+    return [[c for c in row if c >= 0] for row in tsp_problem.get_candidates(k).tolist()]
+
+
+def improve_tour_neighbors(tsp_problem, path, neighbors, or_opt_max_len=3):
+    """
+    2-opt + Or-opt chỉ thử các bước tạo cạnh nối một thành phố với láng giềng gần của nó
+    (neighbors[city] = danh sách láng giềng), kèm "don't-look bits": chỉ các thành phố nằm trong
+    hàng đợi mới được xét; một thành phố không tìm được bước tốt hơn thì bị bỏ ra, và chỉ được đưa lại
+    khi một cạnh kề nó thay đổi. Mỗi lượt xét một thành phố là O(số láng giềng) thay vì O(N).
+    Delta tính bằng Tour nên đúng cho cả bài toán không đối xứng (tính cả chi phí đảo chiều đoạn).
+    Trả về (lộ trình khép kín bắt đầu tại 0, chi phí).
+    """
+    tour = Tour(tsp_problem, path)
+    n = tour.num_cities
+    if n < 5:
+        return improve_tour(tsp_problem, path, or_opt_max_len=or_opt_max_len)
+
+    queue = deque(tour.order)
+    queued = [False] * tsp_problem.num_cities
+    for city in tour.order:
+        queued[city] = True
+
+    def wake(*cities):
+        for city in cities:
+            if not queued[city]:
+                queued[city] = True
+                queue.append(city)
+
+    while queue:
+        city = queue.popleft()
+        queued[city] = False
+        moved = _two_opt_neighbors(tour, city, neighbors[city])
+        if moved is None:
+            moved = _or_opt_neighbors(tour, city, neighbors[city], or_opt_max_len)
+        if moved is not None:
+            # Đầu mút của các cạnh vừa thay đổi được xét lại (kể cả chính city)
+            wake(city, *moved)
+
+    return tour.as_path(0), tour.cost
+
+
+def _two_opt_neighbors(tour, city, neighbors):
+    """
+    Thử các bước 2-opt tạo cạnh nối city với một láng giềng c: bỏ cạnh ra của city và của c
+    (hoặc cạnh vào của city và của c). Thực hiện bước tốt đầu tiên, trả về các thành phố
+    ở đầu mút cạnh bị bỏ, hoặc None nếu không có bước nào tốt hơn.
+    """
+    order, pos, n = tour.order, tour.pos, tour.num_cities
+    p = pos[city]
+    for other in neighbors:
+        q = pos[other]
+        for i, j in ((p, q), (p - 1, q - 1)):
+            i, j = i % n, j % n
+            if i > j:
+                i, j = j, i
+            # Bỏ qua cạnh kề nhau và phép đảo cả vòng (không đổi lộ trình)
+            if j - i < 2 or (i == 0 and j == n - 1):
+                continue
+            if tour.two_opt_delta(i, j) < -_IMPROVEMENT_EPS:
+                ends = (order[i], order[i + 1], order[j], order[(j + 1) % n])
+                tour.apply_two_opt(i, j)
+                return ends
+    return None
+
+
+def _or_opt_neighbors(tour, city, neighbors, or_opt_max_len):
+    """
+    Thử dời đoạn bắt đầu tại city (dài 1..or_opt_max_len) tới cạnh kề một láng giềng c:
+    chèn xuôi ngay sau c, hoặc chèn ngược ngay trước c. Trả về các thành phố ở đầu mút
+    cạnh bị bỏ, hoặc None nếu không có bước nào tốt hơn.
+    """
+    order, pos, n = tour.order, tour.pos, tour.num_cities
+    i = pos[city]
+    for seg_len in range(1, or_opt_max_len + 1):
+        last = i + seg_len - 1
+        if i < 1 or last > n - 1:
+            break
+        for other in neighbors:
+            q = pos[other]
+            for j, reverse in ((q, False), ((q - 1) % n, seg_len > 1)):
+                if i - 1 <= j <= last:
+                    continue
+                if tour.or_opt_delta(i, seg_len, j, reverse) < -_IMPROVEMENT_EPS:
+                    ends = (order[i - 1], order[last], order[(last + 1) % n], order[j], order[(j + 1) % n])
+                    tour.apply_or_opt(i, seg_len, j, reverse)
+                    return ends
+    return None
@@ -0,0 +1,320 @@
+# src/algorithms/parallel_aco_solver.py
+import os
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.models.tsp_problem import TSPProblem
+from src.models.coord_problem import CoordTSPProblem
+from .aco_solver import ACOSolver
+from .aco_engine import NumpyACOEngine, CandidateACOEngine, pheromone_shape, heuristic_weights
+from .aco_convergence import ConvergenceMonitor, CONVERGENCE_ACTIONS
+
+# Các cách trao đổi giữa các đàn kiến
+MIGRATION_MODES = ("best", "pheromone")
+
+# Tham số của ACOSolver được sao chép sang từng đàn kiến
+_COLONY_PARAMS = ("num_ants", "alpha", "beta", "rho", "Q", "candidate_k", "engine", "pack_symmetric", "strategy",
+                  "q0", "xi", "mmas_deposit", "p_best", "restart_after", "local_search", "ls_neighbors",
+                  "stagnation_window", "branching_threshold", "branching_lambda", "entropy_threshold",
+                  "convergence_patience", "on_convergence", "max_restarts")
+
+
+class _ColonySolver(ACOSolver):
+    """
+    ACOSolver chạy trong tiến trình của một đàn kiến: is_running đọc cờ dừng dùng chung
+    (multiprocessing.Value), nên bộ máy dừng ngay giữa vòng lặp khi tiến trình chính yêu cầu.
+    """
+
+    def __init__(self, tsp_problem, stop_flag):
+        self._stop_flag = stop_flag
+        super().__init__(tsp_problem)
+
+    @property
+    def is_running(self):
+        return not self._stop_flag.value
+
+    @is_running.setter
+    def is_running(self, value):
+        # Chỉ tiến trình chính được bật/tắt cờ dừng
+        pass
+
+
+def _attach_problem(spec, shm):
+    """Dựng bài toán từ vùng nhớ chia sẻ (ma trận N x N hoặc tọa độ N x 2), không sao chép dữ liệu."""
+    kind, _, shape, options = spec
+    data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    if kind == "coords":
+        return CoordTSPProblem(data, metric=options["metric"], dtype=options["dtype"])
+    return TSPProblem(data)
+
+
+def _colony_main(colony_id, spec, params, seed_seq, pheromone_spec, heuristic_spec, first_count,
+                 stop_flag, reports, commands):
+    """Tiến trình của một đàn kiến: gắn vào shared memory, chạy _run_colony, báo lỗi (nếu có) về tiến trình chính."""
+    # Thứ tự: bài toán, mùi dùng chung (nếu có), eta^beta dùng chung (nếu có, luôn ở cuối)
+    blocks = [shared_memory.SharedMemory(name=spec[1])]
+    if pheromone_spec is not None:
+        blocks.append(shared_memory.SharedMemory(name=pheromone_spec[0]))
+    if heuristic_spec is not None:
+        blocks.append(shared_memory.SharedMemory(name=heuristic_spec[0]))
+    try:
+        _run_colony(colony_id, spec, params, seed_seq, pheromone_spec, heuristic_spec, first_count,
+                    stop_flag, reports, commands, blocks)
+    except Exception as e:
+        reports.put((colony_id, e))
+    # Các mảng trỏ vào shared memory đã được giải phóng cùng _run_colony
+    for block in blocks:
+        block.close()
+
+
+def _run_colony(colony_id, spec, params, seed_seq, pheromone_spec, heuristic_spec, count,
+                stop_flag, reports, commands, blocks):
+    """
+    Vòng đời của một đàn kiến: chạy count vòng lặp -> gửi lời giải tốt nhất về tiến trình chính -> chờ lệnh
+    (lời giải tốt nhất toàn cục và số vòng lặp của lượt tiếp theo, hoặc None để kết thúc) -> lặp lại.
+    Phát hiện hội tụ chạy trong từng đàn trên mùi của chính nó; đàn đã hội tụ (dừng hẳn) không chạy thêm
+    vòng lặp nào nhưng vẫn báo cáo và nhận lời giải trao đổi cho tới khi tiến trình chính kết thúc.
+    """
+    solver = _ColonySolver(_attach_problem(spec, blocks[0]), stop_flag)
+    for name, value in params.items():
+        setattr(solver, name, value)
+    if heuristic_spec is not None:
+        # eta^beta của tiến trình chính (chỉ đọc): bộ máy lấy từ bộ đệm của bài toán thay vì tính bản riêng
+        _, shape, packed = heuristic_spec
+        shared = np.ndarray(shape, dtype=np.float32, buffer=blocks[-1].buf)
+        shared.flags.writeable = False
+        heuristic_weights(solver.tsp_problem, solver.beta, packed, values=shared)
+    engine_class = CandidateACOEngine if solver.engine == "candidate" else NumpyACOEngine
+    engine = engine_class(solver, rng=np.random.default_rng(seed_seq))
+    solver._engine = engine
+    solver.pheromone_matrix = engine.pheromone
+    solver.heuristic_matrix = engine.heuristic_beta
+    monitor = ConvergenceMonitor(solver)
+    check_convergence = monitor.enabled()
+    converged = False
+
+    # Mùi của mọi đàn (hai bộ đệm theo chẵn/lẻ của lượt trao đổi, tránh đọc lúc đàn khác đang ghi)
+    slots = None
+    if pheromone_spec is not None:
+        _, shape, blend = pheromone_spec
+        slots = np.ndarray(shape, dtype=np.float32, buffer=blocks[1].buf)
+
+    epoch = 0
+    while True:
+        for _ in range(count):
+            if not solver.is_running or converged:
+                break
+            engine.run_iteration()
+            solver.iterations_completed += 1
+            converged = check_convergence and solver._check_convergence(monitor)
+        if slots is not None:
+            slots[epoch % 2, colony_id] = engine.pheromone
+        reports.put((colony_id, solver.min_cost, solver.best_path, solver.iterations_completed,
+                     solver.convergence_reason if converged else None, solver.convergence_restarts))
+
+        command = commands.get()
+        if command is None:
+            return
+        best_cost, best_path, count = command
+        if slots is not None:
+            # Trộn mùi: tau = (1 - blend) * tau + blend * trung bình mùi của mọi đàn
+            engine.pheromone *= (1.0 - blend)
+            engine.pheromone += blend * slots[epoch % 2].mean(axis=0)
+        elif best_path and best_cost < solver.min_cost:
+            # Di cư: nhận lộ trình tốt nhất toàn cục và rải mùi lên nó
+            solver.min_cost, solver.best_path = best_cost, best_path
+            engine.deposit(np.asarray([best_path]), np.array([solver.Q / best_cost]))
+        epoch += 1
+
+
+class ParallelACOSolver(ACOSolver):
+    """
+    ACO song song theo mô hình đảo (island model): num_colonies đàn kiến độc lập, mỗi đàn chạy trong
+    một tiến trình riêng với bộ sinh số ngẫu nhiên riêng (tách từ seed bằng np.random.SeedSequence).
+
+    - Dữ liệu bài toán (ma trận N x N, hoặc tọa độ với CoordTSPProblem) nằm trong shared memory;
+      các tiến trình đọc trực tiếp, không nhận bản sao qua pickle. Với bộ máy "numpy", eta^beta (chỉ đọc)
+      cũng được tính một lần và dùng chung, nên mỗi đàn chỉ giữ mảng mùi (và độ hấp dẫn nén) của riêng nó.
+    - Cứ exchange_interval vòng lặp các đàn trao đổi thông tin (migration):
+        "best"     : lộ trình tốt nhất toàn cục được gửi tới mọi đàn và rải mùi lên đó;
+        "pheromone": mùi của mọi đàn được ghi vào shared memory, mỗi đàn trộn mùi của mình với
+                     trung bình chung theo tỉ lệ blend.
+    - Các tham số ACO (num_ants, alpha, beta, rho, engine, strategy, ...) áp dụng cho từng đàn;
+      max_iterations / node_limit tính theo số vòng lặp của mỗi đàn.
+    Chế độ anytime (time_limit, target_gap) được kiểm tra ở tiến trình chính trong lúc chờ các đàn.
+    Phát hiện hội tụ (stagnation_window, branching_threshold, entropy_threshold, on_convergence) chạy
+    trong từng đàn; lời giải nhận qua trao đổi cũng tính là cải thiện. Khi mọi đàn đã hội tụ, lần chạy
+    dừng với stop_reason = "converged" (convergence_restarts là tổng số lần khởi động lại của các đàn).
+    """
+
+    def __init__(self, tsp_problem):
+        super().__init__(tsp_problem)
+        self.num_colonies = os.cpu_count() or 1
+        self.exchange_interval = 10
+        self.migration = "best"
+        self.blend = 0.5
+        # Lời giải tốt nhất của từng đàn ở lượt trao đổi gần nhất
+        self.colony_costs = []
+
+    def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
+        self.is_running = True
+        self.start_timer()
+
+        num_cities = self.tsp_problem.num_cities
+        if num_cities == 0:
+            self.stop_timer()
+            if finish_callback:
+                finish_callback(self.best_path, self.min_cost, self.runtime)
+            return
+        print(f"Bắt đầu chạy ACO song song ({self.num_colonies} đàn kiến)...")
+
+        self.iterations_completed = 0
+        self.convergence_reason = None
+        self.convergence_restarts = 0
+        self.convergence_iteration = None
+        blocks = []
+        try:
+            if self.on_convergence not in CONVERGENCE_ACTIONS:
+                raise ValueError(f"Hành động khi hội tụ '{self.on_convergence}' không hợp lệ. Hỗ trợ: {CONVERGENCE_ACTIONS}.")
+            if self.migration not in MIGRATION_MODES:
+                raise ValueError(f"Cách trao đổi '{self.migration}' không hợp lệ. Hỗ trợ: {MIGRATION_MODES}.")
+            if self.engine not in ("numpy", "candidate"):
+                raise ValueError("ACO song song chỉ hỗ trợ bộ máy 'numpy' hoặc 'candidate'.")
+            spec = self._share_problem(blocks)
+            pheromone_spec = None
+            if self.migration == "pheromone":
+                shape = (2, self.num_colonies) + pheromone_shape(self)
+                block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 4, 1))
+                blocks.append(block)
+                pheromone_spec = (block.name, shape, self.blend)
+            heuristic_spec = self._share_heuristic(blocks)
+            self._run_colonies(spec, pheromone_spec, heuristic_spec, update_callback)
+        except Exception as e:
+            print(f"Lỗi trong quá trình chạy ACO song song: {e}")
+            self.stop_reason = "error"
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        self.finish_anytime()
+        self.stop_timer()
+        if finish_callback:
+            finish_callback(self.best_path, self.min_cost, self.runtime)
+        print(f"ACO song song hoàn thành. Chi phí: {self.min_cost}, Khoảng cách: {self.gap:.2%}, "
+              f"Thời gian: {self.runtime:.4f}s")
+
+    def _share_problem(self, blocks):
+        """Chép dữ liệu bài toán vào shared memory một lần; trả về mô tả để các tiến trình gắn vào."""
+        if isinstance(self.tsp_problem, CoordTSPProblem):
+            data = self.tsp_problem.coords
+            kind = "coords"
+            options = {"metric": self.tsp_problem.metric, "dtype": self.tsp_problem.dtype.name}
+        else:
+            data = np.ascontiguousarray(self.tsp_problem.as_float_array(), dtype=np.float64)
+            kind = "matrix"
+            options = {}
+        block = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        blocks.append(block)
+        np.ndarray(data.shape, dtype=np.float64, buffer=block.buf)[:] = data
+        return kind, block.name, data.shape, options
+
+    def _share_heuristic(self, blocks):
+        """
+        eta^beta của bộ máy "numpy" (N x N hoặc tam giác trên nén) chép vào shared memory một lần;
+        trả về mô tả để các đàn gắn vào (None với bộ máy "candidate": mảng N x k nhỏ, mỗi đàn tự tính).
+        """
+        if self.engine != "numpy":
+            return None
+        packed = bool(self.pack_symmetric and self.tsp_problem.is_symmetric)
+        weights = heuristic_weights(self.tsp_problem, self.beta, packed)
+        block = shared_memory.SharedMemory(create=True, size=max(weights.nbytes, 1))
+        blocks.append(block)
+        np.ndarray(weights.shape, dtype=np.float32, buffer=block.buf)[:] = weights
+        return block.name, weights.shape, packed
+
+    def _next_count(self):
+        """Số vòng lặp của lượt tiếp theo: exchange_interval, không vượt max_iterations / node_limit."""
+        remaining = self.max_iterations - self.iterations_completed
+        if self.node_limit is not None:
+            remaining = min(remaining, self.node_limit - self.iterations_completed)
+        return max(0, min(max(1, int(self.exchange_interval)), remaining))
+
+    def _run_colonies(self, spec, pheromone_spec, heuristic_spec, update_callback):
+        ctx = mp.get_context()
+        stop_flag = ctx.Value('b', 0)
+        reports = ctx.Queue()
+        commands = [ctx.Queue() for _ in range(self.num_colonies)]
+        params = {name: getattr(self, name) for name in _COLONY_PARAMS}
+        seeds = np.random.SeedSequence(self.seed).spawn(self.num_colonies)
+        colonies = [ctx.Process(target=_colony_main,
+                                args=(i, spec, params, seeds[i], pheromone_spec, heuristic_spec, self._next_count(),
+                                      stop_flag, reports, commands[i]), daemon=True)
+                    for i in range(self.num_colonies)]
+        for process in colonies:
+            process.start()
+
+        self.colony_costs = [float('inf')] * self.num_colonies
+        try:
+            while True:
+                # Chờ báo cáo của mọi đàn; trong lúc chờ kiểm tra STOP và ngân sách anytime
+                iterations = {}
+                converged = {}
+                restarts = {}
+                while len(iterations) < self.num_colonies:
+                    if self.is_running and self.has_budget():
+                        self.check_budget(self.iterations_completed)
+                    if not self.is_running:
+                        stop_flag.value = 1
+                    # Xét tiến trình chết TRƯỚC khi đọc hàng đợi: dữ liệu một tiến trình đã gửi nằm sẵn trong
+                    # hàng đợi trước khi nó kết thúc, nên lần đọc dưới đây không bỏ sót báo cáo / lỗi cuối cùng
+                    dead = [i for i, process in enumerate(colonies)
+                            if i not in iterations and not process.is_alive()]
+                    try:
+                        report = reports.get(timeout=0.1)
+                    except queue.Empty:
+                        if dead:
+                            codes = ", ".join(f"{i} (exitcode {colonies[i].exitcode})" for i in dead)
+                            raise RuntimeError(f"Đàn kiến {codes} đã dừng đột ngột.")
+                        continue
+                    if isinstance(report[1], BaseException):
+                        raise report[1]
+                    colony_id, cost, path, done, reason, colony_restarts = report
+                    iterations[colony_id] = done
+                    restarts[colony_id] = colony_restarts
+                    if reason is not None:
+                        converged[colony_id] = reason
+                    self.colony_costs[colony_id] = cost
+                    if path and cost < self.min_cost:
+                        self.min_cost, self.best_path = cost, path
+                        if update_callback:
+                            update_callback(self.best_path)
+
+                self.iterations_completed = max(iterations.values())
+                self.convergence_restarts = sum(restarts.values())
+                if self.is_running and self.has_budget():
+                    self.check_budget(self.iterations_completed)
+                count = self._next_count()
+                finished = not self.is_running or count == 0
+                if not finished and len(converged) == self.num_colonies:
+                    # Các đàn có thể hội tụ theo tiêu chí khác nhau -> ghi đủ, ví dụ "branching, stagnation"
+                    self.convergence_reason = ", ".join(sorted(set(converged.values())))
+                    self.convergence_iteration = self.iterations_completed
+                    self.stop_reason = "converged"
+                    print(f"ACO song song hội tụ ({self.convergence_reason}) sau {self.iterations_completed} vòng lặp.")
+                    finished = True
+                for channel in commands:
+                    channel.put(None if finished else (self.min_cost, self.best_path, count))
+                if finished:
+                    break
+        finally:
+            stop_flag.value = 1
+            for channel in commands:
+                channel.put(None)
+            for process in colonies:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
@@ -0,0 +1,428 @@
+# src/algorithms/parallel_backtrack_solver.py
+import itertools
+import os
+import queue
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .base_solver import BaseSolver
+from .bitmask_dfs import BitmaskDFSEngine
+from .warm_start import apply_warm_start
+from .tree_estimate import knuth_estimate
+from .checkpoint import (problem_fingerprint, pack_lists, unpack_lists,
+                         save_checkpoint, load_checkpoint, remove_checkpoint)
+
+# Trạng thái riêng của mỗi tiến trình con (được khởi tạo một lần bởi _init_worker)
+_WORKER = {}
+
+
+class _SharedIncumbent:
+    """
+    Đối tượng "solver" đưa cho BitmaskDFSEngine trong tiến trình con:
+    min_cost đọc/ghi cận trên dùng chung (multiprocessing.Value), is_running đọc cờ dừng chung.
+    Lời giải tốt nhất tìm được trong tiến trình này được giữ lại để gửi về tiến trình chính.
+    """
+
+    def __init__(self, incumbent, stop_flag):
+        self._incumbent = incumbent
+        self._stop_flag = stop_flag
+        self._candidate_cost = float('inf')
+        self.local_cost = float('inf')
+        self.local_path = []
+
+    @property
+    def is_running(self):
+        return not self._stop_flag.value
+
+    @property
+    def min_cost(self):
+        return self._incumbent.value
+
+    @min_cost.setter
+    def min_cost(self, value):
+        self._candidate_cost = value
+        with self._incumbent.get_lock():
+            if value < self._incumbent.value:
+                self._incumbent.value = value
+
+    @property
+    def best_path(self):
+        return self.local_path
+
+    @best_path.setter
+    def best_path(self, path):
+        if self._candidate_cost < self.local_cost:
+            self.local_cost = self._candidate_cost
+            self.local_path = path
+
+
+def _init_worker(shm_name, num_cities, successors, min_edge, incumbent, stop_flag, symmetric, cache_size):
+    """
+    Gắn vào vùng nhớ chia sẻ chứa ma trận và dựng dữ liệu tìm kiếm (một lần cho mỗi tiến trình):
+    chỉ chi phí của các cạnh trong successors và cạnh quay về thành phố 0 được chép ra list Python,
+    ma trận đầy đủ không được sao chép vào tiến trình con.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    matrix = np.ndarray((num_cities, num_cities), dtype=np.float64, buffer=shm.buf)
+    _WORKER["shm"] = shm
+    _WORKER["successor_costs"] = [matrix[city, succ].tolist() for city, succ in enumerate(successors)]
+    _WORKER["return_costs"] = matrix[:, 0].tolist()
+    del matrix
+    _WORKER["successors"] = successors
+    _WORKER["min_edge"] = min_edge
+    _WORKER["incumbent"] = incumbent
+    _WORKER["stop_flag"] = stop_flag
+    _WORKER["symmetric"] = symmetric
+    _WORKER["cache_size"] = cache_size
+
+
+def _worker_main(init_args, tasks, results, report_interval):
+    """
+    Tiến trình con: khởi tạo một lần (_init_worker) rồi nhận cây con từ hàng đợi tasks cho tới khi gặp None.
+    Gửi về results các bộ (mã cây con, loại, dữ liệu): "done" (kết quả của _solve_subtree), "error"
+    (ngoại lệ) và "stack" (ngăn xếp đang duyệt, gửi mỗi report_interval giây để tiến trình chính
+    ghi vào checkpoint định kỳ).
+    """
+    _init_worker(*init_args)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            task_id, args = task
+
+            def report(stack, cost, path, nodes):
+                results.put((task_id, "stack", (stack, cost, path, nodes)))
+
+            try:
+                results.put((task_id, "done", _solve_subtree(*args, report=report,
+                                                             report_interval=report_interval)))
+            except Exception as e:
+                results.put((task_id, "error", e))
+    finally:
+        _WORKER.pop("shm").close()
+
+
+def _solve_subtree(prefix, prefix_cost, node_budget, sync_interval, resume=None,
+                   report=None, report_interval=float('inf')):
+    """
+    Duyệt cây con bên dưới lộ trình tiền tố trong tiến trình con (resume = ngăn xếp của lần duyệt
+    trước bị dừng giữa chừng, xem BitmaskDFSEngine.run). Mỗi report_interval giây, report(ngăn xếp,
+    chi phí tốt nhất, lộ trình tốt nhất, số nút) nhận vị trí hiện tại cùng lời giải tốt nhất tìm được
+    trong phần đã duyệt (phần đó sẽ bị bỏ qua khi tiếp tục từ ngăn xếp).
+    Trả về (chi phí tốt nhất, lộ trình, số nút, các nhánh chưa duyệt nếu hết ngân sách nút,
+    giới hạn dưới nhỏ nhất của các nhánh còn mở - inf nếu đã duyệt hết cây con,
+    ngăn xếp lúc bị dừng - None nếu không bị dừng).
+    """
+    proxy = _SharedIncumbent(_WORKER["incumbent"], _WORKER["stop_flag"])
+    engine = BitmaskDFSEngine(proxy, None, _WORKER["successors"], _WORKER["min_edge"],
+                              successor_costs=_WORKER["successor_costs"], return_costs=_WORKER["return_costs"])
+    engine.sync_interval = sync_interval
+    engine.node_limit = node_budget
+    engine.symmetric = _WORKER["symmetric"]
+    engine.cache_size = _WORKER["cache_size"]
+    # Ngăn xếp định kỳ và lúc bị dừng (để tiến trình chính ghi vào checkpoint)
+    stopped = []
+
+    def on_checkpoint(city, cost, pos, nodes, pruned):
+        stopped.append((city, cost, pos))
+        if report is not None:
+            report((city, cost, pos), proxy.local_cost, proxy.local_path, nodes)
+
+    engine.checkpoint_callback = on_checkpoint
+    engine.checkpoint_interval = report_interval
+    engine.run(prefix=prefix, prefix_cost=prefix_cost, resume=resume)
+    stack = stopped[-1] if stopped and not engine.frontier else None
+    return (proxy.local_cost, proxy.local_path, engine.nodes_explored, engine.frontier,
+            engine.open_bound, stack)
+
+
+class ParallelBacktrackSolver(BaseSolver):
+    """
+    Backtracking song song trên nhiều tiến trình (multiprocessing), tránh giới hạn GIL.
+
+    - Chia cây tìm kiếm thành các cây con bằng cách cố định k thành phố đầu tiên (split_depth).
+    - Ma trận khoảng cách nằm trong shared memory; cận trên tốt nhất là một multiprocessing.Value
+      dùng chung, nên mọi tiến trình cắt tỉa theo lời giải tốt nhất toàn cục.
+    - Chia lại động: một cây con chạy quá node_budget nút sẽ dừng và trả các nhánh chưa duyệt
+      về tiến trình chính để phân phát lại cho các tiến trình đang rảnh.
+    Mỗi cây con được duyệt bằng BitmaskDFSEngine (cùng luật cắt tỉa với Backtrack cải tiến,
+    kể cả phá đối xứng và bộ đệm trội riêng cho từng cây con).
+    Chế độ anytime được kiểm tra ở tiến trình chính; khi dừng sớm, lower_bound = giới hạn nhỏ nhất
+    của các cây con chưa duyệt xong.
+    Checkpoint (checkpoint_path khác None): danh sách cây con chưa xong, lời giải tốt nhất và các bộ đếm
+    được lưu mỗi checkpoint_interval giây và khi bị dừng; lần chạy sau tiếp tục từ các cây con đó.
+    Các tiến trình con gửi ngăn xếp của cây con đang duyệt mỗi checkpoint_interval giây, nên checkpoint
+    định kỳ (ví dụ trước khi máy bị sập) chỉ phải duyệt lại tối đa khoảng hai chu kỳ việc của mỗi cây con.
+    """
+
+    def __init__(self, tsp_problem):
+        super().__init__(tsp_problem)
+        self.num_workers = os.cpu_count() or 1
+        # Số thành phố cố định khi chia (None = tự chọn để có khoảng 4 cây con cho mỗi tiến trình)
+        self.split_depth = None
+        # Số nút tối đa của một lần chạy cây con trước khi chia lại
+        self.node_budget = 200000
+        # Chu kỳ (số nút) đọc lại cận trên dùng chung
+        self.sync_interval = 1024
+        self.symmetry_breaking = "auto"
+        self.dominance_cache_size = 100000
+        self.tasks_completed = 0
+        self.estimate_probes = 200
+        self._estimate_args = None
+        # Giới hạn nhỏ nhất của các nhánh bỏ dở khi dừng sớm (inf = đã duyệt hết)
+        self.open_bound = float('inf')
+        # File checkpoint (.npz, None = không lưu) và chu kỳ lưu (giây)
+        self.checkpoint_path = None
+        self.checkpoint_interval = 60.0
+        self.resumed = False
+        self._fingerprint = None
+
+    def solve(self, update_callback=None, finish_callback=None, sleep_time=0):
+        self.is_running = True
+        self.start_timer()
+
+        num_cities = self.tsp_problem.num_cities
+
+        if num_cities == 0:
+            self.stop_timer()
+            if finish_callback:
+                finish_callback(self.best_path, self.min_cost, self.runtime)
+            return
+        print(f"Bắt đầu chạy Backtrack song song ({self.num_workers} tiến trình)...")
+
+        shm = None
+        try:
+            # Tiếp tục lần chạy trước (nếu có checkpoint) thay cho khởi động nóng
+            state = None
+            self.resumed = False
+            if self.checkpoint_path:
+                self._fingerprint = problem_fingerprint(self.tsp_problem)
+                state = load_checkpoint(self.checkpoint_path, type(self).__name__, self._fingerprint)
+            if state is not None:
+                self.resumed = True
+                self.min_cost = float(state["min_cost"])
+                self.best_path = state["best_path"].tolist()
+                if update_callback and self.best_path:
+                    update_callback(self.best_path)
+                print(f"Tiếp tục từ checkpoint {self.checkpoint_path}: chi phí {self.min_cost}, "
+                      f"còn {len(state['task_costs'])} cây con")
+            else:
+                apply_warm_start(self, update_callback)
+            matrix = np.ascontiguousarray(self.tsp_problem.as_float_array(), dtype=np.float64)
+            shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+            np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+            self._run_pool(shm, matrix, num_cities, update_callback, state)
+            self.finish_anytime(self.open_bound, complete=self.open_bound == float('inf'))
+        except Exception as e:
+            print(f"Lỗi trong quá trình chạy Backtrack song song: {e}")
+            # Lời giải tốt nhất vẫn giữ, nhưng không được coi là đã chứng minh tối ưu
+            self.stop_reason = "error"
+            self.finish_anytime()
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        self.stop_timer()
+        if finish_callback:
+            finish_callback(self.best_path, self.min_cost, self.runtime)
+
+        print(f"Backtrack song song hoàn thành. Chi phí: {self.min_cost}, Số nút: {self.nodes_explored}, "
+              f"Thời gian: {self.runtime:.4f}s")
+
+    def estimate_tree_size(self):
+        """Ước lượng Knuth của cây tuần tự tương ứng (cùng luật cắt tỉa, không tính bộ đệm trội)."""
+        if self._estimate_args is None:
+            return 0
+        matrix, successors, min_edge, guard = self._estimate_args
+        return knuth_estimate(matrix, successors, min_edge, upper_bound=self.min_cost,
+                              guard=guard, probes=self.estimate_probes)
+
+    def _initial_tasks(self, matrix, successors, num_cities):
+        """Mở rộng theo chiều rộng tới split_depth thành phố cố định (hoặc đủ nhiều cây con)."""
+        target = 4 * self.num_workers
+        tasks = [([0], 0.0)]
+        depth = 0
+        while depth < num_cities - 2:
+            if self.split_depth is not None and depth >= self.split_depth:
+                break
+            if self.split_depth is None and len(tasks) >= target:
+                break
+            expanded = []
+            for path, cost in tasks:
+                last = path[-1]
+                for next_city in successors[last]:
+                    if next_city not in path:
+                        expanded.append((path + [next_city], cost + matrix[last, next_city]))
+            tasks = expanded
+            depth += 1
+        # Cây con rẻ hơn trước → sớm có cận trên tốt
+        tasks.sort(key=lambda task: task[1])
+        return tasks
+
+    def _save_checkpoint(self, tasks, nodes_explored=None):
+        """
+        Ghi các cây con chưa xong, lời giải tốt nhất và các bộ đếm. Mỗi cây con là
+        (lộ trình tiền tố, chi phí, ngăn xếp lúc bị dừng / lần báo gần nhất, hoặc None).
+        nodes_explored: số nút tính cả phần đã duyệt của các cây con đang chạy (None = self.nodes_explored).
+        """
+        if nodes_explored is None:
+            nodes_explored = self.nodes_explored
+        paths, offsets = pack_lists([path for path, _, _ in tasks])
+        stacks = [stack or ([], [], []) for _, _, stack in tasks]
+        stack_cities, stack_offsets = pack_lists([city for city, _, _ in stacks])
+        stack_positions, _ = pack_lists([pos for _, _, pos in stacks])
+        save_checkpoint(self.checkpoint_path, type(self).__name__, self._fingerprint,
+                        task_paths=paths, task_offsets=offsets,
+                        task_costs=np.asarray([cost for _, cost, _ in tasks], dtype=np.float64),
+                        stack_cities=stack_cities, stack_positions=stack_positions, stack_offsets=stack_offsets,
+                        stack_costs=np.asarray([c for _, cost, _ in stacks for c in cost], dtype=np.float64),
+                        min_cost=self.min_cost,
+                        best_path=np.asarray(self.best_path, dtype=np.int32),
+                        nodes_explored=nodes_explored, tasks_completed=self.tasks_completed)
+
+    def _run_pool(self, shm, matrix, num_cities, update_callback, state=None):
+        successors = self.tsp_problem.successor_lists(by="cost")
+        # Cạnh ra nhỏ nhất (kể cả cạnh chi phí 0) = thành phố kế tiếp đầu tiên trong danh sách đã sắp xếp
+        min_edge = [float(matrix[city, succ[0]]) if succ else 0 for city, succ in enumerate(successors)]
+
+        ctx = mp.get_context()
+        incumbent = ctx.Value('d', self.min_cost)
+        stop_flag = ctx.Value('b', 0)
+        task_queue = ctx.Queue()
+        results = ctx.Queue()
+
+        if self.symmetry_breaking == "auto":
+            symmetric = self.tsp_problem.is_symmetric
+        else:
+            symmetric = bool(self.symmetry_breaking)
+
+        guard = (successors[0][0], successors[0][1]) if symmetric and len(successors[0]) >= 2 else None
+        # Bộ ước lượng đọc thẳng mảng NumPy (không dựng thêm bản sao list N x N)
+        self._estimate_args = (matrix, successors, min_edge, guard)
+
+        if state is not None:
+            stack_offsets = state["stack_offsets"]
+            stacks = zip(unpack_lists(state["stack_cities"], stack_offsets),
+                         unpack_lists(state["stack_costs"], stack_offsets),
+                         unpack_lists(state["stack_positions"], stack_offsets))
+            tasks = [(path, cost, stack if stack[0] else None) for path, cost, stack in
+                     zip(unpack_lists(state["task_paths"], state["task_offsets"]),
+                         state["task_costs"].tolist(), stacks)]
+            self.nodes_explored = int(state["nodes_explored"])
+            self.tasks_completed = int(state["tasks_completed"])
+        else:
+            tasks = [(path, cost, None) for path, cost in self._initial_tasks(matrix, successors, num_cities)]
+            self.nodes_explored = 0
+            self.tasks_completed = 0
+        self.open_bound = float('inf')
+        total_min_edge = sum(min_edge)
+        # Các cây con đang chờ kết quả: id -> (lộ trình tiền tố, chi phí, ngăn xếp khôi phục, giới hạn dưới)
+        open_tasks = {}
+        task_ids = itertools.count()
+        # Số nút các cây con đang chạy đã duyệt tới lần báo ngăn xếp gần nhất
+        partial_nodes = {}
+        # Các cây con bị dừng giữa chừng, kèm ngăn xếp lúc dừng (được ghi vào checkpoint)
+        leftover = []
+        next_save = time.time() + self.checkpoint_interval
+
+        # Tự quản lý các tiến trình con (thay cho multiprocessing.Pool): tiến trình chỉ thoát khi nhận None,
+        # nên một tiến trình đã kết thúc trong lúc còn cây con chưa có kết quả là bị chết bất thường
+        init_args = (shm.name, num_cities, successors, min_edge, incumbent, stop_flag,
+                     symmetric, self.dominance_cache_size)
+        report_interval = self.checkpoint_interval if self.checkpoint_path else float('inf')
+        workers = [ctx.Process(target=_worker_main, args=(init_args, task_queue, results, report_interval),
+                               daemon=True)
+                   for _ in range(self.num_workers)]
+        for process in workers:
+            process.start()
+
+        def submit(path, cost, stack=None):
+            task_id = next(task_ids)
+            bound = cost + total_min_edge - sum(min_edge[c] for c in path)
+            open_tasks[task_id] = (path, cost, stack, bound)
+            task_queue.put((task_id, (path, cost, self.node_budget, self.sync_interval, stack)))
+
+        try:
+            for path, cost, stack in tasks:
+                submit(path, cost, stack)
+            pending = len(tasks)
+
+            while pending:
+                if self.is_running and self.has_budget():
+                    self.check_budget(self.nodes_explored,
+                                      min((task[3] for task in open_tasks.values()), default=self.min_cost))
+                # Checkpoint định kỳ: cây con đang chạy được lưu với ngăn xếp báo về gần nhất
+                if self.checkpoint_path and self.is_running and time.time() >= next_save:
+                    self._save_checkpoint([task[:3] for task in open_tasks.values()],
+                                          self.nodes_explored + sum(partial_nodes.values()))
+                    next_save = time.time() + self.checkpoint_interval
+                if not self.is_running:
+                    stop_flag.value = 1
+                # Xét tiến trình chết TRƯỚC khi đọc hàng đợi: kết quả một tiến trình đã gửi nằm sẵn trong
+                # hàng đợi trước khi nó kết thúc, nên lần đọc dưới đây không bỏ sót kết quả / lỗi cuối cùng
+                dead = [process.exitcode for process in workers if not process.is_alive()]
+                try:
+                    task_id, kind, result = results.get(timeout=0.1)
+                except queue.Empty:
+                    if dead:
+                        raise RuntimeError(f"Tiến trình con dừng bất thường (mã thoát {dead[0]}), "
+                                           f"{pending} cây con chưa có kết quả.")
+                    continue
+                if kind == "error":
+                    raise result
+                if kind == "stack":
+                    # Báo định kỳ (luôn đến trước kết quả "done" của cùng cây con): nhận lời giải tốt nhất
+                    # trong phần đã duyệt trước, rồi mới ghi ngăn xếp cho checkpoint
+                    stack, cost, path, nodes = result
+                    if path and cost < self.min_cost:
+                        self.min_cost = cost
+                        self.best_path = path
+                        if update_callback:
+                            update_callback(self.best_path)
+                    task_path, task_cost, _, bound = open_tasks[task_id]
+                    open_tasks[task_id] = (task_path, task_cost, stack, bound)
+                    partial_nodes[task_id] = nodes
+                    continue
+                pending -= 1
+
+                cost, path, nodes, frontier, open_bound, stack = result
+                task_path, task_cost, _, _ = open_tasks.pop(task_id)
+                partial_nodes.pop(task_id, None)
+                self.nodes_explored += nodes
+                self.report_progress(self.nodes_explored)
+                self.tasks_completed += 1
+                if path and cost < self.min_cost:
+                    self.min_cost = cost
+                    self.best_path = path
+                    if update_callback:
+                        update_callback(self.best_path)
+
+                # Cây con chưa xong → chia lại phần còn lại (hoặc ghi lại giới hạn nếu đã dừng)
+                if self.is_running:
+                    for sub_path, sub_cost in frontier:
+                        submit(sub_path, sub_cost)
+                    pending += len(frontier)
+                else:
+                    self.open_bound = min(self.open_bound, open_bound)
+                    leftover.extend((sub_path, sub_cost, None) for sub_path, sub_cost in frontier)
+                    if stack is not None:
+                        leftover.append((task_path, task_cost, stack))
+        finally:
+            stop_flag.value = 1
+            for _ in workers:
+                task_queue.put(None)
+            for process in workers:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        if self.checkpoint_path:
+            if leftover:
+                self._save_checkpoint(leftover)
+            else:
+                remove_checkpoint(self.checkpoint_path)
@@ -0,0 +1,67 @@
+# src/algorithms/tree_estimate.py
+"""
+Ước lượng kích thước cây tìm kiếm của Backtracking bằng phương pháp thăm dò ngẫu nhiên của Knuth.
+
+Mỗi lần thăm dò đi từ gốc xuống, ở mỗi nút đếm số nút con sinh ra (d_k) và chọn ngẫu nhiên
+một nút con còn sống sót sau cắt tỉa (s_k lựa chọn). Ước lượng không chệch của tổng số nút:
+    1 + d_1 + s_1 * d_2 + s_1 * s_2 * d_3 + ...
+Lấy trung bình trên nhiều lần thăm dò. Cách đếm "nút" giống BitmaskDFSEngine
+(mọi nút con được sinh ra, kể cả nút bị cắt).
+"""
+import random
+
+
+def knuth_estimate(matrix, successors, min_edge=None, upper_bound=float('inf'), guard=None,
+                   probes=200, start_city=0, rng=None):
+    """
+    Args:
+        matrix: Ma trận khoảng cách (matrix[i][j]).
+        successors: Danh sách thành phố kế tiếp của mỗi thành phố (chỉ cạnh có thật).
+        min_edge: Cạnh ra nhỏ nhất của mỗi thành phố để cắt tỉa như Backtrack cải tiến
+                  (None = không cắt tỉa, như Backtrack cơ bản).
+        upper_bound: Cận trên hiện tại (chi phí lời giải tốt nhất đã biết).
+        guard: Cặp (u, v) của luật phá đối xứng "u trước v" (None = không áp dụng).
+        probes: Số lần thăm dò.
+    Returns:
+        Số nút ước tính (float).
+    """
+    rng = rng or random.Random(0)
+    num_cities = len(successors)
+    if num_cities <= 1 or probes <= 0:
+        return 0.0
+    total_min_edge = sum(min_edge) - min_edge[start_city] if min_edge is not None else 0
+    guard_u, guard_v = guard if guard else (-1, -1)
+
+    total = 0.0
+    for _ in range(probes):
+        estimate, weight = 0.0, 1.0
+        city, cost, visited, remaining = start_city, 0, 1 << start_city, total_min_edge
+        depth = 0
+        while True:
+            generated = 0
+            survivors = []
+            is_last = depth + 1 == num_cities - 1
+            for next_city in successors[city]:
+                if (visited >> next_city) & 1:
+                    continue
+                generated += 1
+                new_cost = cost + matrix[city][next_city]
+                if min_edge is not None:
+                    new_remaining = remaining - min_edge[next_city]
+                    if new_cost >= upper_bound or new_cost + new_remaining >= upper_bound:
+                        continue
+                else:
+                    new_remaining = 0
+                if next_city == guard_v and not (visited >> guard_u) & 1:
+                    continue
+                if not is_last:
+                    survivors.append((next_city, new_cost, new_remaining))
+            estimate += weight * generated
+            if not survivors:
+                break
+            weight *= len(survivors)
+            city, cost, remaining = rng.choice(survivors)
+            visited |= 1 << city
+            depth += 1
+        total += estimate
+    return total / probes
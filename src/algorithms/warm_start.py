@@ -0,0 +1,97 @@
+# src/algorithms/warm_start.py
+"""
+Khởi động nóng (warm start) cho các bộ giải chính xác: tìm nhanh một lộ trình tốt bằng heuristic
+rồi gán vào best_path / min_cost, để việc cắt tỉa có hiệu lực ngay từ nút đầu tiên.
+
+Các cách khởi động (thuộc tính solver.warm_start):
+  - None      : không khởi động nóng (như cũ)
+  - "nearest" : láng giềng gần nhất (nhiều điểm xuất phát) + 2-opt/Or-opt
+  - "aco"     : chạy ACO ngắn + 2-opt/Or-opt; ma trận pheromone được giữ lại
+                (solver.warm_start_pheromone) để có thể dẫn hướng thứ tự rẽ nhánh
+"""
+import time
+
+from .aco_solver import ACOSolver
+from .local_search import best_nearest_neighbor_tour, improve_tour
+
+WARM_START_METHODS = (None, "nearest", "aco")
+
+
+class _WarmStartACO(ACOSolver):
+    """
+    ACOSolver của bước khởi động "aco": is_running đọc thêm cờ của bộ giải cha, nên bấm STOP
+    (hoặc bộ giải cha hết ngân sách) dừng luôn bước khởi động.
+    """
+
+    def __init__(self, tsp_problem, parent):
+        self._parent = parent
+        self._running = False
+        super().__init__(tsp_problem)
+
+    @property
+    def is_running(self):
+        return self._running and self._parent.is_running
+
+    @is_running.setter
+    def is_running(self, value):
+        self._running = value
+
+
+def apply_warm_start(solver, update_callback=None):
+    """
+    Chạy bước khởi động nóng theo solver.warm_start và gán kết quả vào solver
+    nếu tốt hơn cận trên hiện có. Thời gian và chi phí được ghi riêng vào
+    solver.warm_start_time / solver.warm_start_cost.
+    """
+    method = solver.warm_start
+    if method is None:
+        return
+    if method not in WARM_START_METHODS:
+        print(f"Lỗi khởi động nóng: cách '{method}' không hợp lệ. Hỗ trợ: {WARM_START_METHODS}.")
+        return
+
+    start_time = time.time()
+    tsp_problem = solver.tsp_problem
+    path, cost = best_nearest_neighbor_tour(tsp_problem)
+
+    if method == "aco" and solver.is_running:
+        aco = _WarmStartACO(tsp_problem, solver)
+        aco.max_iterations = solver.warm_start_iterations
+        # Thời gian của bước khởi động tính vào time_limit của bộ giải cha (đồng hồ đã chạy từ start_timer)
+        if solver.time_limit is not None:
+            aco.time_limit = max(0.0, solver.time_limit - (time.time() - solver._start_time))
+        aco.solve()
+        solver.warm_start_pheromone = aco.pheromone_rows()
+        if aco.best_path and aco.min_cost < cost:
+            path, cost = aco.best_path, aco.min_cost
+
+    # Bộ giải cha đã bị dừng hoặc hết thời gian trong lúc khởi động -> bỏ bước 2-opt/Or-opt
+    if solver.is_running and solver.time_limit is not None:
+        solver.check_budget()
+    if path and solver.is_running:
+        path, cost = improve_tour(tsp_problem, path)
+
+    solver.warm_start_time = time.time() - start_time
+    solver.warm_start_cost = cost
+    if path and cost < solver.min_cost:
+        solver.min_cost = cost
+        solver.best_path = path
+        if update_callback:
+            update_callback(solver.best_path)
+    print(f"Khởi động nóng ({method}): chi phí {cost}, thời gian {solver.warm_start_time:.4f}s")
+
+
+def pheromone_order(successors, pheromone, matrix, alpha=1.0, beta=2.0):
+    """
+    Sắp xếp lại danh sách thành phố kế tiếp theo độ hấp dẫn của ACO (tau^alpha * eta^beta) giảm dần;
+    thứ tự theo chi phí cũ được dùng để phân định khi bằng nhau.
+    """
+    ordered = []
+    for city, succ in enumerate(successors):
+        def desirability(item):
+            rank, next_city = item
+            cost = matrix[city][next_city]
+            eta = 1.0 / cost if cost > 0 else 1.0
+            return (-(pheromone[city][next_city] ** alpha) * (eta ** beta), rank)
+        ordered.append([c for _, c in sorted(enumerate(succ), key=desirability)])
+    return ordered
@@ -2,14 +2,19 @@
 import tkinter as tk
 from sklearn.manifold import MDS
 import numpy as np
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import threading
 import random
 import math
 from src.models.tsp_problem import TSPProblem
+from src.models.tsplib import load_tsplib
 from src.algorithms.backtrack_solver import BacktrackSolver
 from src.algorithms.backtrack_solver_improved import BacktrackSolverImproved
+from src.algorithms.parallel_backtrack_solver import ParallelBacktrackSolver
 from src.algorithms.aco_solver import ACOSolver
+from src.algorithms.parallel_aco_solver import ParallelACOSolver
+from src.algorithms.held_karp_solver import HeldKarpSolver
+from src.algorithms.branch_and_bound_solver import BranchAndBoundSolver
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
@@ -34,13 +39,25 @@ DEFAULT_MATRIX_1D = [
 SOLVER_CLASSES = {
     "Backtracking (Cơ bản)": BacktrackSolver, 
     "Backtracking (Cải tiến)": BacktrackSolverImproved,
-    "ACO (Metaheuristic)": ACOSolver
+    "Backtracking (Song song)": ParallelBacktrackSolver,
+    "Held-Karp (Quy hoạch động)": HeldKarpSolver,
+    "Branch and Bound (Nhánh cận)": BranchAndBoundSolver,
+    "ACO (Metaheuristic)": ACOSolver,
+    "ACO (Song song)": ParallelACOSolver
 }
 
 ALL_SOLVER_NAMES = [
-    "Backtracking (Cơ bản)", "Backtracking (Cải tiến)", "ACO (Metaheuristic)"
+    "Backtracking (Cơ bản)", "Backtracking (Cải tiến)", "Backtracking (Song song)",
+    "Held-Karp (Quy hoạch động)", "Branch and Bound (Nhánh cận)", "ACO (Metaheuristic)",
+    "ACO (Song song)"
 ]
 
+# Giới hạn hiển thị cho bài toán lớn (ví dụ nạp từ file TSPLIB)
+MAX_TREEVIEW_CITIES = 100
+MAX_MDS_CITIES = 200
+# Thời gian tối đa (giây) chờ bộ giải ghi checkpoint khi đóng ứng dụng
+CHECKPOINT_CLOSE_TIMEOUT = 10.0
+
 
 class TSPApp:
     def __init__(self, root):
@@ -58,6 +75,7 @@ class TSPApp:
         self.solver = None
         self.solver_thread = None
         self.is_inputting = False
+        self.file_problem = None  # Bài toán nạp từ file TSPLIB (giữ lại khi Reset)
 
         self.city_treeview = None
         self.comparison_results = {}
@@ -94,8 +112,10 @@ class TSPApp:
             except Exception:
                 pass
         if self.solver_thread and self.solver_thread.is_alive():
+            # Bộ giải có checkpoint cần thời gian ghi trạng thái cuối trước khi tắt hẳn
+            timeout = CHECKPOINT_CLOSE_TIMEOUT if getattr(self.solver, "checkpoint_path", None) else 0.2
             try:
-                self.solver_thread.join(timeout=0.2)
+                self.solver_thread.join(timeout=timeout)
             except Exception:
                 pass
         self.root.destroy()
@@ -234,6 +254,14 @@ class TSPApp:
                                      command=self._generate_random_data)
         self.random_btn.pack(side=tk.LEFT, padx=(10, 0))
 
+        ttk.Radiobutton(self.mode_frame, text="Tải file TSPLIB", variable=self.mode_var,
+                        value="file", command=self._on_mode_change).pack(anchor=tk.W)
+        self.file_options_frame = ttk.Frame(self.mode_frame)
+        self.file_options_frame.pack(anchor=tk.W, pady=(5, 10), padx=20)
+        self.load_file_btn = ttk.Button(self.file_options_frame, text="Chọn file (.tsp/.atsp)",
+                                        command=self._load_tsplib_file)
+        self.load_file_btn.pack(side=tk.LEFT)
+
         # Điều khiển
         action_frame = ttk.LabelFrame(control_frame, text="Điều khiển")
         action_frame.pack(fill=tk.X, pady=3)
@@ -358,6 +386,41 @@ class TSPApp:
         self._update_city_treeview()
         self._redraw_canvas()
         self._lock_controls(False)
+    #Chạy khi bấm nút "Chọn file". Đọc file TSPLIB (lần sau dùng cache .npy) rồi vẽ lên Canvas.
+    def _load_tsplib_file(self):
+        path = filedialog.askopenfilename(
+            title="Chọn file TSPLIB",
+            filetypes=[("TSPLIB", "*.tsp *.atsp"), ("Tất cả", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.file_problem = load_tsplib(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Lỗi", f"Không đọc được file TSPLIB:\n{e}")
+            return
+        self._reset()
+
+    #Chuyển tọa độ thật (từ file TSPLIB) sang tọa độ canvas.
+    def _generate_positions_from_coords(self, coords):
+        coords = np.asarray(coords, dtype=float)
+        coords_min, coords_max = coords.min(axis=0), coords.max(axis=0)
+        coords_norm = (coords - coords_min) / (coords_max - coords_min + 1e-9)
+        width = self.canvas.winfo_width() or 800
+        height = self.canvas.winfo_height() or 600
+        margin = 50
+        return [
+            {
+                'name': str(i),
+                'coords': (
+                    int(margin + coords_norm[i, 0] * (width - 2 * margin)),
+                    # Trục y của canvas hướng xuống -> lật lại cho đúng bản đồ
+                    int(height - margin - coords_norm[i, 1] * (height - 2 * margin))
+                )
+            }
+            for i in range(len(coords))
+        ]
+
     #Chạy khi bấm nút "Chạy Thuật Toán". Tạo một Luồng riêng (Thread) để chạy thuật toán (target=self.solver.solve), giúp giao diện không bị đơ.
     def _run_solver(self):
         if self.tsp_problem.num_cities == 0:
@@ -409,6 +472,14 @@ class TSPApp:
             self.tsp_problem.set_matrix(matrix_to_load)
             self.num_cities_var.set(self.tsp_problem.num_cities)
             self.status_label.config(text=f"Đã tải ma trận mặc định {scenario}.")
+        elif mode == "file":
+            self.is_inputting = False
+            if self.file_problem is not None:
+                self.tsp_problem = self.file_problem
+                self.status_label.config(
+                    text=f"Đã tải {self.tsp_problem.name} ({self.tsp_problem.num_cities} thành phố).")
+            else:
+                self.status_label.config(text="Hãy nhấn 'Chọn file' để tải bộ dữ liệu TSPLIB.")
         else:
             self.is_inputting = True
             n = int(self.num_cities_var.get())
@@ -418,8 +489,11 @@ class TSPApp:
         self.best_path_label.config(text="")
 
         n_cities = self.tsp_problem.num_cities
-        current_matrix = self.tsp_problem.dist_matrix
-        if n_cities > 0 and current_matrix:
+        if n_cities > 0 and self.tsp_problem.coords is not None:
+            # Bài toán có tọa độ thật -> vẽ đúng vị trí, không cần MDS
+            self.vis_nodes = self._generate_positions_from_coords(self.tsp_problem.coords)
+        elif 0 < n_cities <= MAX_MDS_CITIES:
+            current_matrix = self.tsp_problem.dist_matrix
             try:
                 # Thử dùng MDS để tạo vị trí từ ma trận khoảng cách
                 self.vis_nodes = self._generate_positions_from_distances(current_matrix)
@@ -428,7 +502,7 @@ class TSPApp:
                 # thì quay về cách vẽ vòng tròn
                 self._generate_vis_nodes(n_cities)
         else:
-            # Nếu không có ma trận (chế độ input chưa nhấn tạo)
+            # Nếu không có ma trận (chế độ input chưa nhấn tạo) hoặc ma trận quá lớn cho MDS
             self._generate_vis_nodes(n_cities)
 
 
@@ -442,8 +516,13 @@ class TSPApp:
             return
         for item in self.city_treeview.get_children():
             self.city_treeview.delete(item)
-        matrix = self.tsp_problem.dist_matrix
         n = self.tsp_problem.num_cities
+        if n > MAX_TREEVIEW_CITIES:
+            # Ma trận quá lớn để hiển thị từng ô
+            self.city_treeview['columns'] = ()
+            self.city_treeview.heading("#0", text=f"Ma trận {n}x{n} quá lớn để hiển thị")
+            return
+        matrix = self.tsp_problem.dist_matrix
         if n == 0 or not matrix:
             self.city_treeview['columns'] = ()
             self.city_treeview.heading("#0", text="Chưa có dữ liệu")
@@ -500,6 +579,8 @@ class TSPApp:
             except Exception:
                 pass
         self.random_btn.config(state=input_state)
+        file_state = tk.NORMAL if (self.mode_var.get() == "file" and not is_running) else tk.DISABLED
+        self.load_file_btn.config(state=file_state)
         if self.tsp_problem.num_cities > 0 and not is_running:
             self.run_btn.config(state=tk.NORMAL)
         else:
@@ -40,6 +40,12 @@ class BenchmarkWindow(tk.Toplevel):
         self.n_max_spinbox.set(10) # Mặc định 10 cho an toàn
         self.n_max_spinbox.pack(side=tk.LEFT, padx=5)
 
+        # Ngân sách thời gian cho mỗi lần chạy thuật toán chính xác (thay cho ngưỡng N cố định)
+        ttk.Label(control_frame, text="Giới hạn (giây):").pack(side=tk.LEFT, padx=(10, 5))
+        self.time_limit_spinbox = ttk.Spinbox(control_frame, from_=1, to=600, width=5)
+        self.time_limit_spinbox.set(10)
+        self.time_limit_spinbox.pack(side=tk.LEFT, padx=5)
+
         self.start_btn = ttk.Button(control_frame, text="Bắt đầu Chạy", command=self.start_benchmark)
         self.start_btn.pack(side=tk.LEFT, padx=15)
 
@@ -105,6 +111,7 @@ class BenchmarkWindow(tk.Toplevel):
         """Bắt đầu luồng chạy"""
         try:
             n_max = int(self.n_max_spinbox.get())
+            time_limit = float(self.time_limit_spinbox.get())
         except ValueError:
             return
 
@@ -118,10 +125,13 @@ class BenchmarkWindow(tk.Toplevel):
         total_steps = 3 * (n_max - n_start + 1)
         self.progress_bar["maximum"] = total_steps
 
-        threading.Thread(target=self.run_benchmark_task, args=(n_start, n_max), daemon=True).start()
+        threading.Thread(target=self.run_benchmark_task, args=(n_start, n_max, time_limit), daemon=True).start()
 
-    def run_benchmark_task(self, n_min, n_max):
-        """Hàm worker: Chạy vòng lặp đo lường có giới hạn N cho thuật toán chậm"""
+    def run_benchmark_task(self, n_min, n_max, time_limit=10):
+        """
+        Hàm worker: Chạy vòng lặp đo lường. Thuật toán chính xác chạy với ngân sách time_limit giây;
+        khi một thuật toán hết giờ (chưa chứng minh được tối ưu) thì bỏ qua nó ở các N lớn hơn.
+        """
         
         all_results = {}
         step_count = 0
@@ -134,6 +144,8 @@ class BenchmarkWindow(tk.Toplevel):
             }
             
             self.master.after(0, lambda s=scenario: self.status_lbl.config(text=f"Đang chạy kịch bản: {s}..."))
+            # Các thuật toán chính xác đã hết giờ ở N nhỏ hơn trong kịch bản này
+            timed_out = set()
 
             for n in range(n_min, n_max + 1):
                 # 1. Tạo dữ liệu
@@ -143,8 +155,9 @@ class BenchmarkWindow(tk.Toplevel):
                 scenario_data["n"].append(n)
 
                 # --- HÀM PHỤ ĐỂ CHẠY VÀ ĐO THỜI GIAN ---
-                def run_and_measure(SolverClass):
+                def run_and_measure(SolverClass, time_limit=None):
                     solver = SolverClass(problem)
+                    solver.time_limit = time_limit
                     start_time = time.perf_counter()
                     try:
                         solver.solve(lambda x: None, lambda p, c, t: None, 0) 
@@ -157,30 +170,25 @@ class BenchmarkWindow(tk.Toplevel):
                     cost = getattr(solver, 'min_cost', 0)
                     if cost == float('inf') or cost is None: cost = 0
                     
-                    return cost, duration
-
-                # 2. Chạy Backtrack Cơ bản (Giới hạn N <= 12)
-                if n > 12:
-                    # Quá tải -> Gán 0 để ngắt biểu đồ
-                    scenario_data["cost_bt"].append(0)
-                    scenario_data["time_bt"].append(0)
-                else:
-                    c_bt, t_bt = run_and_measure(BacktrackSolver)
-                    scenario_data["cost_bt"].append(c_bt)
-                    scenario_data["time_bt"].append(t_bt)
-
-                # 3. Chạy Backtrack Cải tiến (Giới hạn N <= 12)
-                if n > 12:
-                    # Quá tải -> Gán 0 để ngắt biểu đồ
-                    scenario_data["cost_bti"].append(0)
-                    scenario_data["time_bti"].append(0)
-                else:
-                    c_bti, t_bti = run_and_measure(BacktrackSolverImproved)
-                    scenario_data["cost_bti"].append(c_bti)
-                    scenario_data["time_bti"].append(t_bti)
+                    return cost, duration, solver.stop_reason
+
+                # 2 + 3. Chạy Backtrack Cơ bản và Cải tiến trong ngân sách thời gian
+                for key, SolverClass in (("bt", BacktrackSolver), ("bti", BacktrackSolverImproved)):
+                    if key in timed_out:
+                        # Đã hết giờ ở N nhỏ hơn -> Gán 0 để ngắt biểu đồ
+                        scenario_data["cost_" + key].append(0)
+                        scenario_data["time_" + key].append(0)
+                        continue
+                    cost, duration, reason = run_and_measure(SolverClass, time_limit)
+                    if reason == "time_limit":
+                        # Hết giờ: lời giải chưa chắc tối ưu -> không dùng làm chi phí chuẩn
+                        timed_out.add(key)
+                        cost = 0
+                    scenario_data["cost_" + key].append(cost)
+                    scenario_data["time_" + key].append(duration)
 
                 # 4. Chạy ACO (Luôn chạy)
-                c_aco, t_aco = run_and_measure(ACOSolver)
+                c_aco, t_aco, _ = run_and_measure(ACOSolver)
                 scenario_data["cost_aco"].append(c_aco)
                 scenario_data["time_aco"].append(t_aco)
 
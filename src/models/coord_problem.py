@@ -0,0 +1,330 @@
+# src/models/coord_problem.py
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from .tsp_problem import TSPProblem, select_nearest
+
+try:
+    # SciPy không bắt buộc: nếu có thì dùng KD-tree, nếu không thì dùng lưới (grid)
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Các kiểu khoảng cách theo chuẩn TSPLIB được hỗ trợ
+SUPPORTED_METRICS = ("EUC_2D", "CEIL_2D", "GEO", "ATT")
+
+# Các kiểu khoảng cách là hàm không giảm của khoảng cách Euclid -> tìm láng giềng bằng KD-tree/lưới được
+EUCLIDEAN_METRICS = ("EUC_2D", "CEIL_2D", "ATT")
+
+# Hằng số dùng cho kiểu GEO (theo tài liệu TSPLIB)
+GEO_PI = 3.141592
+GEO_EARTH_RADIUS = 6378.388
+
+
+class CoordTSPProblem(TSPProblem):
+    """
+    Biến thể TSPProblem tạo từ TỌA ĐỘ các thành phố thay vì ma trận N x N.
+
+    Khoảng cách được tính khi cần (lazy) theo công thức TSPLIB (EUC_2D, CEIL_2D, GEO, ATT):
+      - get_cost(i, j) tính trực tiếp một cạnh.
+      - _gather_costs / get_path_costs tính cả lô cạnh bằng NumPy.
+      - get_row(i) trả về cả một hàng, lấy từ bộ đệm LRU các khối hàng (giới hạn bộ nhớ).
+    Thuộc tính dist_matrix trả về một "view" lười, index matrix[i][j] như list lồng nhau,
+    nên mọi bộ giải hiện có đều dùng được mà không cần tạo ma trận đầy đủ.
+    """
+
+    def __init__(self, coords, metric="EUC_2D", dtype="float64",
+                 cache_bytes=64 * 1024 * 1024, block_rows=256):
+        """
+        Args:
+            coords: Mảng N x 2 tọa độ (x, y). Với GEO: (vĩ độ, kinh độ) dạng DDD.MM.
+            metric: Kiểu khoảng cách TSPLIB.
+            dtype: Kiểu lưu trữ các khối hàng trong bộ đệm.
+            cache_bytes: Giới hạn bộ nhớ của bộ đệm LRU (byte).
+            block_rows: Số hàng tối đa trong một khối của bộ đệm.
+        """
+        super().__init__(dtype=dtype)
+        metric = metric.upper()
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Kiểu khoảng cách '{metric}' không được hỗ trợ. Chọn một trong {SUPPORTED_METRICS}.")
+        self.metric = metric
+
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.ndim != 2 or coords.shape[1] != 2:
+            raise ValueError(f"Tọa độ phải có dạng N x 2, nhận được kích thước {coords.shape}.")
+        self.coords = np.ascontiguousarray(coords)
+        self.num_cities = coords.shape[0]
+        self._is_symmetric = True
+
+        # Với GEO, đổi trước sang radian (theo đúng công thức TSPLIB)
+        if metric == "GEO":
+            deg = np.trunc(self.coords)
+            minutes = self.coords - deg
+            self._geo = GEO_PI * (deg + 5.0 * minutes / 3.0) / 180.0
+        else:
+            self._geo = None
+
+        # Bộ đệm LRU: khóa = chỉ số khối, giá trị = mảng (block_rows x N)
+        self.cache_bytes = cache_bytes
+        row_bytes = max(1, self.num_cities * self.dtype.itemsize)
+        # Đảm bảo bộ đệm chứa được ít nhất vài khối
+        self.block_rows = int(max(1, min(block_rows, cache_bytes // (4 * row_bytes))))
+        self._blocks = OrderedDict()
+        self._cached_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def set_matrix(self, matrix, dtype=None):
+        raise TypeError("CoordTSPProblem được tạo từ tọa độ, không nạp ma trận. Dùng TSPProblem cho ma trận.")
+
+    # --- TÍNH KHOẢNG CÁCH ---
+    def _pairwise(self, rows, cols):
+        """Tính khoảng cách (float64) cho các cặp chỉ số rows -> cols (hỗ trợ broadcast)."""
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        if self.metric == "GEO":
+            a, b = self._geo[rows], self._geo[cols]
+            q1 = np.cos(a[..., 1] - b[..., 1])
+            q2 = np.cos(a[..., 0] - b[..., 0])
+            q3 = np.cos(a[..., 0] + b[..., 0])
+            inner = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+            dist = np.trunc(GEO_EARTH_RADIUS * np.arccos(inner) + 1.0)
+        else:
+            a, b = self.coords[rows], self.coords[cols]
+            dx = a[..., 0] - b[..., 0]
+            dy = a[..., 1] - b[..., 1]
+            sq = dx * dx + dy * dy
+            if self.metric == "EUC_2D":
+                dist = np.floor(np.sqrt(sq) + 0.5)
+            elif self.metric == "CEIL_2D":
+                dist = np.ceil(np.sqrt(sq))
+            else:  # ATT (pseudo-Euclidean)
+                r = np.sqrt(sq / 10.0)
+                t = np.floor(r + 0.5)
+                dist = np.where(t < r, t + 1.0, t)
+        # Khoảng cách từ một thành phố tới chính nó luôn bằng 0
+        return np.where(rows == cols, 0.0, dist)
+
+    def _scalar_cost(self, i, j):
+        """Tính khoảng cách một cạnh bằng math (nhanh hơn NumPy với một phần tử)."""
+        if i == j:
+            return 0.0
+        if self.metric == "GEO":
+            lat_i, lon_i = self._geo[i]
+            lat_j, lon_j = self._geo[j]
+            q1 = math.cos(lon_i - lon_j)
+            q2 = math.cos(lat_i - lat_j)
+            q3 = math.cos(lat_i + lat_j)
+            inner = min(1.0, max(-1.0, 0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)))
+            return float(int(GEO_EARTH_RADIUS * math.acos(inner) + 1.0))
+        xi, yi = self.coords[i]
+        xj, yj = self.coords[j]
+        sq = (xi - xj) ** 2 + (yi - yj) ** 2
+        if self.metric == "EUC_2D":
+            return float(math.floor(math.sqrt(sq) + 0.5))
+        if self.metric == "CEIL_2D":
+            return float(math.ceil(math.sqrt(sq)))
+        r = math.sqrt(sq / 10.0)
+        t = math.floor(r + 0.5)
+        return float(t + 1 if t < r else t)
+
+    def get_cost(self, city_from_idx, city_to_idx):
+        """Chi phí đi từ thành phố A đến B, tính trực tiếp từ tọa độ."""
+        try:
+            if not (0 <= city_from_idx < self.num_cities and 0 <= city_to_idx < self.num_cities):
+                raise IndexError
+            return self._scalar_cost(city_from_idx, city_to_idx)
+        except IndexError:
+            print(f"Lỗi: Cố gắng truy cập ma trận [{city_from_idx}][{city_to_idx}] - Không tồn tại")
+            return float('inf')
+        except TypeError:
+            print(f"Lỗi: Chỉ số thành phố không hợp lệ [{city_from_idx}][{city_to_idx}].")
+            return float('inf')
+
+    def _gather_costs(self, rows, cols):
+        costs = self._pairwise(rows, cols)
+        return costs, np.zeros(costs.shape, dtype=bool)
+
+    # --- BỘ ĐỆM KHỐI HÀNG (LRU) ---
+    def _get_block(self, block_id):
+        block = self._blocks.get(block_id)
+        if block is not None:
+            self._blocks.move_to_end(block_id)
+            self.cache_hits += 1
+            return block
+
+        self.cache_misses += 1
+        start = block_id * self.block_rows
+        stop = min(start + self.block_rows, self.num_cities)
+        block = self._row_block(start, stop).astype(self.dtype, copy=False)
+
+        self._blocks[block_id] = block
+        self._cached_bytes += block.nbytes
+        # Loại bỏ các khối ít dùng nhất khi vượt giới hạn bộ nhớ (luôn giữ khối vừa tạo)
+        while self._cached_bytes > self.cache_bytes and len(self._blocks) > 1:
+            _, old = self._blocks.popitem(last=False)
+            self._cached_bytes -= old.nbytes
+        return block
+
+    def _row_block(self, start, stop):
+        rows = np.arange(start, stop)[:, None]
+        cols = np.arange(self.num_cities)[None, :]
+        return self._pairwise(rows, cols)
+
+    def _build_candidates(self, k):
+        """
+        Với kiểu khoảng cách Euclid: tìm k + 1 láng giềng bằng KD-tree (SciPy) hoặc lưới,
+        rồi sắp xếp lại theo chi phí thật. Với GEO: quay về cách duyệt theo khối hàng.
+        Chi phí là hàm không giảm của khoảng cách Euclid, nên nếu láng giềng thứ k + 1 đắt hơn láng giềng
+        thứ k thì mọi thành phố bằng chi phí thứ k đều đã được xét; ngược lại (có thể còn thành phố bằng
+        chi phí ngoài phạm vi truy vấn) hàng đó được tính lại trên toàn bộ thành phố, để thứ tự
+        (chi phí, chỉ số) giống hệt cách duyệt theo khối hàng.
+        """
+        n = self.num_cities
+        if self.metric not in EUCLIDEAN_METRICS or k + 1 >= n:
+            return super()._build_candidates(k)
+        if cKDTree is not None:
+            # Không bỏ cột đầu: với các điểm trùng tọa độ, chính thành phố chưa chắc đứng đầu
+            _, neighbors = cKDTree(self.coords).query(self.coords, k=k + 2)
+        else:
+            neighbors = _grid_knn(self.coords, k + 1)
+        cities = np.arange(n)[:, None]
+        costs = self._pairwise(cities, neighbors)
+        costs[neighbors == cities] = np.inf
+        result = select_nearest(costs, k, cols=neighbors)
+
+        kth = np.partition(costs, k - 1, axis=1)[:, k - 1]
+        farthest = np.where(np.isfinite(costs), costs, -np.inf).max(axis=1)
+        ties = np.flatnonzero(farthest <= kth)
+        for start in range(0, len(ties), self.block_rows):
+            rows = ties[start:start + self.block_rows]
+            exact = self._pairwise(rows[:, None], np.arange(n)[None, :])
+            exact[np.arange(len(rows)), rows] = np.inf
+            result[rows] = select_nearest(exact, k)
+        return result
+
+    def get_row(self, city_idx):
+        """Trả về hàng chi phí đi ra từ city_idx (lấy từ bộ đệm LRU)."""
+        block = self._get_block(city_idx // self.block_rows)
+        return block[city_idx % self.block_rows]
+
+    def clear_cache(self):
+        """Giải phóng toàn bộ bộ đệm khối hàng."""
+        self._blocks.clear()
+        self._cached_bytes = 0
+
+    @property
+    def dist_matrix(self):
+        """View lười: matrix[i] trả về hàng i (từ bộ đệm), matrix[i][j] là chi phí i -> j."""
+        return _LazyMatrixView(self)
+
+    def as_float_array(self, max_bytes=2 * 1024 ** 3):
+        """
+        Tạo ma trận float64 đầy đủ (chỉ dùng cho N nhỏ, ví dụ bộ giải chính xác).
+        Báo MemoryError nếu ma trận vượt quá max_bytes.
+        """
+        n = self.num_cities
+        if n * n * 8 > max_bytes:
+            raise MemoryError(f"Ma trận {n}x{n} cần {n * n * 8 / 1024 ** 3:.1f} GB, vượt giới hạn cho phép.")
+        idx = np.arange(n)
+        return self._pairwise(idx[:, None], idx[None, :])
+
+
+class _LazyMatrixView:
+    """Đối tượng giả lập list lồng nhau cho CoordTSPProblem (không tạo ma trận thật)."""
+
+    def __init__(self, problem):
+        self._problem = problem
+
+    def __len__(self):
+        return self._problem.num_cities
+
+    def __bool__(self):
+        return self._problem.num_cities > 0
+
+    def __getitem__(self, city_idx):
+        if not -self._problem.num_cities <= city_idx < self._problem.num_cities:
+            raise IndexError(city_idx)
+        return self._problem.get_row(city_idx % self._problem.num_cities)
+
+    def __iter__(self):
+        for i in range(self._problem.num_cities):
+            yield self._problem.get_row(i)
+
+
+def _grid_knn(points, k):
+    """
+    Tìm k láng giềng gần nhất (Euclid) cho mọi điểm bằng lưới ô vuông đều.
+    Xử lý theo từng ô: mở rộng dần các "vòng" ô xung quanh cho tới khi chắc chắn
+    không còn điểm nào ngoài vùng đã xét có thể gần hơn láng giềng thứ k.
+    Output: mảng N x k chỉ số láng giềng (không gồm chính điểm đó).
+    """
+    n = len(points)
+    grid_size = max(1, int(math.sqrt(n / 2.0)))
+    low = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - low, 1e-12)
+    cell_w, cell_h = span / grid_size
+    min_cell = min(cell_w, cell_h)
+
+    cell_xy = np.minimum(((points - low) / span * grid_size).astype(np.int64), grid_size - 1)
+    cell_ids = cell_xy[:, 0] * grid_size + cell_xy[:, 1]
+    order = np.argsort(cell_ids, kind="stable")
+    sorted_ids = cell_ids[order]
+    all_cells = np.arange(grid_size * grid_size)
+    starts = np.searchsorted(sorted_ids, all_cells, side="left")
+    stops = np.searchsorted(sorted_ids, all_cells, side="right")
+
+    def ring_members(cx, cy, r):
+        parts = []
+        for x in range(cx - r, cx + r + 1):
+            if not 0 <= x < grid_size:
+                continue
+            ys = range(cy - r, cy + r + 1) if abs(x - cx) == r else (cy - r, cy + r)
+            for y in ys:
+                if 0 <= y < grid_size:
+                    c = x * grid_size + y
+                    if stops[c] > starts[c]:
+                        parts.append(order[starts[c]:stops[c]])
+        return parts
+
+    result = np.empty((n, k), dtype=np.int64)
+    for cell in np.unique(sorted_ids):
+        members = order[starts[cell]:stops[cell]]
+        cx, cy = divmod(int(cell), grid_size)
+        gathered = [members]
+        count = len(members)
+        r = 0
+        while True:
+            # Đủ ứng viên -> kiểm tra điều kiện dừng theo khoảng cách thứ k lớn nhất trong ô
+            if count > k or r >= grid_size:
+                pool = np.concatenate(gathered)
+                nearest, kth = _nearest_in_pool(points, members, pool, k)
+                if r >= grid_size or kth <= r * min_cell:
+                    break
+            r += 1
+            parts = ring_members(cx, cy, r)
+            gathered.extend(parts)
+            count += sum(len(p) for p in parts)
+        result[members] = nearest
+    return result
+
+
+def _nearest_in_pool(points, members, pool, k, chunk=512):
+    """
+    k điểm gần nhất trong pool cho từng điểm của members (xử lý theo lô để giới hạn bộ nhớ).
+    Trả về (chỉ số láng giềng, khoảng cách thứ k lớn nhất trong các điểm).
+    """
+    nearest = np.empty((len(members), k), dtype=np.int64)
+    kth = 0.0
+    pool_points = points[pool]
+    for start in range(0, len(members), chunk):
+        group = members[start:start + chunk]
+        diff = points[group][:, None, :] - pool_points[None, :, :]
+        dist = np.sqrt((diff ** 2).sum(axis=2))
+        dist[pool[None, :] == group[:, None]] = np.inf
+        part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        kth = max(kth, np.take_along_axis(dist, part, axis=1).max())
+        nearest[start:start + len(group)] = pool[part]
+    return nearest, kth
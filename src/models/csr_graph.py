@@ -0,0 +1,115 @@
+# src/models/csr_graph.py
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Đồ thị thưa dạng CSR (Compressed Sparse Row) chỉ chứa các cạnh có đường đi thật.
+
+    - indptr[i] : indptr[i + 1] là đoạn của thành phố i trong indices/costs.
+    - Trong mỗi hàng, cạnh được sắp xếp tăng dần theo chi phí (bằng nhau thì theo chỉ số),
+      nên duyệt một hàng chính là duyệt các thành phố kế tiếp theo thứ tự "rẻ trước".
+    - keys/key_costs: các cạnh sắp theo khóa i * N + j để tra cứu chi phí một cạnh bằng tìm kiếm nhị phân.
+    Bộ nhớ tỉ lệ với số cạnh E, không phải N^2.
+    """
+
+    def __init__(self, num_nodes, indptr, indices, costs):
+        self.num_nodes = num_nodes
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.costs = np.asarray(costs, dtype=np.float64)
+
+        rows = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(self.indptr))
+        keys = rows * num_nodes + self.indices
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.key_costs = self.costs[order]
+
+    @classmethod
+    def from_edges(cls, num_nodes, sources, targets, costs):
+        """Tạo đồ thị từ danh sách cạnh (sources[k] -> targets[k] với chi phí costs[k])."""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        costs = np.asarray(costs, dtype=np.float64)
+        keep = np.isfinite(costs) & (sources != targets)
+        sources, targets, costs = sources[keep], targets[keep], costs[keep]
+
+        # Cạnh trùng lặp (cùng i -> j) chỉ giữ lại cạnh rẻ nhất
+        order = np.lexsort((costs, targets, sources))
+        sources, targets, costs = sources[order], targets[order], costs[order]
+        first = np.ones(len(sources), dtype=bool)
+        first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        sources, targets, costs = sources[first], targets[first], costs[first]
+
+        # Sắp xếp theo (hàng, chi phí, chỉ số cột)
+        order = np.lexsort((targets, costs, sources))
+        sources, targets, costs = sources[order], targets[order], costs[order]
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        return cls(num_nodes, indptr, targets, costs)
+
+    @classmethod
+    def from_problem(cls, tsp_problem, block_cells=1 << 22):
+        """Tạo đồ thị thưa từ một TSPProblem dạng ma trận (đọc theo khối hàng để giới hạn bộ nhớ tạm)."""
+        n = tsp_problem.num_cities
+        block = max(1, block_cells // max(n, 1))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        index_parts, cost_parts = [], []
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            costs = tsp_problem._row_block(start, stop)
+            costs[np.arange(stop - start), np.arange(start, stop)] = np.inf
+            cols = np.broadcast_to(np.arange(n), costs.shape)
+            order = np.lexsort((cols, costs), axis=1)
+            sorted_costs = np.take_along_axis(costs, order, axis=1)
+            valid = np.isfinite(sorted_costs)
+            indptr[start + 1:stop + 1] = valid.sum(axis=1)
+            index_parts.append(order[valid])
+            cost_parts.append(sorted_costs[valid])
+        np.cumsum(indptr, out=indptr)
+        indices = np.concatenate(index_parts) if index_parts else np.zeros(0)
+        costs = np.concatenate(cost_parts) if cost_parts else np.zeros(0)
+        return cls(n, indptr, indices, costs)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def density(self):
+        """Tỉ lệ cạnh có thật trên tổng số cạnh có thể (không tính đường chéo)."""
+        possible = self.num_nodes * (self.num_nodes - 1)
+        return self.num_edges / possible if possible else 0.0
+
+    @property
+    def nbytes(self):
+        return (self.indptr.nbytes + self.indices.nbytes + self.costs.nbytes
+                + self.keys.nbytes + self.key_costs.nbytes)
+
+    def row(self, node):
+        """Các thành phố kế tiếp của node và chi phí tương ứng (tăng dần theo chi phí)."""
+        start, stop = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:stop], self.costs[start:stop]
+
+    def lookup(self, rows, cols):
+        """Tra cứu chi phí các cạnh rows -> cols (vector hóa). Cạnh không tồn tại -> inf."""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        wanted = rows * self.num_nodes + cols
+        pos = np.searchsorted(self.keys, wanted)
+        pos_clipped = np.minimum(pos, max(len(self.keys) - 1, 0))
+        if len(self.keys) == 0:
+            return np.full(wanted.shape, np.inf)
+        found = self.keys[pos_clipped] == wanted
+        result = np.where(found, self.key_costs[pos_clipped], np.inf)
+        return np.where(rows == cols, 0.0, result)
+
+    def successor_lists(self, by="cost"):
+        """Danh sách Python các thành phố kế tiếp của từng thành phố, theo chi phí hoặc theo chỉ số."""
+        indices = self.indices.tolist()
+        indptr = self.indptr.tolist()
+        lists = [indices[indptr[i]:indptr[i + 1]] for i in range(self.num_nodes)]
+        if by == "index":
+            for row in lists:
+                row.sort()
+        return lists
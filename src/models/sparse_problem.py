@@ -0,0 +1,125 @@
+# src/models/sparse_problem.py
+import numpy as np
+
+from .tsp_problem import TSPProblem
+from .csr_graph import CSRGraph
+
+
+class SparseTSPProblem(TSPProblem):
+    """
+    Bài toán TSP cho đồ thị thưa (ví dụ mạng đường bộ): chỉ lưu các cạnh có thật dạng CSR,
+    bộ nhớ tỉ lệ với số cạnh thay vì N^2. Cặp thành phố không có cạnh được coi là inf.
+    dist_matrix trả về một view lười: matrix[i][j] tra cứu cạnh bằng tìm kiếm nhị phân.
+    """
+
+    def __init__(self, num_cities, sources, targets, costs, symmetric=False):
+        """
+        Args:
+            num_cities: Số thành phố.
+            sources, targets, costs: Danh sách cạnh có hướng sources[k] -> targets[k].
+            symmetric: True nếu mỗi cạnh đi được cả hai chiều với cùng chi phí.
+        """
+        super().__init__()
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        costs = np.asarray(costs, dtype=np.float64)
+        if symmetric:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+            costs = np.concatenate([costs, costs])
+        self.num_cities = int(num_cities)
+        self.csr = CSRGraph.from_edges(self.num_cities, sources, targets, costs)
+
+    def set_matrix(self, matrix, dtype=None):
+        raise TypeError("SparseTSPProblem được tạo từ danh sách cạnh, không nạp ma trận. Dùng TSPProblem cho ma trận.")
+
+    @property
+    def is_symmetric(self):
+        if self._is_symmetric is None:
+            n = self.num_cities
+            rows = self.csr.keys // n
+            cols = self.csr.keys % n
+            reverse_costs = self.csr.lookup(cols, rows)
+            self._is_symmetric = bool(np.array_equal(reverse_costs, self.csr.key_costs))
+        return self._is_symmetric
+
+    def get_cost(self, city_from_idx, city_to_idx):
+        try:
+            if not (0 <= city_from_idx < self.num_cities and 0 <= city_to_idx < self.num_cities):
+                raise IndexError
+            return float(self.csr.lookup(city_from_idx, city_to_idx))
+        except IndexError:
+            print(f"Lỗi: Cố gắng truy cập ma trận [{city_from_idx}][{city_to_idx}] - Không tồn tại")
+            return float('inf')
+        except TypeError:
+            print(f"Lỗi: Chỉ số thành phố không hợp lệ [{city_from_idx}][{city_to_idx}].")
+            return float('inf')
+
+    def _gather_costs(self, rows, cols):
+        costs = self.csr.lookup(rows, cols)
+        return costs, np.isinf(costs)
+
+    def _row_block(self, start, stop):
+        rows = np.full((stop - start, self.num_cities), np.inf)
+        for i in range(start, stop):
+            indices, costs = self.csr.row(i)
+            rows[i - start, indices] = costs
+            rows[i - start, i] = 0.0
+        return rows
+
+    def get_row(self, city_idx):
+        return self._row_block(city_idx, city_idx + 1)[0]
+
+    def as_float_array(self):
+        return self._row_block(0, self.num_cities)
+
+    @property
+    def dist_matrix(self):
+        return _SparseMatrixView(self)
+
+
+class _SparseMatrixView:
+    """Đối tượng giả lập list lồng nhau cho SparseTSPProblem."""
+
+    def __init__(self, problem):
+        self._problem = problem
+
+    def __len__(self):
+        return self._problem.num_cities
+
+    def __bool__(self):
+        return self._problem.num_cities > 0
+
+    def __getitem__(self, city_idx):
+        if not 0 <= city_idx < self._problem.num_cities:
+            raise IndexError(city_idx)
+        return _SparseRowView(self._problem, city_idx)
+
+    def __iter__(self):
+        for i in range(self._problem.num_cities):
+            yield _SparseRowView(self._problem, i)
+
+
+class _SparseRowView:
+    """Một hàng của ma trận thưa: row[j] tra cứu chi phí i -> j trong O(log E)."""
+
+    def __init__(self, problem, city_idx):
+        self._problem = problem
+        self._city = city_idx
+
+    def __len__(self):
+        return self._problem.num_cities
+
+    def __getitem__(self, city_to_idx):
+        if not 0 <= city_to_idx < self._problem.num_cities:
+            raise IndexError(city_to_idx)
+        if city_to_idx == self._city:
+            return 0.0
+        csr = self._problem.csr
+        key = self._city * csr.num_nodes + city_to_idx
+        pos = int(np.searchsorted(csr.keys, key))
+        if pos < len(csr.keys) and csr.keys[pos] == key:
+            return float(csr.key_costs[pos])
+        return float('inf')
+
+    def __iter__(self):
+        return iter(self._problem.get_row(self._city).tolist())
@@ -0,0 +1,230 @@
+# src/models/tour.py
+
+
+class Tour:
+    """
+    Lớp Tour biểu diễn một chu trình (vòng khép kín) trên TSPProblem và cho phép
+    đánh giá chi phí thay đổi (delta) của các phép biến đổi cục bộ trong O(1):
+      - 2-opt   : đảo ngược một đoạn
+      - Or-opt  : dời một đoạn ngắn sang vị trí khác (có thể đảo chiều)
+      - Swap    : đổi chỗ hai thành phố
+      - Or2opt  : 3-opt dạng hoán đổi hai đoạn liền kề (không đảo chiều)
+
+    Lộ trình được lưu dạng hoán vị vòng `order` (không lặp lại điểm đầu),
+    `pos[city]` là vị trí của thành phố trong `order`.
+
+    Với bài toán KHÔNG đối xứng, đảo một đoạn làm thay đổi chi phí mọi cạnh bên trong,
+    nên lớp duy trì bộ đệm tổng tiền tố (prefix sum) theo chiều xuôi và chiều ngược:
+    chi phí một đoạn xuôi/ngược được tính bằng một phép trừ.
+    """
+
+    def __init__(self, tsp_problem, path):
+        """
+        Args:
+            tsp_problem: Đối tượng TSPProblem.
+            path: Lộ trình, có thể khép kín [0, 2, 1, 3, 0] hoặc không [0, 2, 1, 3].
+        """
+        self.tsp_problem = tsp_problem
+        self.dist = tsp_problem.dist_matrix
+        self.is_symmetric = tsp_problem.is_symmetric
+
+        order = list(path)
+        if len(order) > 1 and order[0] == order[-1]:
+            order.pop()
+        self.order = order
+        self.num_cities = len(order)
+        self.pos = [0] * tsp_problem.num_cities
+        for idx, city in enumerate(order):
+            self.pos[city] = idx
+
+        # Bộ đệm tổng tiền tố: fwd[k] = tổng chi phí các cạnh order[t] -> order[t+1] với t < k.
+        # Cạnh vô cực được đếm riêng (fwd_inf) để phép trừ không sinh ra nan (inf - inf).
+        self._fwd = [0.0] * self.num_cities
+        self._fwd_inf = [0] * self.num_cities
+        self._rev = [0.0] * self.num_cities
+        self._rev_inf = [0] * self.num_cities
+        self._rebuild_prefix(0)
+
+        self.cost = tsp_problem.get_path_cost(self.as_path())
+
+    # --- TIỆN ÍCH ---
+    def as_path(self, start_city=0):
+        """Trả về lộ trình khép kín bắt đầu (và kết thúc) tại start_city, ví dụ [0, 2, 1, 3, 0]."""
+        if not self.order:
+            return []
+        k = self.pos[start_city] if start_city in self.order else 0
+        path = self.order[k:] + self.order[:k]
+        return path + [path[0]]
+
+    def _rebuild_prefix(self, start):
+        """Tính lại bộ đệm tổng tiền tố từ vị trí start trở về sau (các vị trí trước không đổi)."""
+        order, dist, n = self.order, self.dist, self.num_cities
+        fwd, fwd_inf = self._fwd, self._fwd_inf
+        rev, rev_inf = self._rev, self._rev_inf
+        inf = float('inf')
+        start = max(start, 1)
+        for k in range(start, n):
+            a, b = order[k - 1], order[k]
+            c = dist[a][b]
+            if c == inf:
+                fwd[k], fwd_inf[k] = fwd[k - 1], fwd_inf[k - 1] + 1
+            else:
+                fwd[k], fwd_inf[k] = fwd[k - 1] + c, fwd_inf[k - 1]
+            if self.is_symmetric:
+                continue
+            c = dist[b][a]
+            if c == inf:
+                rev[k], rev_inf[k] = rev[k - 1], rev_inf[k - 1] + 1
+            else:
+                rev[k], rev_inf[k] = rev[k - 1] + c, rev_inf[k - 1]
+
+    def segment_cost(self, i, j, reverse=False):
+        """
+        Chi phí đi qua đoạn order[i..j] (i <= j): theo chiều xuôi, hoặc chiều ngược
+        order[j] -> ... -> order[i] nếu reverse=True. Độ phức tạp O(1).
+        """
+        if reverse and not self.is_symmetric:
+            if self._rev_inf[j] - self._rev_inf[i] > 0:
+                return float('inf')
+            return self._rev[j] - self._rev[i]
+        if self._fwd_inf[j] - self._fwd_inf[i] > 0:
+            return float('inf')
+        return self._fwd[j] - self._fwd[i]
+
+    def _reversal_extra(self, i, j):
+        """Chênh lệch chi phí bên trong đoạn order[i..j] khi bị đảo chiều (bằng 0 nếu đối xứng)."""
+        if self.is_symmetric or i >= j:
+            return 0.0
+        return self._delta([self.segment_cost(i, j, reverse=True)], [self.segment_cost(i, j)])
+
+    @staticmethod
+    def _delta(added, removed):
+        """Delta = tổng cạnh thêm - tổng cạnh bỏ, xử lý đúng các cạnh vô cực."""
+        add_sum = sum(added)
+        if add_sum == float('inf'):
+            return float('inf')
+        remove_sum = sum(removed)
+        if remove_sum == float('inf'):
+            return -float('inf')
+        return add_sum - remove_sum
+
+    # --- 2-OPT ---
+    def two_opt_delta(self, i, j):
+        """
+        Delta khi đảo ngược đoạn order[i+1..j] (0 <= i < j < N):
+        bỏ cạnh (order[i], order[i+1]), (order[j], order[j+1]);
+        thêm cạnh (order[i], order[j]), (order[i+1], order[j+1]).
+        """
+        order, d, n = self.order, self.dist, self.num_cities
+        a, b = order[i], order[i + 1]
+        c, e = order[j], order[(j + 1) % n]
+        delta = self._delta([d[a][c], d[b][e]], [d[a][b], d[c][e]])
+        return delta + self._reversal_extra(i + 1, j)
+
+    def apply_two_opt(self, i, j):
+        """Thực hiện phép 2-opt (i, j) và cập nhật bộ đệm."""
+        delta = self.two_opt_delta(i, j)
+        self.order[i + 1:j + 1] = self.order[i + 1:j + 1][::-1]
+        for k in range(i + 1, j + 1):
+            self.pos[self.order[k]] = k
+        self._rebuild_prefix(i + 1)
+        self._add_cost(delta)
+        return delta
+
+    # --- OR-OPT ---
+    def or_opt_delta(self, i, seg_len, j, reverse=False):
+        """
+        Delta khi dời đoạn order[i..i+seg_len-1] sang giữa order[j] và order[j+1].
+        - Đoạn không được vắt qua cuối mảng (i + seg_len <= N).
+        - j phải nằm ngoài đoạn và khác i-1 (vị trí hiện tại).
+        - reverse=True: chèn đoạn theo chiều ngược lại.
+        """
+        order, d, n = self.order, self.dist, self.num_cities
+        last = i + seg_len - 1
+        p, s0, s1, nx = order[i - 1], order[i], order[last], order[(last + 1) % n]
+        a, b = order[j], order[(j + 1) % n]
+        removed = [d[p][s0], d[s1][nx], d[a][b]]
+        if reverse:
+            delta = self._delta([d[p][nx], d[a][s1], d[s0][b]], removed)
+            return delta + self._reversal_extra(i, last)
+        return self._delta([d[p][nx], d[a][s0], d[s1][b]], removed)
+
+    def apply_or_opt(self, i, seg_len, j, reverse=False):
+        """Thực hiện phép Or-opt và cập nhật bộ đệm."""
+        delta = self.or_opt_delta(i, seg_len, j, reverse)
+        segment = self.order[i:i + seg_len]
+        after_city = self.order[j]
+        if reverse:
+            segment.reverse()
+        rest = self.order[:i] + self.order[i + seg_len:]
+        k = rest.index(after_city) + 1
+        self.order = rest[:k] + segment + rest[k:]
+        self._reindex()
+        self._add_cost(delta)
+        return delta
+
+    # --- SWAP ---
+    def swap_delta(self, i, j):
+        """Delta khi đổi chỗ hai thành phố ở vị trí i và j (i != j)."""
+        order, d, n = self.order, self.dist, self.num_cities
+        if i > j:
+            i, j = j, i
+        # Trường hợp liền kề (kể cả liền kề qua đầu/cuối vòng)
+        if j == i + 1 or (i == 0 and j == n - 1):
+            if i == 0 and j == n - 1 and n > 2:
+                i, j = j, i
+            p, x, y, q = order[i - 1], order[i], order[j], order[(j + 1) % n]
+            delta = self._delta([d[p][y], d[y][x], d[x][q]], [d[p][x], d[x][y], d[y][q]])
+            return delta
+        pi, x, ni = order[i - 1], order[i], order[i + 1]
+        pj, y, nj = order[j - 1], order[j], order[(j + 1) % n]
+        return self._delta([d[pi][y], d[y][ni], d[pj][x], d[x][nj]],
+                           [d[pi][x], d[x][ni], d[pj][y], d[y][nj]])
+
+    def apply_swap(self, i, j):
+        """Thực hiện phép đổi chỗ và cập nhật bộ đệm."""
+        delta = self.swap_delta(i, j)
+        order = self.order
+        order[i], order[j] = order[j], order[i]
+        self.pos[order[i]], self.pos[order[j]] = i, j
+        self._rebuild_prefix(min(i, j))
+        self._add_cost(delta)
+        return delta
+
+    # --- OR2OPT (3-OPT HOÁN ĐỔI ĐOẠN) ---
+    def or2opt_delta(self, i, j, k):
+        """
+        Delta của phép 3-opt "or2opt" (0 <= i < j < k < N): hoán đổi hai đoạn liền kề
+        S1 = order[i+1..j] và S2 = order[j+1..k] mà KHÔNG đảo chiều đoạn nào:
+            ... order[i], S2, S1, order[k+1] ...
+        Đây là phép 3-opt duy nhất không cần đảo chiều nên luôn O(1), kể cả khi không đối xứng.
+        """
+        order, d, n = self.order, self.dist, self.num_cities
+        a, b = order[i], order[i + 1]
+        c, e = order[j], order[j + 1]
+        f, g = order[k], order[(k + 1) % n]
+        return self._delta([d[a][e], d[f][b], d[c][g]], [d[a][b], d[c][e], d[f][g]])
+
+    def apply_or2opt(self, i, j, k):
+        """Thực hiện phép or2opt và cập nhật bộ đệm."""
+        delta = self.or2opt_delta(i, j, k)
+        order = self.order
+        order[i + 1:k + 1] = order[j + 1:k + 1] + order[i + 1:j + 1]
+        for t in range(i + 1, k + 1):
+            self.pos[order[t]] = t
+        self._rebuild_prefix(i + 1)
+        self._add_cost(delta)
+        return delta
+
+    def _add_cost(self, delta):
+        """Cộng delta vào tổng chi phí; nếu có vô cực thì tính lại toàn bộ để tránh nan."""
+        if delta in (float('inf'), -float('inf')) or self.cost == float('inf'):
+            self.cost = self.tsp_problem.get_path_cost(self.as_path())
+        else:
+            self.cost += delta
+
+    def _reindex(self):
+        """Cập nhật lại toàn bộ bảng vị trí và bộ đệm (dùng sau các phép dời đoạn)."""
+        for idx, city in enumerate(self.order):
+            self.pos[city] = idx
+        self._rebuild_prefix(1)
@@ -1,50 +1,254 @@
 # src/models/tsp_problem.py
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+# Các kiểu dữ liệu được hỗ trợ cho ma trận khoảng cách
+SUPPORTED_DTYPES = ("float64", "float32", "int32")
+
+# Mật độ cạnh (tỉ lệ cạnh có đường đi) dưới ngưỡng này thì tự động dựng thêm dạng thưa CSR
+SPARSE_DENSITY_THRESHOLD = 0.85
+
 
 class TSPProblem:
     """
     Lớp TSP Problem lưu trữ ma trận khoảng cách (matrix) và tính toán chi phí khi được hỏi.
+
+    Dữ liệu được lưu dưới dạng mảng NumPy liên tục (contiguous) với kiểu dữ liệu chọn trước
+    (float64, float32 hoặc int32), kèm một mặt nạ boolean (inf_mask) đánh dấu các cạnh
+    không có đường đi (inf). Thuộc tính dist_matrix vẫn trả về dạng list lồng nhau
+    để các bộ giải cũ (duyệt matrix[i][j]) chạy được như trước.
     """
-    def __init__(self, matrix=None):
+    def __init__(self, matrix=None, dtype="float64"):
         # Ban đầu chưa có thành phố nào (số lượng = 0)
         self.num_cities = 0
-        # Ma trận khoảng cách ban đầu là rỗng
-        self.dist_matrix = []
+        # Kiểu dữ liệu lưu trữ ma trận
+        self.dtype = self._check_dtype(dtype)
+        # Ma trận khoảng cách dạng mảng NumPy (N x N) và mặt nạ các cạnh vô cực
+        self.matrix = np.zeros((0, 0), dtype=self.dtype)
+        self.inf_mask = np.zeros((0, 0), dtype=bool)
+        # Bản sao dạng list (tạo lười - chỉ khi có bộ giải cần tới)
+        self._list_view = None
+        # Cờ đối xứng (tính lười, None = chưa tính)
+        self._is_symmetric = None
+        # Tọa độ thành phố (chỉ có với bài toán tạo từ tọa độ, xem CoordTSPProblem)
+        self.coords = None
+        # Tên bài toán (ví dụ tên bộ dữ liệu TSPLIB)
+        self.name = ""
+        # Chỉ mục k láng giềng gần nhất đã tính (khóa = k)
+        self._candidates = {}
+        # Dạng thưa CSR (chỉ các cạnh có thật) và danh sách kế tiếp dạng list Python
+        self.csr = None
+        self._successors = {}
+        # Dữ liệu dẫn xuất do bộ giải tính và dùng lại giữa các lần chạy (xem get_derived)
+        self._derived = {}
+        self.sparse_threshold = SPARSE_DENSITY_THRESHOLD
         # Nếu lúc khởi tạo có đưa ma trận vào thì thiết lập luôn
-        if matrix:
+        if matrix is not None and len(matrix) > 0:
             self.set_matrix(matrix)
 
-    
-    def set_matrix(self, matrix):
+    @staticmethod
+    def _check_dtype(dtype):
+        dtype = np.dtype(dtype)
+        if dtype.name not in SUPPORTED_DTYPES:
+            raise ValueError(f"Kiểu dữ liệu '{dtype.name}' không được hỗ trợ. Chọn một trong {SUPPORTED_DTYPES}.")
+        return dtype
+
+    def set_matrix(self, matrix, dtype=None):
         """
         Hàm này dùng để nạp hoặc thay đổi dữ liệu bản đồ.
-        Input: matrix là list lồng nhau (bảng 2 chiều). 
+        Input: matrix là list lồng nhau (bảng 2 chiều) hoặc mảng NumPy N x N.
         Ví dụ: matrix[0][1] là khoảng cách từ thành phố 0 đến 1.
+        dtype: kiểu lưu trữ (float64, float32, int32). Bỏ trống thì giữ kiểu hiện tại.
         """
-        self.dist_matrix = matrix  
-        # Nếu ma trận có dữ liệu
-        if matrix:
-            # Tự động đếm số lượng thành phố dựa trên độ dài ma trận
-            self.num_cities = len(matrix)
-        else:
-            # Nếu ma trận rỗng thì reset về 0
+        if dtype is not None:
+            self.dtype = self._check_dtype(dtype)
+        self._list_view = None
+        self._is_symmetric = None
+        self._candidates = {}
+        self.csr = None
+        self._successors = {}
+        self._derived = {}
+
+        # Nếu ma trận rỗng thì reset về 0
+        if matrix is None or len(matrix) == 0:
             self.num_cities = 0
+            self.matrix = np.zeros((0, 0), dtype=self.dtype)
+            self.inf_mask = np.zeros((0, 0), dtype=bool)
+            return
+
+        source = np.asarray(matrix)
+        if source.ndim != 2 or source.shape[0] != source.shape[1]:
+            raise ValueError(f"Ma trận khoảng cách phải vuông (N x N), nhận được kích thước {source.shape}.")
+
+        # Mảng số nguyên không thể chứa inf -> mặt nạ rỗng (np.zeros không tốn bộ nhớ thật cho tới khi ghi)
+        if source.dtype.kind == 'f':
+            self.inf_mask = np.isinf(source)
+        else:
+            self.inf_mask = np.zeros(source.shape, dtype=bool)
+
+        if self.dtype.kind == 'f':
+            # Kiểu số thực lưu được inf trực tiếp -> không cần sao chép nếu đã đúng kiểu
+            self.matrix = np.ascontiguousarray(source, dtype=self.dtype)
+        else:
+            # Kiểu số nguyên: ô vô cực được ghi 0, giá trị thật nằm trong inf_mask
+            if self.inf_mask.any():
+                source = np.where(self.inf_mask, 0, source)
+            self.matrix = np.ascontiguousarray(source, dtype=self.dtype)
+
+        # Tự động đếm số lượng thành phố dựa trên kích thước ma trận
+        self.num_cities = self.matrix.shape[0]
+
+        # Đồ thị thưa (nhiều cạnh inf) -> dựng thêm dạng CSR để các bộ giải chỉ duyệt cạnh có thật
+        if self.inf_mask.any() and self.density < self.sparse_threshold:
+            self.csr = CSRGraph.from_problem(self)
+
+    @property
+    def density(self):
+        """Tỉ lệ cạnh có đường đi (khác inf) trên tổng số cạnh có thể, không tính đường chéo."""
+        if self.csr is not None:
+            return self.csr.density
+        n = self.num_cities
+        if n < 2:
+            return 0.0
+        missing = int(self.inf_mask.sum()) - int(self.inf_mask.diagonal().sum())
+        return 1.0 - missing / (n * (n - 1))
+
+    def get_csr(self):
+        """Trả về dạng thưa CSR của bài toán (dựng khi cần nếu chưa có)."""
+        if self.csr is None:
+            self.csr = CSRGraph.from_problem(self)
+        return self.csr
+
+    def successor_lists(self, by="cost"):
+        """
+        Danh sách các thành phố kế tiếp (chỉ cạnh có thật, không gồm chính nó) của từng thành phố,
+        dạng list Python cho các vòng lặp trong bộ giải.
+        by="cost": tăng dần theo chi phí (bằng nhau theo chỉ số); by="index": tăng dần theo chỉ số.
+        """
+        lists = self._successors.get(by)
+        if lists is None:
+            lists = self.get_csr().successor_lists(by)
+            self._successors[by] = lists
+        return lists
+
+    @property
+    def dist_matrix(self):
+        """
+        Dạng list lồng nhau của ma trận (tương thích với các bộ giải cũ).
+        Ô không có đường đi luôn là float('inf'), bất kể kiểu lưu trữ.
+        """
+        if self._list_view is None:
+            rows = self.matrix.tolist()
+            if self.dtype.kind != 'f':
+                for i, j in np.argwhere(self.inf_mask).tolist():
+                    rows[i][j] = float('inf')
+            self._list_view = rows
+        return self._list_view
+
+    @property
+    def is_symmetric(self):
+        """True nếu d(i, j) == d(j, i) với mọi cặp (kể cả các cạnh vô cực)."""
+        if self._is_symmetric is None:
+            self._is_symmetric = bool(np.array_equal(self.matrix, self.matrix.T)
+                                      and np.array_equal(self.inf_mask, self.inf_mask.T))
+        return self._is_symmetric
+
+    def as_float_array(self):
+        """
+        Trả về ma trận dạng float64 có inf (dùng cho các bộ giải vector hóa).
+        Không sao chép nếu dữ liệu đã lưu ở float64.
+        """
+        if self.dtype == np.float64:
+            return self.matrix
+        result = self.matrix.astype(np.float64)
+        result[self.inf_mask] = np.inf
+        return result
+
+    def get_row(self, city_idx):
+        """Trả về hàng chi phí đi ra từ city_idx dạng mảng float64 (ô không có đường = inf)."""
+        if self.dtype == np.float64:
+            return self.matrix[city_idx]
+        row = self.matrix[city_idx].astype(np.float64)
+        row[self.inf_mask[city_idx]] = np.inf
+        return row
+
+    def _row_block(self, start, stop):
+        """Bản sao float64 (có inf) của các hàng [start, stop) - dùng khi cần xử lý theo khối."""
+        rows = self.matrix[start:stop].astype(np.float64)
+        rows[self.inf_mask[start:stop]] = np.inf
+        return rows
+
+    def get_candidates(self, k):
+        """
+        Chỉ mục ứng viên: với mỗi thành phố, k thành phố kề gần nhất (theo chi phí đi ra),
+        sắp xếp tăng dần theo chi phí (bằng nhau thì theo chỉ số), bỏ qua cạnh vô cực.
+        Output: mảng int32 N x k, ô trống (không đủ k cạnh hợp lệ) = -1.
+        Kết quả được tính một lần và lưu lại cho các lần gọi sau.
+        """
+        k = int(min(max(k, 0), max(self.num_cities - 1, 0)))
+        candidates = self._candidates.get(k)
+        if candidates is None:
+            if k == 0:
+                candidates = np.zeros((self.num_cities, 0), dtype=np.int32)
+            else:
+                candidates = self._build_candidates(k)
+            self._candidates[k] = candidates
+        return candidates
+
+    def get_derived(self, key, build):
+        """
+        Dữ liệu dẫn xuất từ bài toán (ví dụ eta^beta của ACO): build() chỉ được gọi lần đầu với mỗi key,
+        các lần sau (kể cả từ bộ giải khác) dùng lại kết quả đã lưu. Bị xóa khi nạp ma trận mới.
+        """
+        value = self._derived.get(key)
+        if value is None:
+            value = build()
+            self._derived[key] = value
+        return value
+
+    def _build_candidates(self, k):
+        """Dựng chỉ mục ứng viên bằng argpartition trên từng khối hàng của ma trận."""
+        n = self.num_cities
+        if self.csr is not None:
+            # Các hàng CSR đã sắp xếp theo chi phí -> chỉ cần lấy k phần tử đầu mỗi hàng
+            result = np.full((n, k), -1, dtype=np.int32)
+            for i in range(n):
+                indices, _ = self.csr.row(i)
+                result[i, :min(k, len(indices))] = indices[:k]
+            return result
+        result = np.empty((n, k), dtype=np.int32)
+        # Mỗi khối khoảng 4 triệu ô để giới hạn bộ nhớ tạm
+        block = max(1, (1 << 22) // n)
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            costs = self._row_block(start, stop)
+            # Không tính cạnh đi tới chính nó
+            costs[np.arange(stop - start), np.arange(start, stop)] = np.inf
+            result[start:stop] = select_nearest(costs, k)
+        return result
 
     def get_cost(self, city_from_idx, city_to_idx):
         """
         Helper: Trả lời câu hỏi "Đi từ thành phố A đến B tốn bao nhiêu?"
         """
         try:
-            # Thử lấy giá trị trong ma trận tại hàng [city_from] cột [city_to]
-            return self.dist_matrix[city_from_idx][city_to_idx]
-        
+            # Đọc thẳng từ mảng NumPy (không dựng dạng list lồng nhau); .item() trả về số Python
+            # cùng kiểu với dist_matrix (int với int32), ô không có đường đi là inf
+            if not (0 <= city_from_idx < self.num_cities and 0 <= city_to_idx < self.num_cities):
+                raise IndexError
+            if self.inf_mask[city_from_idx, city_to_idx]:
+                return float('inf')
+            return self.matrix[city_from_idx, city_to_idx].item()
+
         except IndexError:
             # Lỗi này xảy ra nếu bạn hỏi thành phố số 10 mà bản đồ chỉ có 5 thành phố
             print(f"Lỗi: Cố gắng truy cập ma trận [{city_from_idx}][{city_to_idx}] - Không tồn tại")
             return float('inf') # Trả về vô cực (coi như không đi được)
-        
+
         except TypeError:
-            # Lỗi này xảy ra nếu chưa nạp ma trận mà đã đòi lấy dữ liệu
-            print("Lỗi: Ma trận chưa được thiết lập (None).")
+            # Lỗi này xảy ra nếu chỉ số không hợp lệ (None, chuỗi...)
+            print(f"Lỗi: Chỉ số thành phố không hợp lệ [{city_from_idx}][{city_to_idx}].")
             return float('inf')
 
 
@@ -54,24 +258,91 @@ class TSPProblem:
         Input path: Danh sách thứ tự đi, ví dụ: [0, 2, 1, 3, 0] (đi từ 0->2->1->3 rồi về 0)
         """
         # Kiểm tra an toàn: Nếu lộ trình rỗng hoặc ngắn quá (<=2 điểm) hoặc chưa có bản đồ
-        if not path or len(path) <= 2 or not self.dist_matrix:
+        if not path or len(path) <= 2 or self.num_cities == 0:
             return 0
-            
+
         total_cost = 0 # Biến tổng chi phí ban đầu bằng 0
-        
+
         try:
             # Duyệt qua từng chặng đường trong lộ trình
             # len(path) - 1 vì nếu có 5 điểm thì chỉ có 4 đoạn đường nối
             for i in range(len(path) - 1):
                 current_city = path[i]     # Thành phố đang đứng
                 next_city = path[i+1]      # Thành phố tiếp theo sẽ đến
-                
+
                 # Cộng dồn chi phí của đoạn đường này vào tổng
                 # Sử dụng hàm get_cost() ở trên để lấy khoảng cách
                 total_cost += self.get_cost(current_city, next_city)
-                
+
         except Exception as e:
             print(f"Lỗi khi tính chi phí đường đi: {e}")
             return float('inf') # Nếu lỗi thì trả về vô cực
-            
+
         return total_cost # Trả về kết quả cuối cùng
+
+    def _gather_costs(self, rows, cols):
+        """
+        Lấy chi phí của nhiều cạnh cùng lúc (rows[k] -> cols[k]), dạng vector hóa.
+        Trả về (costs float64, is_inf bool) cùng kích thước với rows.
+        Các lớp con (ví dụ bài toán theo tọa độ) ghi đè hàm này.
+        """
+        costs = self.matrix[rows, cols].astype(np.float64, copy=False)
+        return costs, self.inf_mask[rows, cols]
+
+    def get_path_costs(self, paths, close_tour=False):
+        """
+        Tính chi phí của NHIỀU lộ trình cùng lúc (gather-and-sum vector hóa).
+        Input paths: mảng 2 chiều (M x L), mỗi hàng là một lộ trình, ví dụ [[0, 2, 1, 3, 0], ...].
+        close_tour: nếu True thì cộng thêm cạnh quay về từ điểm cuối tới điểm đầu của mỗi hàng.
+        Output: mảng float64 độ dài M. Lộ trình có cạnh vô cực hoặc chỉ số sai -> inf.
+        """
+        paths = np.asarray(paths)
+        if paths.ndim != 2:
+            raise ValueError(f"paths phải là mảng 2 chiều (M x L), nhận được {paths.ndim} chiều.")
+        num_paths = paths.shape[0]
+        if num_paths == 0 or paths.shape[1] < 2 or self.num_cities == 0:
+            return np.zeros(num_paths, dtype=np.float64)
+
+        paths = paths.astype(np.intp, copy=False)
+        if close_tour:
+            paths = np.concatenate([paths, paths[:, :1]], axis=1)
+
+        # Hàng nào có chỉ số ngoài phạm vi thì đánh dấu vô cực, các hàng còn lại tính bình thường
+        bad_rows = ((paths < 0) | (paths >= self.num_cities)).any(axis=1)
+        if bad_rows.any():
+            print(f"Lỗi: {int(bad_rows.sum())} lộ trình chứa chỉ số thành phố không tồn tại.")
+            paths = np.where(bad_rows[:, None], 0, paths)
+
+        costs, is_inf = self._gather_costs(paths[:, :-1], paths[:, 1:])
+        totals = costs.sum(axis=1)
+        totals[is_inf.any(axis=1) | bad_rows] = np.inf
+        return totals
+
+
+def select_nearest(costs, k, cols=None):
+    """
+    Chọn k cột có chi phí nhỏ nhất trên từng hàng của costs (B x M), sắp xếp theo (chi phí, chỉ số).
+    cols: chỉ số thành phố tương ứng với từng ô (B x M); bỏ trống thì là 0..M-1.
+    Ô có chi phí vô cực được thay bằng -1.
+    Bằng chi phí ở vị trí thứ k thì chỉ số nhỏ hơn được chọn (kết quả không phụ thuộc argpartition).
+    """
+    num_rows, num_cols = costs.shape
+    if cols is None:
+        cols = np.broadcast_to(np.arange(num_cols), costs.shape)
+    if 0 < k < num_cols:
+        # Giữ mọi cột có chi phí <= giá trị thứ k (kể cả các cột bằng nhau mà argpartition có thể bỏ sót),
+        # dồn chúng lên đầu hàng rồi mới sắp xếp theo (chi phí, chỉ số)
+        kth = np.partition(costs, k - 1, axis=1)[:, k - 1:k]
+        keep = costs <= kth
+        width = max(int(keep.sum(axis=1).max()), k)
+        part = np.argsort(~keep, axis=1, kind="stable")[:, :width]
+        keep = np.take_along_axis(keep, part, axis=1)
+        costs = np.take_along_axis(costs, part, axis=1)
+        cols = np.take_along_axis(cols, part, axis=1)
+        order = np.lexsort((cols, costs, ~keep), axis=1)[:, :k]
+    else:
+        order = np.lexsort((cols, costs), axis=1)
+    costs = np.take_along_axis(costs, order, axis=1)
+    result = np.take_along_axis(cols, order, axis=1).astype(np.int32)
+    result[np.isinf(costs)] = -1
+    return result
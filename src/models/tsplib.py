@@ -0,0 +1,209 @@
+# src/models/tsplib.py
+import os
+
+import numpy as np
+
+from .tsp_problem import TSPProblem
+from .coord_problem import CoordTSPProblem, SUPPORTED_METRICS
+
+# Các định dạng EDGE_WEIGHT_FORMAT (kiểu EXPLICIT) được hỗ trợ
+SUPPORTED_FORMATS = ("FULL_MATRIX", "UPPER_ROW", "UPPER_DIAG_ROW", "LOWER_ROW", "LOWER_DIAG_ROW")
+
+# Đuôi file cache nhị phân đặt cạnh file gốc (ví dụ: a280.tsp -> a280.tsp.npy)
+CACHE_SUFFIX = ".npy"
+
+_SECTIONS = ("NODE_COORD_SECTION", "EDGE_WEIGHT_SECTION", "DISPLAY_DATA_SECTION",
+             "TOUR_SECTION", "FIXED_EDGES_SECTION", "EOF")
+
+
+def _read_header(lines):
+    """
+    Đọc phần đầu (header) dạng "KEY : VALUE" cho tới khi gặp một section.
+    Trả về (header dict, tên section đầu tiên hoặc None).
+    """
+    header = {}
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        keyword = line.split(":", 1)[0].strip().upper()
+        if keyword in _SECTIONS:
+            return header, keyword
+        if ":" in line:
+            key, value = line.split(":", 1)
+            header[key.strip().upper()] = value.strip()
+    return header, None
+
+
+def read_tsplib_header(path):
+    """Chỉ đọc phần header của file TSPLIB (không đọc dữ liệu)."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        header, _ = _read_header(f)
+    return header
+
+
+def _row_span(fmt, row, n):
+    """Khoảng cột [start, stop) mà hàng row chiếm trong định dạng fmt."""
+    if fmt == "FULL_MATRIX":
+        return 0, n
+    if fmt == "UPPER_ROW":
+        return row + 1, n
+    if fmt == "UPPER_DIAG_ROW":
+        return row, n
+    if fmt == "LOWER_ROW":
+        return 0, row
+    return 0, row + 1  # LOWER_DIAG_ROW
+
+
+def _parse_edge_weights(lines, n, fmt, dtype):
+    """
+    Đọc EDGE_WEIGHT_SECTION theo kiểu stream: từng dòng được tách số và ghi thẳng vào ma trận,
+    không giữ toàn bộ nội dung file trong bộ nhớ.
+    """
+    matrix = np.zeros((n, n), dtype=dtype)
+    row = 0
+    col, stop = _row_span(fmt, row, n)
+    # Bỏ qua các hàng rỗng (ví dụ hàng cuối của UPPER_ROW, hàng đầu của LOWER_ROW)
+    while row < n and col >= stop:
+        row += 1
+        col, stop = _row_span(fmt, row, n) if row < n else (0, 0)
+
+    for raw in lines:
+        if row >= n:
+            break
+        tokens = raw.split()
+        if not tokens:
+            continue
+        if tokens[0].upper() in _SECTIONS:
+            break
+        values = np.array(tokens, dtype=np.float64)
+        k = 0
+        while k < len(values) and row < n:
+            take = min(stop - col, len(values) - k)
+            matrix[row, col:col + take] = values[k:k + take]
+            col += take
+            k += take
+            while row < n and col >= stop:
+                row += 1
+                col, stop = _row_span(fmt, row, n) if row < n else (0, 0)
+
+    if row < n:
+        raise ValueError(f"EDGE_WEIGHT_SECTION thiếu dữ liệu (mới đọc tới hàng {row}/{n}).")
+
+    # Định dạng tam giác -> lấp đầy nửa còn lại (giữ nguyên đường chéo)
+    if fmt != "FULL_MATRIX":
+        diagonal = matrix.diagonal().copy()
+        matrix += matrix.T
+        np.fill_diagonal(matrix, diagonal)
+    return matrix
+
+
+def _parse_node_coords(lines, n):
+    """Đọc NODE_COORD_SECTION: mỗi dòng "id x y" (id bắt đầu từ 1)."""
+    coords = np.zeros((n, 2), dtype=np.float64)
+    count = 0
+    for raw in lines:
+        tokens = raw.split()
+        if not tokens:
+            continue
+        if tokens[0].upper() in _SECTIONS:
+            break
+        node_id = int(tokens[0]) - 1
+        coords[node_id] = (float(tokens[1]), float(tokens[2]))
+        count += 1
+        if count == n:
+            break
+    if count < n:
+        raise ValueError(f"NODE_COORD_SECTION thiếu dữ liệu ({count}/{n} thành phố).")
+    return coords
+
+
+def _cache_is_valid(cache_path, source_path, expected_shape, dtype):
+    """Kiểm tra file cache còn dùng được: mới hơn file gốc, đúng kích thước và kiểu dữ liệu."""
+    if not os.path.exists(cache_path):
+        return False
+    if os.path.getmtime(cache_path) < os.path.getmtime(source_path):
+        return False
+    try:
+        cached = np.load(cache_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return False
+    return cached.shape == expected_shape and cached.dtype == dtype
+
+
+def _write_cache(cache_path, array):
+    """Ghi file cache .npy (ghi ra file tạm rồi đổi tên để không để lại file hỏng)."""
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[Cảnh báo] Không ghi được file cache {cache_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_tsplib(path, dtype="int32", use_cache=True):
+    """
+    Đọc một file TSPLIB (.tsp / .atsp) và trả về đối tượng bài toán.
+
+    - NODE_COORD_SECTION (EUC_2D, CEIL_2D, GEO, ATT) -> CoordTSPProblem (khoảng cách tính lười).
+    - EXPLICIT (FULL_MATRIX, UPPER_ROW, UPPER_DIAG_ROW, LOWER_ROW, LOWER_DIAG_ROW) -> TSPProblem.
+
+    Lần đọc đầu tiên ghi thêm file cache nhị phân "<file>.npy" cạnh file gốc; các lần sau
+    chỉ đọc header rồi ánh xạ bộ nhớ (memory-map) file cache, không phải phân tích lại văn bản.
+
+    Args:
+        path: Đường dẫn file TSPLIB.
+        dtype: Kiểu lưu ma trận EXPLICIT (TSPLIB quy định khoảng cách là số nguyên).
+        use_cache: Có đọc/ghi file cache .npy hay không.
+    """
+    dtype = np.dtype(dtype)
+    cache_path = path + CACHE_SUFFIX
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        header, section = _read_header(f)
+        name = header.get("NAME", os.path.basename(path))
+        try:
+            n = int(header["DIMENSION"])
+        except (KeyError, ValueError):
+            raise ValueError(f"File {path} thiếu hoặc sai trường DIMENSION.")
+        weight_type = header.get("EDGE_WEIGHT_TYPE", "EXPLICIT").upper()
+
+        if weight_type == "EXPLICIT":
+            fmt = header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper()
+            if fmt not in SUPPORTED_FORMATS:
+                raise ValueError(f"EDGE_WEIGHT_FORMAT '{fmt}' chưa được hỗ trợ. Hỗ trợ: {SUPPORTED_FORMATS}.")
+            if use_cache and _cache_is_valid(cache_path, path, (n, n), dtype):
+                matrix = np.load(cache_path, mmap_mode="r")
+            else:
+                # Bỏ qua các section khác cho tới EDGE_WEIGHT_SECTION
+                while section not in ("EDGE_WEIGHT_SECTION", None, "EOF"):
+                    _, section = _read_header(f)
+                if section != "EDGE_WEIGHT_SECTION":
+                    raise ValueError(f"File {path} không có EDGE_WEIGHT_SECTION.")
+                matrix = _parse_edge_weights(f, n, fmt, dtype)
+                if use_cache:
+                    _write_cache(cache_path, matrix)
+            problem = TSPProblem(dtype=dtype)
+            problem.set_matrix(matrix)
+
+        elif weight_type in SUPPORTED_METRICS:
+            if use_cache and _cache_is_valid(cache_path, path, (n, 2), np.dtype(np.float64)):
+                coords = np.load(cache_path, mmap_mode="r")
+            else:
+                while section not in ("NODE_COORD_SECTION", None, "EOF"):
+                    _, section = _read_header(f)
+                if section != "NODE_COORD_SECTION":
+                    raise ValueError(f"File {path} không có NODE_COORD_SECTION.")
+                coords = _parse_node_coords(f, n)
+                if use_cache:
+                    _write_cache(cache_path, coords)
+            problem = CoordTSPProblem(coords, metric=weight_type)
+
+        else:
+            raise ValueError(f"EDGE_WEIGHT_TYPE '{weight_type}' chưa được hỗ trợ.")
+
+    problem.name = name
+    return problem